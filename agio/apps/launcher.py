@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import os
 from pathlib import Path
 import shlex
@@ -11,9 +12,11 @@ from agio.core.events import emit
 from agio.core.plugins import base_app_launcher_plugin as bp
 from agio.core.settings import get_local_settings
 from agio.package_settings.local_settings import ApplicationSettings
-from agio.tools import launching, env_names
+from agio.tools import launching, env_names, interpreter_info
 from agio.tools.process_utils import start_process
 
+logger = logging.getLogger(__name__)
+
 
 class AApplicationLauncher:
     """Wrapper class for any app plugin"""
@@ -155,6 +158,10 @@ class AApplicationLauncher:
             return version
         try:
             py_app = app_hub.get_app(self.name, self.version, mode='python')
+            try:
+                return interpreter_info.get_interpreter_info(py_app.get_executable()).version
+            except interpreter_info.InterpreterProbeError as e:
+                logger.debug(f'{e}, version is taken from the banner')
             cmd = [py_app.get_executable(), '-V']
             version_str = start_process(cmd, get_output=True, new_console=False)
             if not version_str:
@@ -6,11 +6,16 @@ import sys
 import threading
 import asyncio
 
-from agio.tools import setup_logger, env_names  # noqa: F401
-from agio.core.events import emit as _emit, subscribe as _subscribe
-from agio.core.init.init_packages import init_packages
-from agio.core.init.init_plugins import init_plugins
-from agio.tools import process_hub
+from agio.tools import startup_profiler
+
+with startup_profiler.phase('core.logger'):
+    from agio.tools import setup_logger, env_names  # noqa: F401
+with startup_profiler.phase('core.events'):
+    from agio.core.events import emit as _emit, subscribe as _subscribe
+with startup_profiler.phase('core.imports'):
+    from agio.core.init.init_packages import init_packages
+    from agio.core.init.init_plugins import init_plugins
+    from agio.tools import process_hub
 
 # add extra paths before initialize packages
 extra_packages_env = os.getenv(env_names.EXTRA_PACKAGES)
@@ -21,9 +26,22 @@ if extra_packages_env:
 
 logger = logging.getLogger(__name__)
 
-init_packages()
-init_plugins()
+with startup_profiler.phase('core.init_packages'):
+    init_packages()
+with startup_profiler.phase('core.init_plugins'):
+    init_plugins()
 _process_hub = process_hub.ProcessHub()
+
+
+def _drain_events(*args):
+    from agio.core.config import config
+    from agio.core.events import drain
+
+    drain(config.EVENTS.CALLBACK_DRAIN_TIMEOUT)
+
+
+_subscribe('core.app.exit', _drain_events)
+atexit.register(_drain_events)
 _subscribe('core.app.exit', _process_hub.shutdown)
 _emit('core.app.logger_created', {'logger': logger})
 
@@ -101,4 +119,7 @@ except RuntimeError:
 from agio.core.config import config
 _emit('core.app.config_loaded', {'config': config})
 _emit('core.app.on_startup')
+startup_profiler.mark('core.init')
+_phases = startup_profiler.phase_timings()
+_emit('core.app.startup_timing', {'phases': _phases, 'total': _phases['core.init']})
 logger.debug('Core init done')
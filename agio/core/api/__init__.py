@@ -1,12 +1,14 @@
 import os
 
+from agio.tools import startup_profiler
 from .api_client.api_client import ApiClient
 
 if os.environ.get('AGIO_USE_API_CLIENT_CONTEXT_PROXY'):
     from agio.tools.concurrent import ContextVarProxy
     client: ApiClient|ContextVarProxy = ContextVarProxy(ApiClient)
 else:
-    client = ApiClient()
+    with startup_profiler.phase('core.api_client'):
+        client = ApiClient()
 
 from . import workspace, package, desk, auth, pipe, track, profile, drive
 __all__ = ['client', 'workspace', 'package', 'desk', 'auth', 'pipe', 'track', 'profile', 'drive', 'ApiClient']
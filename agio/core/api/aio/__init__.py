@@ -0,0 +1,15 @@
+"""
+Async twins of api modules, generated from the sync sources on import.
+
+    from agio.core.api import aio
+
+    entity = await aio.track.get_entity(entity_id)
+    async for revision in aio.workspace.iter_revisions(workspace_id):
+        ...
+"""
+from agio.core.api.api_client.async_api_client import AsyncApiClient
+
+client = AsyncApiClient()
+
+from . import track, pipe, workspace, package
+__all__ = ['client', 'track', 'pipe', 'workspace', 'package', 'AsyncApiClient']
@@ -0,0 +1,294 @@
+"""
+Build async module from the source of a sync api module.
+
+Functions decorated with ``api_call`` and functions calling them become async:
+- ``client.make_query*()`` and calls of coroutine functions are awaited
+- generator functions become async generators, ``yield from`` and ``for`` over
+  async iterators become ``async for``
+- ``next(it)`` becomes ``await anext(it)``, ``StopIteration`` -> ``StopAsyncIteration``
+- async iterators used as values are collected to lists
+- functions returning an async iterator as is stay sync
+- ``with client.batch()`` becomes ``async with``, ``@cache`` becomes ``@async_cache``
+Imports of the client, api utils and sibling api modules are redirected to ``agio.core.api.aio``.
+"""
+from __future__ import annotations
+
+import ast
+import importlib
+import inspect
+import linecache
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+AIO_PACKAGE = 'agio.core.api.aio'
+SYNC_PACKAGE = 'agio.core.api'
+GENERATED_MODULES = ('track', 'pipe', 'workspace', 'package')
+IMPORT_REDIRECTS = {
+    'agio.core.api.utils': 'agio.core.api.aio.utils',
+    'agio.core.api.utils.query_tools': 'agio.core.api.aio.query_tools',
+}
+QUERY_METHODS = ('make_query', 'make_query_raw')
+
+SYNC = 'sync'
+COROUTINE = 'coroutine'
+ASYNCGEN = 'asyncgen'
+# sync function returning async iterator
+AITER = 'aiter'
+ASYNC_ITERABLE_KINDS = (ASYNCGEN, AITER)
+
+
+def _kind_of(module, name: str) -> str:
+    kinds = getattr(module, '__async_kinds__', None)
+    if kinds and name in kinds:
+        return kinds[name]
+    obj = getattr(module, name, None)
+    if obj is None or not callable(obj):
+        return SYNC
+    obj = inspect.unwrap(obj)
+    if inspect.isasyncgenfunction(obj):
+        return ASYNCGEN
+    if inspect.iscoroutinefunction(obj):
+        return COROUTINE
+    return SYNC
+
+
+def _is_batch(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == 'client'
+            and node.func.attr == 'batch')
+
+
+def _walk_body(func: ast.FunctionDef):
+    """Nodes of function body without nested functions and classes"""
+    scopes = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+    stack = [node for node in func.body if not isinstance(node, scopes)]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(child for child in ast.iter_child_nodes(node) if not isinstance(child, scopes))
+
+
+def _is_api_call(func: ast.FunctionDef) -> bool:
+    return any(isinstance(d, ast.Name) and d.id == 'api_call' for d in func.decorator_list)
+
+
+class _ModuleInfo:
+    def __init__(self, tree: ast.Module):
+        # imported name -> kind, module alias -> module
+        self.names: dict[str, str] = {}
+        self.modules: dict[str, object] = {}
+        self.functions = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+        self.kinds: dict[str, str] = {}
+
+    def kind_of_call(self, node: ast.AST) -> str:
+        if not isinstance(node, ast.Call):
+            return SYNC
+        func = node.func
+        if isinstance(func, ast.Name):
+            return self.kinds.get(func.id) or self.names.get(func.id, SYNC)
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            if func.value.id == 'client' and func.attr in QUERY_METHODS:
+                return COROUTINE
+            module = self.modules.get(func.value.id)
+            if module is not None:
+                return _kind_of(module, func.attr)
+        return SYNC
+
+    def compute_kinds(self):
+        """Resolve function kinds, a function calling async function becomes async itself"""
+        self.kinds = {name: SYNC for name in self.functions}
+        changed = True
+        while changed:
+            changed = False
+            for name, func in self.functions.items():
+                kind = self._function_kind(func)
+                if kind != self.kinds[name]:
+                    self.kinds[name] = kind
+                    changed = True
+
+    def _function_kind(self, func: ast.FunctionDef) -> str:
+        nodes = list(_walk_body(func))
+        if any(isinstance(n, (ast.Yield, ast.YieldFrom)) for n in nodes):
+            return ASYNCGEN if self._uses_async(nodes) or _is_api_call(func) else SYNC
+        async_calls = [n for n in nodes if self.kind_of_call(n) != SYNC]
+        if any(isinstance(n, ast.With) and any(_is_batch(i.context_expr) for i in n.items) for n in nodes):
+            return COROUTINE
+        if not async_calls:
+            return COROUTINE if _is_api_call(func) else SYNC
+        returned = [n.value for n in nodes if isinstance(n, ast.Return) and n.value is not None]
+        if all(c in returned and self.kind_of_call(c) in ASYNC_ITERABLE_KINDS for c in async_calls):
+            return AITER
+        return COROUTINE
+
+    def _uses_async(self, nodes: list) -> bool:
+        return any(self.kind_of_call(n) != SYNC for n in nodes)
+
+
+class _ImportRewriter(ast.NodeTransformer):
+    def __init__(self, info: _ModuleInfo):
+        self.info = info
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module
+        if node.level == 1 and module is None:
+            module = SYNC_PACKAGE
+        elif node.level:
+            module = f'{SYNC_PACKAGE}.{module}'
+        if module == SYNC_PACKAGE:
+            names = []
+            for alias in node.names:
+                target = alias.asname or alias.name
+                if alias.name == 'client':
+                    names.append(ast.ImportFrom(AIO_PACKAGE, [alias], 0))
+                elif alias.name in GENERATED_MODULES:
+                    self.info.modules[target] = importlib.import_module(f'{AIO_PACKAGE}.{alias.name}')
+                    names.append(ast.ImportFrom(AIO_PACKAGE, [alias], 0))
+                else:
+                    names.append(ast.ImportFrom(SYNC_PACKAGE, [alias], 0))
+            return names
+        module = IMPORT_REDIRECTS.get(module, module)
+        if module.startswith(AIO_PACKAGE):
+            imported = importlib.import_module(module)
+            for alias in node.names:
+                self.info.names[alias.asname or alias.name] = _kind_of(imported, alias.name)
+        return ast.ImportFrom(module, node.names, 0)
+
+
+class _AsyncTransformer(ast.NodeTransformer):
+    def __init__(self, info: _ModuleInfo):
+        self.info = info
+
+    # helpers
+
+    def _is_async_iterable(self, node: ast.AST) -> bool:
+        return self.info.kind_of_call(node) in ASYNC_ITERABLE_KINDS
+
+    @staticmethod
+    def _collect(node: ast.AST) -> ast.ListComp:
+        return ast.ListComp(
+            elt=ast.Name('_item', ast.Load()),
+            generators=[ast.comprehension(ast.Name('_item', ast.Store()), node, [], 1)],
+        )
+
+    def _visit_iterable(self, node: ast.AST) -> tuple[ast.AST, bool]:
+        """Visit iterable without collecting it to list"""
+        if self._is_async_iterable(node):
+            return self.generic_visit(node), True
+        return self.visit(node), False
+
+    # functions
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        kind = self.info.kinds.get(node.name, SYNC)
+        if kind == SYNC:
+            return node
+        self.generic_visit(node)
+        node.decorator_list = [
+            ast.Name('async_cache', ast.Load()) if isinstance(d, ast.Name) and d.id == 'cache' else d
+            for d in node.decorator_list
+        ]
+        if kind == AITER:
+            return node
+        return ast.AsyncFunctionDef(
+            name=node.name, args=node.args, body=node.body, decorator_list=node.decorator_list,
+            returns=node.returns, type_comment=node.type_comment,
+        )
+
+    def visit_Lambda(self, node):
+        return node
+
+    def visit_ClassDef(self, node):
+        return node
+
+    # expressions
+
+    def visit_Call(self, node: ast.Call):
+        if isinstance(node.func, ast.Name) and node.func.id == 'next' and node.args:
+            iterable, is_async = self._visit_iterable(node.args[0])
+            if is_async:
+                node.args = [iterable, *(self.visit(a) for a in node.args[1:])]
+                node.func = ast.Name('anext', ast.Load())
+                return ast.Await(node)
+            node.args[0] = iterable
+            node.args[1:] = [self.visit(a) for a in node.args[1:]]
+            return node
+        if isinstance(node.func, ast.Name) and node.func.id == 'list' and len(node.args) == 1:
+            iterable, is_async = self._visit_iterable(node.args[0])
+            if is_async:
+                return self._collect(iterable)
+            node.args[0] = iterable
+            return node
+        self.generic_visit(node)
+        kind = self.info.kind_of_call(node)
+        if kind == COROUTINE:
+            return ast.Await(node)
+        if kind in ASYNC_ITERABLE_KINDS:
+            return self._collect(node)
+        return node
+
+    # statements
+
+    def visit_Return(self, node: ast.Return):
+        if node.value is not None:
+            node.value, _ = self._visit_iterable(node.value)
+        return node
+
+    def visit_For(self, node: ast.For):
+        iterable, is_async = self._visit_iterable(node.iter)
+        node.iter = iterable
+        node.body = [self.visit(n) for n in node.body]
+        node.orelse = [self.visit(n) for n in node.orelse]
+        if is_async:
+            return ast.AsyncFor(node.target, node.iter, node.body, node.orelse, node.type_comment)
+        return node
+
+    def visit_Expr(self, node: ast.Expr):
+        if isinstance(node.value, ast.YieldFrom):
+            # "yield from" is not allowed in async generators
+            iterable, is_async = self._visit_iterable(node.value.value)
+            loop = ast.AsyncFor if is_async else ast.For
+            return loop(
+                target=ast.Name('_item', ast.Store()),
+                iter=iterable,
+                body=[ast.Expr(ast.Yield(ast.Name('_item', ast.Load())))],
+                orelse=[],
+            )
+        return self.generic_visit(node)
+
+    def visit_With(self, node: ast.With):
+        self.generic_visit(node)
+        if any(_is_batch(item.context_expr) for item in node.items):
+            return ast.AsyncWith(node.items, node.body, node.type_comment)
+        return node
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        self.generic_visit(node)
+        if isinstance(node.type, ast.Name) and node.type.id == 'StopIteration':
+            node.type = ast.Name('StopAsyncIteration', ast.Load())
+        return node
+
+
+def transform_source(source: str) -> tuple[ast.Module, dict[str, str]]:
+    tree = ast.parse(source)
+    info = _ModuleInfo(tree)
+    tree = _ImportRewriter(info).visit(tree)
+    info.compute_kinds()
+    tree = _AsyncTransformer(info).visit(tree)
+    tree.body.insert(0, ast.ImportFrom('agio.core.api.aio.utils', [ast.alias('async_cache')], 0))
+    return ast.fix_missing_locations(tree), info.kinds
+
+
+def generate(sync_module_name: str, namespace: dict) -> None:
+    """Execute async version of sync module in the namespace of the twin module"""
+    sync_module = sys.modules.get(sync_module_name) or importlib.import_module(sync_module_name)
+    tree, kinds = transform_source(inspect.getsource(sync_module))
+    source = ast.unparse(tree)
+    filename = f'<async {sync_module_name}>'
+    # make generated source visible in tracebacks
+    linecache.cache[filename] = (len(source), None, source.splitlines(keepends=True), filename)
+    namespace['__async_kinds__'] = kinds
+    namespace['__async_source__'] = source
+    exec(compile(source, filename, 'exec'), namespace)
+    logger.debug(f'Async module generated from {sync_module_name}')
@@ -0,0 +1,4 @@
+"""Async twin of agio.core.api.package"""
+from ._generator import generate
+
+generate('agio.core.api.package', globals())
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from typing import AsyncIterator
+
+from agio.core.api.aio import client as default_client
+from agio.core.api.utils.query_tools import PageSizer, PaginationStats
+from agio.core.config import config
+
+
+async def iter_query_list(query: str,
+                          entities_data_key: str,
+                          variables: dict = None,
+                          limit: int = None,
+                          items_per_page: int = 50,
+                          client=default_client,
+                          stats: PaginationStats = None,
+                          ) -> AsyncIterator[dict]:
+    """Async twin of agio.core.api.utils.query_tools.iter_query_list, the next page is fetched by a task"""
+    variables = variables or {}
+    stats = stats if stats is not None else PaginationStats()
+    sizer = PageSizer(items_per_page)
+
+    async def fetch_page(cursor: str | None, received: int) -> tuple[list, str | None]:
+        page_size = sizer.next_size(None if limit is None else limit - received)
+        start = time.perf_counter()
+        response = await client.make_query(
+            query,
+            **variables,
+            first=page_size,
+            afterCursor=cursor,
+        )
+        elapsed = time.perf_counter() - start
+        data = response['data'][entities_data_key]
+        items = data['edges']
+        size_bytes = client.last_response_size
+        stats.add_page(len(items), page_size, elapsed, size_bytes)
+        sizer.observe(len(items), page_size, elapsed, size_bytes)
+        if not items or not data['pageInfo']['hasNextPage']:
+            return items, None
+        if data['pageInfo']['endCursor'] == cursor:
+            raise ValueError('Next and previous cursors is match!')
+        return items, data['pageInfo']['endCursor']
+
+    start = time.perf_counter()
+    next_page = None
+    count = received = 0
+    finished = False
+    try:
+        items, cursor = await fetch_page(None, 0)
+        while True:
+            received += len(items)
+            has_next = cursor is not None and (limit is None or received < limit)
+            if has_next and config.API.PAGINATION_PREFETCH > 0:
+                next_page = asyncio.ensure_future(fetch_page(cursor, received))
+            for item in items:
+                yield item['node']
+                # check limit
+                if limit is not None:
+                    count += 1
+                    if count >= limit:
+                        finished = True
+                        return
+            if not has_next:
+                break
+            if next_page is not None:
+                stats.prefetched_pages += 1
+                items, cursor = await next_page
+                next_page = None
+            else:
+                items, cursor = await fetch_page(cursor, received)
+        finished = True
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+        stats.wall_time = time.perf_counter() - start
+        stats.cancelled = not finished
@@ -0,0 +1,4 @@
+"""Async twin of agio.core.api.track"""
+from ._generator import generate
+
+generate('agio.core.api.track', globals())
@@ -0,0 +1,33 @@
+from functools import wraps
+from typing import Callable
+
+from agio.core.api.utils import NOTSET
+
+__all__ = ['NOTSET', 'api_call', 'async_cache']
+
+
+def api_call(func: Callable) -> Callable:
+    from agio.core.api.aio import client
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # fix client argument
+        if 'client' in kwargs:
+            if kwargs['client'] is None:
+                kwargs['client'] = client
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def async_cache(func: Callable) -> Callable:
+    """functools.cache for coroutine functions, stores awaited results"""
+    results = {}
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        if key not in results:
+            results[key] = await func(*args, **kwargs)
+        return results[key]
+    wrapper.cache_clear = results.clear
+    return wrapper
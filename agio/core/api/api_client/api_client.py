@@ -1,6 +1,8 @@
+import contextvars
 import json
 import logging
 import os
+import threading
 from pathlib import Path
 
 import requests
@@ -8,14 +10,21 @@ from agio.tools.text_helpers import shorten_text
 from requests.exceptions import HTTPError, ConnectionError, JSONDecodeError
 from agio.core.config import config
 from agio.core.api.api_client import auth_services
-from agio.core.api.utils import NOTSET
+from agio.core.api.api_client.batching import QueryBatch
+from agio.core.api.api_client.encoding import encode_body, prepare_variables
+from agio.core.api.api_client.persisted_queries import PersistedQueries, get_persisted_queries
+from agio.core.api.api_client.query_registry import QueryRegistry, get_query_registry
+from agio.core.api.api_client.response_cache import get_response_cache, token_identity
 from agio.tools import env_names
+from agio.tools.identity_map import IdentityMap
 from agio.core.exceptions import RequestError, AuthorizationError
-from agio.tools.json_serializer import JsonSerializer
 from agio.core.events import emit
 
 logger = logging.getLogger(__name__)
 
+# size of the last response body received in current thread or task
+last_response_size: contextvars.ContextVar[int] = contextvars.ContextVar('agio_last_response_size', default=0)
+
 
 class ApiClient:
     platform_url = config.API.PLATFORM_URL.rstrip('/')
@@ -25,7 +34,16 @@ class ApiClient:
     def __init__(self, **kwargs):
         self._token = None
         self.session = requests.Session()
+        # the session is used by background threads too (page prefetch),
+        # request preparation and token refresh are serialized, sending is not
+        self._session_lock = threading.RLock()
         self._debug_query = bool(os.getenv(env_names.DEBUG_QUERY))
+        self._use_response_cache = config.API.RESPONSE_CACHE
+        self._persisted_queries: PersistedQueries|None = get_persisted_queries() if config.API.PERSISTED_QUERIES else None
+        # environment proxies and certificates per url, requests reads them from os.environ on every call
+        self._send_settings: dict[str, dict] = {}
+        # entity objects by type and id, see agio.core.entities.base_object
+        self.identity_map: IdentityMap|None = IdentityMap(config.API.IDENTITY_MAP_TTL) if config.API.IDENTITY_MAP else None
         self._load_session(**kwargs)
         self._agio_login_available = auth_services.agio_login_binary_available()
 
@@ -48,6 +66,8 @@ class ApiClient:
         emit('core.auth.before_logout')
         self.session.headers.pop('Authorization', None)
         self._token = None
+        if self.identity_map is not None:
+            self.identity_map.clear()
         auth_services.logout()
         logger.info('Logged out')
         emit('core.auth.on_logout')
@@ -86,12 +106,31 @@ class ApiClient:
             "Content-Type": "application/json",
         })
 
+    @property
+    def last_response_size(self) -> int:
+        return last_response_size.get()
+
     def set_debug_query(self, val: bool):
         self._debug_query = bool(val)
 
-    def _serialize_values(self, value: dict):
-        # TODO optimise it
-        return json.loads(json.dumps(value, cls=JsonSerializer))
+    def set_response_cache(self, val: bool):
+        self._use_response_cache = bool(val)
+
+    def set_persisted_queries(self, val: bool):
+        self._persisted_queries = get_persisted_queries() if val else None
+
+    @property
+    def persisted_queries(self) -> PersistedQueries|None:
+        return self._persisted_queries
+
+    @property
+    def queries(self) -> QueryRegistry:
+        return get_query_registry(self.queries_root)
+
+    @property
+    def response_cache(self):
+        if self._use_response_cache:
+            return get_response_cache()
 
     def ping(self):
         try:
@@ -102,13 +141,30 @@ class ApiClient:
 
     def make_query(self, query_file: str, **variables) -> dict:
         """Read query from file and execute query"""
-        query_text = self.load_query(query_file)
-        return self.make_query_raw(query_text, **variables)
+        query_text = self.queries.get(query_file).text
+        variables = self._prepare_variables(variables)
+        result = self._get_cached_response(query_file, query_text, variables)
+        if result is None:
+            result = self._execute(query_text, variables)
+            self._store_cached_response(query_file, query_text, variables, result)
+        return result
 
     def make_query_raw(self, query: str, **variables) -> dict:
         """Execute query from string"""
-        variables = self._remove_notset_values(variables)
-        serialized = self._serialize_values(variables)
+        return self._execute(self.queries.compile(query).text, self._prepare_variables(variables))
+
+    def batch(self, max_size: int = 50) -> QueryBatch:
+        """
+        Collect queries and send them as one request
+        with client.batch() as batch:
+            items = [batch.add('ws/package/getPackage', id=i) for i in ids]
+        """
+        return QueryBatch(self, max_size=max_size)
+
+    def _prepare_variables(self, variables: dict) -> dict:
+        return prepare_variables(variables)
+
+    def _make_request_data(self, query: str, serialized: dict) -> dict:
         data = {
             "query": query,
         }
@@ -116,6 +172,10 @@ class ApiClient:
             data.update({
                 "variables": serialized,
             })
+        return data
+
+    def _execute(self, query: str, serialized: dict) -> dict:
+        data = self._make_request_data(query, serialized)
         if self._debug_query:
             emit('core.api.debug_query_request_data', {'data': data})
             self._pprint_request(data)
@@ -125,24 +185,76 @@ class ApiClient:
             self._print_response(result)
         return result
 
+    def _get_cached_response(self, query_file: str|None, query_text: str, variables: dict) -> dict|None:
+        cache = self.response_cache
+        if cache is None or query_file is None:
+            return None
+        policy = cache.get_policy(query_file, query_text)
+        if policy is None or policy.is_mutation:
+            return None
+        result = cache.get(policy, query_text, variables, token_identity(self._token))
+        if result is not None:
+            last_response_size.set(0)
+            if self._debug_query:
+                logger.debug(f'Response from cache: {query_file}')
+        return result
+
+    def _store_cached_response(self, query_file: str|None, query_text: str, variables: dict, response: dict):
+        cache = self.response_cache
+        if cache is None or query_file is None:
+            return
+        policy = cache.get_policy(query_file, query_text)
+        if policy is None:
+            return
+        if policy.is_mutation:
+            cache.invalidate(*policy.tags)
+        else:
+            cache.set(policy, query_text, variables, token_identity(self._token), response)
+
     def load_query(self, query_path: str) -> str:
         """
-        Load GraphQL query from file
+        Minified GraphQL query from file
         """
-        query_file_path = self.queries_root.joinpath(query_path).with_suffix('.graphql')
-        if not query_file_path.exists():
-            raise FileNotFoundError(f'Query file not found: {query_path}')
-        return query_file_path.read_text(encoding='utf-8')
+        return self.queries.get(query_path).text
+
+    def _post(self, body: bytes) -> requests.Response:
+        request = requests.Request('POST', self.base_api_url, data=body, headers={'Content-Type': 'application/json'})
+        with self._session_lock:
+            prepared = self.session.prepare_request(request)
+            settings = self._send_settings.get(prepared.url)
+            if settings is None:
+                settings = self._send_settings[prepared.url] = self.session.merge_environment_settings(
+                    prepared.url, {}, None, None, None)
+        return self.session.send(prepared, allow_redirects=True, **settings)
 
-    def _do_request(self, data, attempt: int = 0):
-        response = self.session.post(self.base_api_url, json=data)
+    def _refresh(self, used_auth: str|None):
+        with self._session_lock:
+            if self.session.headers.get('Authorization') != used_auth:
+                # already refreshed by another thread
+                return
+            logger.debug(f'Try to refresh current token: {shorten_text(used_auth or "none", 20)}')
+            self.refresh()
+
+    def _send(self, data: dict) -> requests.Response:
+        if self._persisted_queries is None or 'query' not in data:
+            return self._post(encode_body(data))
+        # the hash is of the minified text, the same text is sent
+        compiled = self.queries.compile(data['query'])
+        data = {**data, 'query': compiled.text}
+        exchange = self._persisted_queries.exchange(self.base_api_url, data, compiled.sha256)
+        body = exchange.first_body()
+        while body is not None:
+            response = self._post(body)
+            body = exchange.next_body(response.status_code, response.content)
+        return response
+
+    def _do_request(self, data, attempt: int = 0, check_errors: bool = True):
+        auth = self.session.headers.get('Authorization')
+        response = self._send(data)
         if not response.ok:
             if response.status_code == 401:
-                logger.debug(
-                    f'Try to refresh current token: '
-                    f'{(shorten_text(self.session.headers.get("Authorization", "none"), 20))}')
-                self.refresh()
-            response = self.session.post(self.base_api_url, json=data)
+                self._refresh(auth)
+            response = self._send(data)
             if not response.ok:
                 logger.error(f"Request failed with status code: {response.status_code}")
 
@@ -156,15 +268,17 @@ class ApiClient:
                 resp_data = response.text
             raise RequestError(f'{resp_data}') from e
 
+        last_response_size.set(len(response.content))
         result = response.json()
 
         if self._is_unauthorized_error(result):
             if attempt >= config.API.MAX_LOGIN_ATTEMPTS:
                 emit('core.api.unauthorized_error', {'attempts': attempt})
                 raise AuthorizationError('You are not authorized')
-            self.refresh()
-            return self._do_request(data, attempt=attempt + 1)
-        self._check_response_errors(result)
+            self._refresh(auth)
+            return self._do_request(data, attempt=attempt + 1, check_errors=check_errors)
+        if check_errors:
+            self._check_response_errors(result)
         return result
 
     def _extract_error(self, data: dict):
@@ -205,21 +319,6 @@ class ApiClient:
         print(json.dumps(data, indent=2).replace('\\n', '\n'), flush=True)
         print('='*50)
 
-    def _remove_notset_values(self, data: dict, sentinel: type[NOTSET] = NOTSET):
-        if isinstance(data, dict):
-            keys_to_delete = []
-            for key, value in data.items():
-                if value is sentinel:
-                    keys_to_delete.append(key)
-                else:
-                    data[key] = self._remove_notset_values(value, sentinel)
-            for key in keys_to_delete:
-                del data[key]
-        elif isinstance(data, list):
-            for i in range(len(data)):
-                data[i] = self._remove_notset_values(data[i], sentinel)
-        return data
-
     def configure_context(self, *args, **kwargs):
         raise RuntimeError('Context proxy not configured. '
                            'Use env variable AGIO_USE_API_CLIENT_CONTEXT_PROXY=true '
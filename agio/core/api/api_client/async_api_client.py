@@ -0,0 +1,247 @@
+"""
+Asyncio client with the same query surface as ApiClient.
+
+Auth, query files, variables serialization and the response cache are shared
+with a sync client, a token refreshed by one of them is used by both.
+Requests go through a pooled keep-alive transport: httpx (HTTP/2 when ``h2``
+is installed, ``pip install agio-core[async]``) or a requests session driven
+by a thread pool when httpx is not available.
+Concurrency is bounded by ``AGIO_ASYNC_MAX_CONCURRENCY``.
+
+    client = AsyncApiClient()
+    entities = await asyncio.gather(*(aio.track.get_entity(i, client=client) for i in ids))
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from agio.core.api.api_client.api_client import last_response_size
+from agio.core.api.api_client.batching import AsyncQueryBatch
+from agio.core.api.api_client.encoding import encode_body
+from agio.core.config import config
+from agio.core.events import emit
+from agio.core.exceptions import RequestError, AuthorizationError
+from agio.tools.text_helpers import shorten_text
+
+logger = logging.getLogger(__name__)
+
+
+class _HttpxTransport:
+    def __init__(self, max_connections: int, timeout: float):
+        import httpx
+
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def post(self, url: str, content: bytes, headers: dict) -> tuple[int, bytes]:
+        response = await self._client.post(url, content=content, headers=headers)
+        return response.status_code, response.content
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class _ThreadedTransport:
+    """Pooled requests session, blocking calls run in own thread pool"""
+    def __init__(self, max_connections: int, timeout: float):
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix='agio-api')
+        self._timeout = timeout
+
+    def _post(self, url: str, content: bytes, headers: dict) -> tuple[int, bytes]:
+        response = self._session.post(url, data=content, headers=headers, timeout=self._timeout)
+        return response.status_code, response.content
+
+    async def post(self, url: str, content: bytes, headers: dict) -> tuple[int, bytes]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._post, url, content, headers)
+
+    async def aclose(self):
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+
+def _create_transport(max_connections: int, timeout: float):
+    try:
+        return _HttpxTransport(max_connections, timeout)
+    except ImportError:
+        logger.debug('httpx is not installed, use threaded transport')
+        return _ThreadedTransport(max_connections, timeout)
+
+
+class _LoopState:
+    """Transport and sync primitives are bound to the event loop"""
+    def __init__(self, max_concurrency: int, timeout: float):
+        self.transport = _create_transport(max_concurrency, timeout)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.refresh_lock = asyncio.Lock()
+
+
+class AsyncApiClient:
+    def __init__(self, sync_client=None, max_concurrency: int = None, timeout: float = None):
+        if sync_client is None:
+            from agio.core.api import client as sync_client
+        self.sync_client = sync_client
+        self.max_concurrency = max_concurrency or config.API.ASYNC_MAX_CONCURRENCY
+        self.timeout = timeout or config.API.API_REQUEST_TIMEOUT
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    @property
+    def base_api_url(self) -> str:
+        return self.sync_client.base_api_url
+
+    @property
+    def last_response_size(self) -> int:
+        return last_response_size.get()
+
+    def _get_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self.max_concurrency, self.timeout)
+        return state
+
+    async def aclose(self):
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.transport.aclose()
+
+    def load_query(self, query_path: str) -> str:
+        return self.sync_client.load_query(query_path)
+
+    async def make_query(self, query_file: str, **variables) -> dict:
+        """Read query from file and execute query"""
+        client = self.sync_client
+        query_text = client.load_query(query_file)
+        variables = client._prepare_variables(variables)
+        result = client._get_cached_response(query_file, query_text, variables)
+        if result is None:
+            result = await self._execute(query_text, variables)
+            client._store_cached_response(query_file, query_text, variables, result)
+        return result
+
+    async def make_query_raw(self, query: str, **variables) -> dict:
+        """Execute query from string"""
+        return await self._execute(self.sync_client.queries.compile(query).text,
+                                   self.sync_client._prepare_variables(variables))
+
+    def batch(self, max_size: int = 50) -> AsyncQueryBatch:
+        """
+        Collect queries and send them in merged requests
+        async with client.batch() as batch:
+            items = [batch.add('ws/package/getPackage', id=i) for i in ids]
+        """
+        return AsyncQueryBatch(self, max_size=max_size)
+
+    async def _execute(self, query: str, serialized: dict) -> dict:
+        client = self.sync_client
+        data = client._make_request_data(query, serialized)
+        if client._debug_query:
+            emit('core.api.debug_query_request_data', {'data': data})
+            client._pprint_request(data)
+        result = await self._do_request(data)
+        if client._debug_query:
+            emit('core.api.debug_query_response_data', {'data': result})
+            client._print_response(result)
+        return result
+
+    # shared with batch
+
+    def _make_request_data(self, query: str, serialized: dict) -> dict:
+        return self.sync_client._make_request_data(query, serialized)
+
+    def _check_response_errors(self, response: dict):
+        self.sync_client._check_response_errors(response)
+
+    def _get_cached_response(self, query_file: str|None, query_text: str, variables: dict) -> dict|None:
+        return self.sync_client._get_cached_response(query_file, query_text, variables)
+
+    def _store_cached_response(self, query_file: str|None, query_text: str, variables: dict, response: dict):
+        self.sync_client._store_cached_response(query_file, query_text, variables, response)
+
+    def _prepare_variables(self, variables: dict) -> dict:
+        return self.sync_client._prepare_variables(variables)
+
+    async def _post(self, state: _LoopState, content: bytes) -> tuple[int, bytes, str]:
+        auth = self.sync_client.session.headers.get('Authorization')
+        headers = {'Content-Type': 'application/json'}
+        if auth:
+            headers['Authorization'] = auth
+        async with state.semaphore:
+            status, body = await state.transport.post(self.base_api_url, content, headers)
+        return status, body, auth
+
+    async def _refresh(self, state: _LoopState, used_auth: str|None):
+        async with state.refresh_lock:
+            if self.sync_client.session.headers.get('Authorization') != used_auth:
+                # already refreshed by another request
+                return
+            logger.debug(f'Try to refresh current token: {shorten_text(used_auth or "none", 20)}')
+            await asyncio.to_thread(self.sync_client.refresh)
+
+    async def _send(self, state: _LoopState, data: dict) -> tuple[int, bytes, str]:
+        persisted_queries = self.sync_client.persisted_queries
+        if persisted_queries is None or 'query' not in data:
+            return await self._post(state, encode_body(data))
+        # the hash is of the minified text, the same text is sent
+        compiled = self.sync_client.queries.compile(data['query'])
+        data = {**data, 'query': compiled.text}
+        exchange = persisted_queries.exchange(self.base_api_url, data, compiled.sha256)
+        content = exchange.first_body()
+        while content is not None:
+            status, body, auth = await self._post(state, content)
+            content = exchange.next_body(status, body)
+        return status, body, auth
+
+    async def _do_request(self, data: dict, attempt: int = 0, check_errors: bool = True) -> dict:
+        state = self._get_state()
+        status, body, auth = await self._send(state, data)
+        if status >= 400:
+            if status == 401:
+                await self._refresh(state, auth)
+            status, body, auth = await self._send(state, data)
+            if status >= 400:
+                logger.error(f"Request failed with status code: {status}")
+        if status >= 400:
+            try:
+                resp_data = self.sync_client._extract_error(json.loads(body))
+            except ValueError:
+                resp_data = body.decode(errors='replace')
+            raise RequestError(f'{resp_data}')
+
+        last_response_size.set(len(body))
+        result = json.loads(body)
+
+        if self.sync_client._is_unauthorized_error(result):
+            if attempt >= config.API.MAX_LOGIN_ATTEMPTS:
+                emit('core.api.unauthorized_error', {'attempts': attempt})
+                raise AuthorizationError('You are not authorized')
+            await self._refresh(state, auth)
+            return await self._do_request(data, attempt=attempt + 1, check_errors=check_errors)
+        if check_errors:
+            self._check_response_errors(result)
+        return result
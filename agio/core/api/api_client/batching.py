@@ -0,0 +1,314 @@
+"""
+Batched query execution.
+
+Queries added to a batch are merged into one GraphQL document: variables get
+a per-query prefix and top level fields are aliased with the same prefix,
+so the response can be split back into separate results.
+
+    with client.batch() as batch:
+        results = [batch.add('ws/package/getPackage', id=pkg_id) for pkg_id in ids]
+    packages = [r.result()['data']['package'] for r in results]
+
+Documents with fragments or several operations are sent as separate requests.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from agio.core.api.api_client.query_registry import tokenize
+from agio.core.exceptions import RequestError
+
+if TYPE_CHECKING:
+    from .api_client import ApiClient
+    from .async_api_client import AsyncApiClient
+
+logger = logging.getLogger(__name__)
+
+class MergeNotSupported(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedOperation:
+    prefix: str
+    operation_type: str
+    variable_definitions: str
+    selections: str
+    # prefixed response key -> original response key
+    aliases: dict[str, str]
+
+
+def parse_operation(query: str, prefix: str) -> ParsedOperation:
+    """Rewrite single operation document with prefixed variables and top level aliases"""
+    tokens = tokenize(query)
+    if not tokens:
+        raise MergeNotSupported('Empty query')
+    pos = 0
+    operation_type = 'query'
+    if tokens[0] in ('query', 'mutation'):
+        operation_type = tokens[0]
+        pos = 1
+        if pos < len(tokens) and tokens[pos] not in ('(', '{'):
+            pos += 1  # operation name
+    elif tokens[0] != '{':
+        raise MergeNotSupported(f'Unsupported operation: {tokens[0]}')
+
+    def rename(token: str) -> str:
+        return f'${prefix}{token[1:]}' if token.startswith('$') else token
+
+    variable_definitions = []
+    if tokens[pos] == '(':
+        end = tokens.index(')', pos)
+        variable_definitions = [rename(t) for t in tokens[pos + 1:end]]
+        pos = end + 1
+    if tokens[pos] != '{':
+        raise MergeNotSupported('Directives on operation are not supported')
+
+    selections = []
+    aliases = {}
+    depth = paren_depth = 0
+    for i in range(pos, len(tokens)):
+        token = tokens[i]
+        if token == '{':
+            depth += 1
+            if depth == 1:
+                continue
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                if i != len(tokens) - 1:
+                    raise MergeNotSupported('Fragments and multiple operations are not supported')
+                break
+        elif token == '(':
+            paren_depth += 1
+        elif token == ')':
+            paren_depth -= 1
+        elif depth == 1 and paren_depth == 0:
+            if token == '...':
+                raise MergeNotSupported('Top level fragment spreads are not supported')
+            prev_token = tokens[i - 1]
+            if (token[0].isalpha() or token[0] == '_') and prev_token != '@':
+                next_token = tokens[i + 1] if i + 1 < len(tokens) else ''
+                if next_token == ':':
+                    # existing alias
+                    aliases[prefix + token] = token
+                    token = prefix + token
+                elif prev_token != ':':
+                    aliases[prefix + token] = token
+                    token = f'{prefix}{token}: {token}'
+        selections.append(rename(token))
+    return ParsedOperation(prefix, operation_type, ' '.join(variable_definitions), ' '.join(selections), aliases)
+
+
+def merge_operations(operations: list[ParsedOperation]) -> str:
+    operation_type = operations[0].operation_type
+    definitions = ', '.join(op.variable_definitions for op in operations if op.variable_definitions)
+    header = f'{operation_type} Batch({definitions})' if definitions else f'{operation_type} Batch'
+    body = '\n  '.join(op.selections for op in operations)
+    return f'{header} {{\n  {body}\n}}'
+
+
+def split_response(response: dict, operations: list[ParsedOperation]) -> list[dict]:
+    """Split merged response into responses of every operation"""
+    data = response.get('data') or {}
+    results = []
+    owners = {}
+    for op in operations:
+        result = {'data': {orig: data[alias] for alias, orig in op.aliases.items() if alias in data}}
+        results.append(result)
+        for alias in op.aliases:
+            owners[alias] = result
+    for error in response.get('errors') or ():
+        path = error.get('path')
+        owner = owners.get(path[0]) if path else None
+        if owner is None:
+            # not related to any field, every query gets it
+            targets = results
+        else:
+            error = dict(error, path=[_original_key(path[0], operations), *path[1:]])
+            targets = [owner]
+        for target in targets:
+            target.setdefault('errors', []).append(error)
+    return results
+
+
+def _original_key(alias: str, operations: list[ParsedOperation]) -> str:
+    for op in operations:
+        if alias in op.aliases:
+            return op.aliases[alias]
+    return alias
+
+
+class BatchResult:
+    """Deferred response of a query added to a batch"""
+    __slots__ = ('_batch', 'query', 'variables', 'query_file', '_response', '_error', '_done')
+
+    def __init__(self, batch: QueryBatch, query: str, variables: dict, query_file: str = None):
+        self._batch = batch
+        self.query = query
+        self.variables = variables
+        self.query_file = query_file
+        self._response = None
+        self._error = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def set_result(self, response: dict):
+        self._response = response
+        self._done = True
+
+    def set_error(self, error: Exception):
+        self._error = error
+        self._done = True
+
+    def result(self) -> dict:
+        """Response of this query, executes pending batch if required"""
+        if not self._done:
+            self._batch.execute()
+        if self._error is not None:
+            raise self._error
+        return self._response
+
+
+class QueryBatch:
+    def __init__(self, client: ApiClient | AsyncApiClient, max_size: int = 50):
+        self.client = client
+        self.max_size = max_size
+        self._pending: list[BatchResult] = []
+        self.requests_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.execute()
+
+    def add(self, query_file: str, **variables) -> BatchResult:
+        query_text = self.client.load_query(query_file)
+        return self._add(BatchResult(self, query_text, self.client._prepare_variables(variables), query_file))
+
+    def add_raw(self, query: str, **variables) -> BatchResult:
+        return self._add(BatchResult(self, query, self.client._prepare_variables(variables)))
+
+    def _add(self, item: BatchResult) -> BatchResult:
+        cached = self.client._get_cached_response(item.query_file, item.query, item.variables)
+        if cached is not None:
+            item.set_result(cached)
+        else:
+            self._pending.append(item)
+        return item
+
+    def execute(self):
+        for run in self._take_runs():
+            self._execute_run(run)
+
+    def _take_runs(self) -> list[list[tuple[BatchResult, ParsedOperation | None]]]:
+        pending, self._pending = self._pending, []
+        # keep order between queries and mutations: split to runs of the same operation type
+        runs: list[list[tuple[BatchResult, ParsedOperation | None]]] = []
+        for i, item in enumerate(pending):
+            try:
+                operation = parse_operation(item.query, f'q{i}_')
+            except (MergeNotSupported, ValueError, IndexError) as e:
+                logger.debug(f'Query sent separately: {e}')
+                runs.append([(item, None)])
+                continue
+            if runs and runs[-1][0][1] is not None and runs[-1][0][1].operation_type == operation.operation_type \
+                    and len(runs[-1]) < self.max_size:
+                runs[-1].append((item, operation))
+            else:
+                runs.append([(item, operation)])
+        return runs
+
+    def _execute_run(self, run: list[tuple[BatchResult, ParsedOperation | None]]):
+        data, operations = self._make_run_request(run)
+        try:
+            response = self.client._do_request(data, check_errors=operations is None)
+        except Exception as e:
+            for item, _ in run:
+                item.set_error(e)
+            return
+        self._set_run_response(run, operations, response)
+
+    def _make_run_request(self, run: list[tuple[BatchResult, ParsedOperation | None]]) -> tuple[dict, list | None]:
+        """Request data of the run, operations are None if the only query is sent as is"""
+        self.requests_count += 1
+        if len(run) == 1:
+            item = run[0][0]
+            return self.client._make_request_data(item.query, item.variables), None
+        operations = [op for _, op in run]
+        variables = {}
+        for item, operation in run:
+            variables.update({operation.prefix + key: value for key, value in item.variables.items()})
+        return self.client._make_request_data(merge_operations(operations), variables), operations
+
+    def _set_run_response(self, run: list[tuple[BatchResult, ParsedOperation | None]],
+                          operations: list[ParsedOperation] | None, response: dict):
+        if operations is None:
+            self._set_item_result(run[0][0], response)
+            return
+        for (item, _), sub_response in zip(run, split_response(response, operations)):
+            try:
+                self.client._check_response_errors(sub_response)
+            except RequestError as e:
+                item.set_error(e)
+            else:
+                self._set_item_result(item, sub_response)
+
+    def _set_item_result(self, item: BatchResult, response: dict):
+        item.set_result(response)
+        self.client._store_cached_response(item.query_file, item.query, item.variables, response)
+
+
+class AsyncQueryBatch(QueryBatch):
+    """
+    Batch of AsyncApiClient, merged requests of consecutive queries are sent concurrently
+        async with client.batch() as batch:
+            results = [batch.add('ws/package/getPackage', id=pkg_id) for pkg_id in ids]
+    """
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            await self.aexecute()
+
+    def __enter__(self):
+        raise TypeError('Use "async with" for batch of async client')
+
+    def execute(self):
+        raise RuntimeError('Batch of async client is not executed yet, use "await batch.aexecute()"')
+
+    async def aexecute(self):
+        group = []
+        for run in self._take_runs():
+            operation = run[0][1]
+            if operation is not None and operation.operation_type == 'query':
+                group.append(run)
+                continue
+            # mutations and unparsed queries keep their order
+            await self._execute_group(group)
+            group = []
+            await self._aexecute_run(run)
+        await self._execute_group(group)
+
+    async def _execute_group(self, runs: list):
+        if runs:
+            await asyncio.gather(*(self._aexecute_run(run) for run in runs))
+
+    async def _aexecute_run(self, run: list[tuple[BatchResult, ParsedOperation | None]]):
+        data, operations = self._make_run_request(run)
+        try:
+            response = await self.client._do_request(data, check_errors=operations is None)
+        except Exception as e:
+            for item, _ in run:
+                item.set_error(e)
+            return
+        self._set_run_response(run, operations, response)
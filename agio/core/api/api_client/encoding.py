@@ -0,0 +1,52 @@
+"""
+Request body encoding.
+
+Variables are converted to json types in one walk: NOTSET values are dropped,
+UUID, datetime and pydantic models are converted, source containers are not modified.
+The body is serialized to bytes once and posted as is.
+"""
+import json
+from collections.abc import Mapping
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from agio.core.api.utils import NOTSET
+from agio.core.exceptions import NotSupportedTypeError
+from agio.tools.json_serializer import JsonSerializer
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def to_json_value(value, sentinel=NOTSET):
+    cls = type(value)
+    if cls in _PLAIN_TYPES:
+        return value
+    if cls is dict or isinstance(value, Mapping):
+        return {key: to_json_value(val, sentinel) for key, val in value.items() if val is not sentinel}
+    if cls is list or cls is tuple or isinstance(value, (list, tuple, set, frozenset)):
+        return [to_json_value(val, sentinel) for val in value if val is not sentinel]
+    if isinstance(value, _PLAIN_TYPES):
+        # str and int subclasses, enums
+        return value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    if JsonSerializer.custom_hook:
+        try:
+            return to_json_value(JsonSerializer.custom_hook(value), sentinel)
+        except NotSupportedTypeError:
+            pass
+    raise TypeError(f'Object of type {cls.__name__} is not JSON serializable')
+
+
+def prepare_variables(variables: dict) -> dict:
+    return to_json_value(variables)
+
+
+def encode_body(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
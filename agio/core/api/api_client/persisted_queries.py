@@ -0,0 +1,159 @@
+"""
+Automatic persisted queries (APQ).
+
+A query unknown to the server is sent as text with its sha256 hash, the
+server registers it and next requests send only the hash. Hashes accepted
+by the server are remembered on disk per server url.
+If the server lost the query (PersistedQueryNotFound) the text is sent again,
+if it does not support APQ (PersistedQueryNotSupported) it is disabled for the server.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from functools import cache
+from pathlib import Path
+
+import diskcache
+
+from agio.core.api.api_client.encoding import encode_body
+from agio.core.config import config
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = 'PersistedQueryNotFound'
+NOT_SUPPORTED = 'PersistedQueryNotSupported'
+_ERROR_CODES = {
+    'PERSISTED_QUERY_NOT_FOUND': NOT_FOUND,
+    'PERSISTED_QUERY_NOT_SUPPORTED': NOT_SUPPORTED,
+}
+
+
+def persisted_query_error(content: bytes) -> str | None:
+    if b'PersistedQuery' not in content and b'PERSISTED_QUERY' not in content:
+        return None
+    try:
+        errors = json.loads(content).get('errors') or ()
+    except (ValueError, AttributeError):
+        return None
+    for error in errors:
+        message = error.get('message')
+        if message in (NOT_FOUND, NOT_SUPPORTED):
+            return message
+        code = (error.get('extensions') or {}).get('code')
+        if code in _ERROR_CODES:
+            return _ERROR_CODES[code]
+    return None
+
+
+class PersistedQueries:
+    def __init__(self, path: str | Path, max_age: float = 30 * 24 * 3600):
+        self.path = Path(path)
+        self.max_age = max_age
+        self._db = None
+        self._known: set[tuple[str, str]] = set()
+        self._unsupported: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> diskcache.Cache:
+        if self._db is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._db = diskcache.Cache(self.path.as_posix())
+        return self._db
+
+    def is_supported(self, server_url: str) -> bool:
+        return server_url not in self._unsupported
+
+    def disable(self, server_url: str):
+        logger.debug(f'Persisted queries are not supported by {server_url}')
+        self._unsupported.add(server_url)
+
+    def is_known(self, server_url: str, query_hash: str) -> bool:
+        key = (server_url, query_hash)
+        if key in self._known:
+            return True
+        if self.db.get(key):
+            with self._lock:
+                self._known.add(key)
+            return True
+        return False
+
+    def add(self, server_url: str, query_hash: str):
+        key = (server_url, query_hash)
+        if key not in self._known:
+            with self._lock:
+                self._known.add(key)
+            self.db.set(key, True, expire=self.max_age)
+
+    def discard(self, server_url: str, query_hash: str):
+        key = (server_url, query_hash)
+        with self._lock:
+            self._known.discard(key)
+        self.db.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._known.clear()
+            self._unsupported.clear()
+        self.db.clear()
+
+    def exchange(self, server_url: str, data: dict, query_hash: str) -> PersistedQueryExchange:
+        return PersistedQueryExchange(self, server_url, data, query_hash)
+
+
+class PersistedQueryExchange:
+    """
+    Bodies to send for one request, independent of transport:
+        body = exchange.first_body()
+        while body is not None:
+            response = post(body)
+            body = exchange.next_body(response.status_code, response.content)
+    """
+    HASH, FULL, PLAIN = 'hash', 'full', 'plain'
+
+    def __init__(self, store: PersistedQueries, server_url: str, data: dict, query_hash: str):
+        self.store = store
+        self.server_url = server_url
+        self.data = data
+        self.query_hash = query_hash
+        self.stage = None
+
+    def _body(self, stage: str) -> bytes:
+        self.stage = stage
+        if stage == self.PLAIN:
+            return encode_body(self.data)
+        data = dict(self.data, extensions={'persistedQuery': {'version': 1, 'sha256Hash': self.query_hash}})
+        if stage == self.HASH:
+            del data['query']
+        return encode_body(data)
+
+    def first_body(self) -> bytes:
+        if not self.store.is_supported(self.server_url):
+            return self._body(self.PLAIN)
+        if self.store.is_known(self.server_url, self.query_hash):
+            return self._body(self.HASH)
+        return self._body(self.FULL)
+
+    def next_body(self, status: int, content: bytes) -> bytes | None:
+        """Body of the next attempt, None if the response is final"""
+        if self.stage == self.PLAIN or status == 401:
+            return None
+        error = persisted_query_error(content)
+        if error == NOT_SUPPORTED:
+            self.store.disable(self.server_url)
+            return self._body(self.PLAIN)
+        if self.stage == self.HASH:
+            if error == NOT_FOUND or status >= 400:
+                self.store.discard(self.server_url, self.query_hash)
+                return self._body(self.FULL)
+            return None
+        if error is None and status < 400:
+            self.store.add(self.server_url, self.query_hash)
+        return None
+
+
+@cache
+def get_persisted_queries() -> PersistedQueries:
+    return PersistedQueries(config.API.PERSISTED_QUERIES_DIR)
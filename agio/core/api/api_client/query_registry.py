@@ -0,0 +1,133 @@
+"""
+Compiled GraphQL documents.
+
+All files under ``queries/`` are read and minified once, on first use.
+Every document has a precomputed sha256 used for cache keys and persisted queries.
+Template markers like ``#{{PARENT-QUERY}}#`` are kept on their own line.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from functools import cache, lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(
+    r'"""(?:[^"\\]|\\.|"(?!""))*"""'                   # block string
+    r'|"(?:[^"\\\n]|\\.)*"'                            # string
+    r'|#[^\n]*'                                        # comment
+    r'|\$?[_A-Za-z][_0-9A-Za-z]*'                      # name or variable
+    r'|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?'               # number
+    r'|\.\.\.'                                         # spread
+    r'|[^\s,]',                                        # punctuation
+    re.S
+)
+TEMPLATE_MARKER_RE = re.compile(r'#\{\{[\w-]+}}#')
+_OPERATION_TYPES = ('query', 'mutation', 'subscription')
+
+
+def tokenize(query: str, keep_markers: bool = False) -> list[str]:
+    """Significant tokens of the document, comments and commas are skipped"""
+    return [t for t in TOKEN_RE.findall(query)
+            if not t.startswith('#') or (keep_markers and TEMPLATE_MARKER_RE.fullmatch(t.strip()))]
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char in '_$'
+
+
+def minify_query(query: str) -> str:
+    parts = []
+    prev = ''
+    for token in tokenize(query, keep_markers=True):
+        if token.startswith('#'):
+            parts.append(f'\n{token.strip()}\n')
+            prev = ''
+            continue
+        if prev and _is_word(prev[-1]) and _is_word(token[0]):
+            parts.append(' ')
+        parts.append(token)
+        prev = token
+    return ''.join(parts).strip()
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledQuery:
+    text: str
+    sha256: str
+    operation_type: str
+    path: str | None = None
+
+    @classmethod
+    def from_text(cls, text: str, path: str = None) -> CompiledQuery:
+        text = minify_query(text)
+        first = text.split('(', 1)[0].split('{', 1)[0].split(' ', 1)[0]
+        return cls(
+            text=text,
+            sha256=hashlib.sha256(text.encode()).hexdigest(),
+            operation_type=first if first in _OPERATION_TYPES else 'query',
+            path=path,
+        )
+
+
+class QueryRegistry:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._queries: dict[str, CompiledQuery] | None = None
+        self._by_text: dict[str, CompiledQuery] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_path(query_path: str) -> str:
+        query_path = query_path.replace('\\', '/').strip('/')
+        if query_path.endswith('.graphql'):
+            query_path = query_path[:-len('.graphql')]
+        return query_path
+
+    def _load(self) -> dict[str, CompiledQuery]:
+        with self._lock:
+            if self._queries is None:
+                queries = {}
+                for folder, _, files in os.walk(self.root):
+                    for file_name in files:
+                        if not file_name.endswith('.graphql'):
+                            continue
+                        file_path = Path(folder, file_name)
+                        path = file_path.relative_to(self.root).with_suffix('').as_posix()
+                        queries[path] = CompiledQuery.from_text(file_path.read_text(encoding='utf-8'), path)
+                self._by_text.update({query.text: query for query in queries.values()})
+                self._queries = queries
+                logger.debug(f'Loaded {len(queries)} queries from {self.root}')
+        return self._queries
+
+    def get(self, query_path: str) -> CompiledQuery:
+        try:
+            return (self._queries or self._load())[self.normalize_path(query_path)]
+        except KeyError:
+            raise FileNotFoundError(f'Query file not found: {query_path}') from None
+
+    def compile(self, text: str) -> CompiledQuery:
+        """Compiled document of query text, loaded documents are returned as is"""
+        query = self._by_text.get(text)
+        if query is None:
+            query = _compile_text(text)
+        return query
+
+    def __len__(self):
+        return len(self._queries or self._load())
+
+
+@lru_cache(maxsize=256)
+def _compile_text(text: str) -> CompiledQuery:
+    return CompiledQuery.from_text(text)
+
+
+@cache
+def get_query_registry(root: str | Path) -> QueryRegistry:
+    return QueryRegistry(root)
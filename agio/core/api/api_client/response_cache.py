@@ -0,0 +1,169 @@
+"""
+Persistent cache of read-only GraphQL responses.
+
+Entries are keyed on query text hash, normalized variables and auth identity.
+TTL and tags per query file come from ``queries/cache_policy.yml``.
+Invalidation is generation based: every tag has a counter stored in the cache
+and included in the entry key, a mutation bumps counters of its tags so old
+entries are never read again and expire on their own.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import fnmatch
+import hashlib
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from functools import cache, lru_cache
+from pathlib import Path
+
+import diskcache
+import yaml
+
+from agio.core.config import config
+
+logger = logging.getLogger(__name__)
+
+ALL_TAGS = '*'
+# token claims that change on every refresh and don't affect response content
+_VOLATILE_CLAIMS = ('exp', 'iat', 'nbf', 'jti', 'auth_time')
+_OPERATION_RE = re.compile(r'^\s*(?:#[^\n]*\n\s*)*(query|mutation|subscription|\{)')
+
+
+@dataclass(frozen=True, slots=True)
+class QueryCachePolicy:
+    ttl: float = 0
+    tags: tuple[str, ...] = ()
+    is_mutation: bool = False
+
+
+def get_operation_type(query_text: str) -> str:
+    match = _OPERATION_RE.match(query_text)
+    if not match or match.group(1) == '{':
+        return 'query'
+    return match.group(1)
+
+
+@lru_cache(maxsize=8)
+def token_identity(token: str | None) -> str:
+    """Stable hash of user identity, independent of token refresh"""
+    if not token:
+        return 'anonymous'
+    parts = token.split('.')
+    if len(parts) == 3:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+        except (ValueError, binascii.Error):
+            payload = None
+        if isinstance(payload, dict):
+            claims = {k: v for k, v in payload.items() if k not in _VOLATILE_CLAIMS}
+            return hashlib.sha256(json.dumps(claims, sort_keys=True).encode()).hexdigest()[:32]
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+class ResponseCache:
+    def __init__(self, path: str | Path, policy_file: str | Path, size_limit: int = 2 ** 28):
+        self.path = Path(path)
+        self.policy_file = Path(policy_file)
+        self.size_limit = size_limit
+        self._db = None
+        self._rules = None
+        self._policies: dict[str, QueryCachePolicy | None] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    @property
+    def db(self) -> diskcache.Cache:
+        if self._db is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._db = diskcache.Cache(self.path.as_posix(), size_limit=self.size_limit)
+        return self._db
+
+    def _load_rules(self) -> dict:
+        if self._rules is None:
+            if self.policy_file.exists():
+                self._rules = yaml.safe_load(self.policy_file.read_text(encoding='utf-8')) or {}
+            else:
+                logger.warning(f'Response cache policy file not found: {self.policy_file}')
+                self._rules = {}
+        return self._rules
+
+    def get_policy(self, query_file: str, query_text: str) -> QueryCachePolicy | None:
+        """Policy of the query file, None means do not cache and do not invalidate"""
+        query_path = Path(query_file).with_suffix('').as_posix().strip('/')
+        if query_path in self._policies:
+            return self._policies[query_path]
+        rules = self._load_rules()
+        folder = query_path.rpartition('/')[0]
+        policy = None
+        if get_operation_type(query_text) == 'mutation':
+            for pattern, invalidates in (rules.get('mutations') or {}).items():
+                if fnmatch.fnmatchcase(query_path, pattern):
+                    policy = QueryCachePolicy(tags=(folder, *invalidates), is_mutation=True)
+                    break
+            else:
+                policy = QueryCachePolicy(tags=(folder,), is_mutation=True)
+        else:
+            for pattern, rule in (rules.get('queries') or {}).items():
+                if fnmatch.fnmatchcase(query_path, pattern):
+                    rule = rule or {}
+                    if rule.get('ttl'):
+                        policy = QueryCachePolicy(ttl=float(rule['ttl']), tags=(folder, *rule.get('tags', ())))
+                    break
+        self._policies[query_path] = policy
+        return policy
+
+    def _make_key(self, query_text: str, variables: dict, identity: str, tags: tuple[str, ...]) -> str:
+        generations = [self.db.get(('tag', tag), 0) for tag in (ALL_TAGS, *tags)]
+        payload = json.dumps([variables, identity, generations], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(query_text.encode() + b'\0' + payload.encode()).hexdigest()
+
+    def get(self, policy: QueryCachePolicy, query_text: str, variables: dict, identity: str) -> dict | None:
+        result = self.db.get(self._make_key(query_text, variables, identity, policy.tags))
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def set(self, policy: QueryCachePolicy, query_text: str, variables: dict, identity: str, response: dict) -> None:
+        self.db.set(self._make_key(query_text, variables, identity, policy.tags), response, expire=policy.ttl)
+        with self._lock:
+            self.stores += 1
+
+    def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            self.db.incr(('tag', tag), default=0)
+        with self._lock:
+            self.invalidations += 1
+        logger.debug(f'Response cache invalidated: {", ".join(tags)}')
+
+    def clear(self) -> None:
+        self.db.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                stores=self.stores,
+                invalidations=self.invalidations,
+            )
+
+
+@cache
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache shared by all api clients"""
+    return ResponseCache(
+        path=config.API.RESPONSE_CACHE_DIR,
+        policy_file=Path(__file__).parent.parent.joinpath('queries', 'cache_policy.yml'),
+        size_limit=config.API.RESPONSE_CACHE_SIZE_LIMIT,
+    )
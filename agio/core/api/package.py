@@ -1,6 +1,9 @@
+import itertools
 from typing import Iterator
 from uuid import UUID
 
+from packaging.utils import canonicalize_name
+
 from agio.core.api import client as default_client
 from agio.core.api.utils import NOTSET, api_call
 from agio.core.api.utils.query_tools import iter_query_list
@@ -16,6 +19,14 @@ def get_package(package_id: str|UUID, client=default_client) -> dict:
     )['data']['package']
 
 
+@api_call
+def get_packages(package_ids: list[str|UUID], client=default_client) -> list[dict]:
+    """Several packages in one request"""
+    with client.batch() as batch:
+        results = [batch.add('ws/package/getPackage', id=package_id) for package_id in package_ids]
+    return [result.result()['data']['package'] for result in results]
+
+
 @api_call
 def create_package(name: str, client=default_client) -> str:
     return client.make_query(
@@ -156,6 +167,59 @@ def iter_package_releases(package_id: UUID|str, limit: int = None, client=defaul
     )
 
 
+def _iter_releases_by_exact_names(package_names: list[str], items_per_page: int, client) -> Iterator[tuple[str, dict]]:
+    """Releases with the package name they were requested by, first pages of all names in one batch"""
+    query = 'ws/release/getPackageReleasesByPackageName'
+    with client.batch() as batch:
+        results = [
+            (name, batch.add(query, packageName=name, first=items_per_page, afterCursor=None))
+            for name in package_names
+        ]
+    for name, result in results:
+        page = result.result()['data']['packageReleases']
+        for edge in page['edges']:
+            yield name, edge['node']
+        if page['pageInfo']['hasNextPage']:
+            # more than a page of releases, the rest is fetched separately
+            for node in itertools.islice(iter_query_list(
+                    query,
+                    entities_data_key='packageReleases',
+                    variables={'packageName': name},
+                    items_per_page=items_per_page,
+                    client=client
+            ), len(page['edges']), None):
+                yield name, node
+
+
+@api_call
+def iter_package_releases_by_package_names(
+        package_names: list[str],
+        items_per_page: int = 200,
+        client=default_client
+    ) -> Iterator[dict]:
+    """
+    Releases of all given packages, matched by exact name in one batched request.
+    Names without releases are looked up in the package list ignoring case and -/_/. differences
+    """
+    package_names = sorted(set(package_names))
+    if not package_names:
+        return
+    found = set()
+    for name, release in _iter_releases_by_exact_names(package_names, items_per_page, client):
+        found.add(name)
+        yield release
+    missing = {canonicalize_name(name) for name in package_names if name not in found}
+    if not missing:
+        return
+    stored_names = sorted(
+        package['name'] for package in iter_packages(client=client)
+        if canonicalize_name(package['name']) in missing and package['name'] not in package_names
+    )
+    if stored_names:
+        for _, release in _iter_releases_by_exact_names(stored_names, items_per_page, client):
+            yield release
+
+
 @api_call
 def update_package_release(
         release_id: UUID|str,
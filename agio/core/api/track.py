@@ -164,6 +164,20 @@ def get_entity(entity_id: str|UUID, client=default_client) -> dict:
     raise EntityNotExists(detail='Entity not found: {}'.format(entity_id))
 
 
+@api_call
+def get_entities(entity_ids: list[str|UUID], client=default_client) -> list[dict]:
+    """Several entities in one request"""
+    with client.batch() as batch:
+        results = [batch.add('track/entities/getEntityById', id=str(entity_id)) for entity_id in entity_ids]
+    entities = []
+    for entity_id, result in zip(entity_ids, results):
+        edges = result.result()['data']['entities']['edges']
+        if not edges:
+            raise EntityNotExists(detail='Entity not found: {}'.format(entity_id))
+        entities.append(edges[0]['node'])
+    return entities
+
+
 @api_call
 def get_entity_hierarchy(entity_id: str|UUID, depth: int = 10, include_source: bool = False, client=default_client) -> tuple[dict]:
     query_text = client.load_query('track/entities/getEntityHierarchy.graphql')
@@ -311,16 +325,19 @@ def get_entity_children(entity_id: str|UUID, client=default_client) -> Generator
 
 
 @api_call
-def get_entity_parent(entity: str|UUID|dict) -> list:
-    parents = []
+def get_entity_parent(entity: str|UUID|dict, client=default_client) -> list:
+    """
+    Parents from the nearest one without the root entity,
+    resolved with the cached hierarchy index of the project.
+    """
+    from agio.core.entities.hierarchy import get_project_hierarchy
+
     if isinstance(entity, UUID|str):
-        next_entity = get_entity(entity)
-    else:
-        next_entity = entity
-    while next_entity['parentId']:
-        parents.append(next_entity)
-        next_entity = get_entity(next_entity['parentId'])
-    return parents[1:]
+        entity = get_entity(entity, client=client)
+    if not entity['parentId']:
+        return []
+    index = get_project_hierarchy(entity['projectId'], client=client)
+    return index.ancestors(entity['id'], client=client)[:0:-1]
 
 # entity classes
 
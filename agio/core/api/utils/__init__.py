@@ -15,7 +15,7 @@ R = TypeVar('R')
 def api_call(func: Callable[P, R]) -> Callable[P, R]:
     from agio.core.api import client
 
-    # TODO add cache
+    # responses are cached by the client itself, see ApiClient.make_query
     # TODO add logs
 
     @wraps(func)
@@ -1,7 +1,178 @@
-from collections import defaultdict
-from typing import Iterator
+import contextvars
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, Callable
 
 from agio.core.api import client as default_client
+from agio.core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PaginationStats:
+    """Counters of one iter_query_list iteration"""
+    pages: int = 0
+    items: int = 0
+    bytes: int = 0
+    # from the first request to the end of iteration
+    wall_time: float = 0.0
+    # sum of request times, greater than wall_time means pages were fetched in background
+    fetch_time: float = 0.0
+    prefetched_pages: int = 0
+    page_sizes: list[int] = field(default_factory=list)
+    # iteration stopped before the last page
+    cancelled: bool = False
+
+    def add_page(self, items_count: int, page_size: int, elapsed: float, size_bytes: int):
+        self.pages += 1
+        self.items += items_count
+        self.bytes += size_bytes
+        self.fetch_time += elapsed
+        self.page_sizes.append(page_size)
+
+
+class PageSizer:
+    """
+    Page size adapted to observed response time and size:
+    doubled while full pages are fast and small, halved when they are slow or large
+    """
+    def __init__(self, initial: int, maximum: int = None, target_time: float = None, max_bytes: int = None,
+                 adaptive: bool = None):
+        self.maximum = max(maximum or config.API.MAX_ITEMS_PER_PAGE, initial)
+        self.minimum = min(initial, 10)
+        self.target_time = target_time or config.API.PAGINATION_TARGET_PAGE_TIME
+        self.max_bytes = max_bytes or config.API.PAGINATION_MAX_PAGE_BYTES
+        self.adaptive = config.API.PAGINATION_ADAPTIVE if adaptive is None else adaptive
+        self.size = initial
+
+    def next_size(self, remaining: int = None) -> int:
+        if remaining is not None:
+            return max(1, min(self.size, remaining))
+        return self.size
+
+    def observe(self, items_count: int, page_size: int, elapsed: float, size_bytes: int):
+        if not self.adaptive or items_count < page_size:
+            # last or limited page says nothing about the speed
+            return
+        if elapsed > self.target_time or size_bytes > self.max_bytes:
+            self.size = max(self.minimum, self.size // 2)
+        elif elapsed < self.target_time / 2 and size_bytes < self.max_bytes / 2:
+            self.size = min(self.maximum, self.size * 2)
+
+
+_PageFetcher = Callable[[str | None, int], tuple[list, str | None]]
+
+
+def _make_page_fetcher(client, query: str, entities_data_key: str, variables: dict, limit: int | None,
+                       sizer: PageSizer, stats: PaginationStats) -> _PageFetcher:
+    def fetch_page(cursor: str | None, received: int) -> tuple[list, str | None]:
+        """Page edges and cursor of the next page, None if there is no next page"""
+        page_size = sizer.next_size(None if limit is None else limit - received)
+        start = time.perf_counter()
+        response = client.make_query(
+            query,
+            **variables,
+            first=page_size,
+            afterCursor=cursor,
+        )
+        elapsed = time.perf_counter() - start
+        data = response['data'][entities_data_key]
+        items = data['edges']
+        size_bytes = client.last_response_size
+        stats.add_page(len(items), page_size, elapsed, size_bytes)
+        sizer.observe(len(items), page_size, elapsed, size_bytes)
+        if not items:
+            return items, None
+        page_info = data['pageInfo']
+        if not page_info['hasNextPage']:
+            return items, None
+        if page_info['endCursor'] == cursor:
+            raise ValueError('Next and previous cursors is match!')
+        return items, page_info['endCursor']
+    return fetch_page
+
+
+class _PagePrefetcher:
+    """Fetch next pages in background thread, at most `depth` pages ahead of the consumer"""
+    def __init__(self, fetch_page: _PageFetcher, cursor: str, received: int, limit: int | None, depth: int):
+        self._fetch_page = fetch_page
+        self._cursor = cursor
+        self._received = received
+        self._limit = limit
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        # run in the caller context, the client may be a context proxy
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(target=context.run, args=(self._run,), name='agio-page-prefetch', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        cursor, received = self._cursor, self._received
+        try:
+            while not self._stop.is_set():
+                items, cursor = self._fetch_page(cursor, received)
+                received += len(items)
+                done = cursor is None or (self._limit is not None and received >= self._limit)
+                if not self._put((items, None, done)) or done:
+                    return
+        except Exception as e:
+            self._put((None, e, True))
+
+    def __iter__(self) -> Iterator[list]:
+        while True:
+            items, error, done = self._queue.get()
+            if error is not None:
+                raise error
+            yield items
+            if done:
+                return
+
+
+def _iter_pages(fetch_page: _PageFetcher, limit: int | None, prefetch: int, stats: PaginationStats) -> Iterator[list]:
+    items, cursor = fetch_page(None, 0)
+    received = len(items)
+    if cursor is None or (limit is not None and received >= limit):
+        yield items
+        return
+    if prefetch <= 0:
+        yield items
+        while cursor is not None and (limit is None or received < limit):
+            items, cursor = fetch_page(cursor, received)
+            received += len(items)
+            yield items
+        return
+    prefetcher = _PagePrefetcher(fetch_page, cursor, received, limit, prefetch)
+    # without a limit over the first page the consumer may stop early,
+    # prefetch starts when the next page is requested
+    if limit is not None:
+        prefetcher.start()
+    try:
+        yield items
+        if limit is None:
+            prefetcher.start()
+        for items in prefetcher:
+            stats.prefetched_pages += 1
+            yield items
+    finally:
+        prefetcher.stop()
 
 
 def iter_query_list(query: str,
@@ -9,7 +180,8 @@ def iter_query_list(query: str,
                     variables: dict = None,
                     limit: int = None,
                     items_per_page: int = 50,
-                    client=default_client
+                    client=default_client,
+                    stats: PaginationStats = None,
                     ) -> Iterator[dict]:
     """
     required in response:
@@ -20,31 +192,35 @@ def iter_query_list(query: str,
         startCursor
         endCursor
     }
+
+    Next pages are fetched in background while the current one is consumed (AGIO_PAGINATION_PREFETCH),
+    from the request of the second page, or right away if `limit` is over the first page.
+    items_per_page is the initial page size, it adapts to response time and size (AGIO_PAGINATION_ADAPTIVE).
+    `limit` is the maximum number of items, pages are never larger than the remaining count.
+    Stopping the iteration cancels pending prefetch. Pass PaginationStats to collect counters.
     """
-    current_cursor = None
     variables = variables or {}
+    stats = stats if stats is not None else PaginationStats()
+    sizer = PageSizer(items_per_page)
+    fetch_page = _make_page_fetcher(client, query, entities_data_key, variables, limit, sizer, stats)
+    pages = _iter_pages(fetch_page, limit, config.API.PAGINATION_PREFETCH, stats)
+    start = time.perf_counter()
     count = 0
-    while True:
-        response = client.make_query(
-            query,
-            **variables,
-            first=items_per_page,
-            afterCursor=current_cursor,
-        )
-        items = response['data'][entities_data_key]['edges']
-        if not items:
-            break
-        for item in items:
-            yield item['node']
-            # check limit
-            if limit is not None:
-                count += 1
-                if count >= limit:
-                    return
-        page_info = response['data'][entities_data_key]['pageInfo']
-        if page_info['hasNextPage']:
-            if page_info['endCursor'] == current_cursor:
-                raise ValueError('Next and previous cursors is match!')
-            current_cursor = page_info['endCursor']
-        else:
-            break
+    finished = False
+    try:
+        for items in pages:
+            for item in items:
+                yield item['node']
+                # check limit
+                if limit is not None:
+                    count += 1
+                    if count >= limit:
+                        finished = True
+                        return
+        finished = True
+    finally:
+        pages.close()
+        stats.wall_time = time.perf_counter() - start
+        stats.cancelled = not finished
+        logger.debug(f'{query}: {stats.items} items, {stats.pages} pages, {stats.bytes} bytes, '
+                     f'{stats.wall_time:.3f}s')
@@ -1,13 +1,33 @@
 import os
+from typing import Callable
 
 import click
 
 from agio.core.plugins import plugin_hub
+from agio.core.plugins.lazy_plugin import LazyPlugin
 from agio.core.workspaces.workspace import AWorkspaceManager, DefaultWorkspaceError
-from agio.tools import launching, env_names
+from agio.tools import launching, env_names, startup_profiler
 
 
 class CustomGroup(click.Group):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # commands created on first use
+        self.lazy_commands: dict[str, Callable[[], click.Command]] = {}
+
+    def add_lazy_command(self, name: str, loader: Callable[[], click.Command]):
+        self.lazy_commands[name] = loader
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        cmd = super().get_command(ctx, cmd_name)
+        if cmd is None and cmd_name in self.lazy_commands:
+            cmd = self.lazy_commands.pop(cmd_name)()
+            self.add_command(cmd, cmd_name)
+        return cmd
+
     def resolve_command(self, ctx, args):
         try:
             cmd, cmd_name, args = super().resolve_command(ctx, args)
@@ -111,8 +131,13 @@ def load_plugins():
     """
     all_command_plugins = list(plugin_hub.APluginHub.instance().get_plugins_by_type('command'))
     for plugin in all_command_plugins:
-        agio_group.add_command(plugin.command)
+        if isinstance(plugin, LazyPlugin) and not plugin.is_loaded and plugin.__dict__.get('command_name'):
+            agio_group.add_lazy_command(plugin.command_name, lambda p=plugin: p.command)
+        else:
+            agio_group.add_command(plugin.command)
 
 
 # init command plugins from all packages
-load_plugins()
+with startup_profiler.phase('cli.load_plugins'):
+    load_plugins()
+startup_profiler.mark('cli.ready')
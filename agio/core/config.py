@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings as BaseConfig, SettingsConfigDict
 
-from agio.tools import local_dirs
+from agio.tools import local_dirs, startup_profiler
 
 env_file_path = local_dirs.config_dir() / 'core_config.env'
 
@@ -30,6 +30,30 @@ class ApiSettings(_BaseSettings):
     MAX_LOGIN_ATTEMPTS: int = 2
     # binary file
     LOGIN_BINARY: str|None = None
+    # persistent cache of read-only query responses, ttl per query in queries/cache_policy.yml
+    RESPONSE_CACHE: bool = False
+    RESPONSE_CACHE_DIR: str = local_dirs.cache_dir('api-responses').as_posix()
+    RESPONSE_CACHE_SIZE_LIMIT: int = 256 * 1024 ** 2
+    # parallel requests of AsyncApiClient
+    ASYNC_MAX_CONCURRENCY: int = 16
+    # paginated queries: pages fetched ahead in background (0 - disabled),
+    # page size adapts to response time and size within MAX_ITEMS_PER_PAGE
+    PAGINATION_PREFETCH: int = 2
+    PAGINATION_ADAPTIVE: bool = True
+    PAGINATION_TARGET_PAGE_TIME: float = 0.5
+    PAGINATION_MAX_PAGE_BYTES: int = 4 * 1024 ** 2
+    MAX_ITEMS_PER_PAGE: int = 200
+    # automatic persisted queries: send query hash instead of text when the server knows it
+    PERSISTED_QUERIES: bool = False
+    PERSISTED_QUERIES_DIR: str = local_dirs.cache_dir('api-persisted-queries').as_posix()
+    # entities loaded by the client are shared by id, data older than ttl is reloaded on access (0 - no ttl),
+    # fields missing in partial entity data are loaded on access, data.get() included
+    IDENTITY_MAP: bool = False
+    IDENTITY_MAP_TTL: float = 300
+    # project entity tree kept in memory, loaded again when older than this
+    HIERARCHY_MAX_AGE: float = 60
+    # minimum seconds between loads of the entity tree caused by unknown entity ids
+    HIERARCHY_MISS_INTERVAL: float = 5
 
 
 class WorkspaceSettings(_BaseSettings):
@@ -37,21 +61,41 @@ class WorkspaceSettings(_BaseSettings):
     RESOURCES_DIR: str = ""
     CACHE_ROOT: str = local_dirs.cache_dir().as_posix()
     INSTALL_DIR: str = local_dirs.workspaces_install_dir().as_posix()
+    # seconds, lock of an interrupted install is released after it
+    INSTALL_LOCK_TIMEOUT: int = 3 * 3600
+    # workspaces not used for this number of days are removed by "ws clean"
+    GC_MAX_AGE_DAYS: int = 14
+    # bytes of workspaces and caches kept by "ws clean", least recently used are removed above it, 0 - no limit
+    GC_SIZE_BUDGET: int = 0
 
 
 class PackagesConfig(_BaseSettings):
     STORE_URL: str = "https://store.agio.services"  # TODO
+    # wheels of workspace installs are downloaded before the package manager runs
+    WHEEL_CACHE: bool = True
+    WHEEL_CACHE_DIR: str = local_dirs.cache_dir('wheels').as_posix()
+    WHEEL_PREFETCH_THREADS: int = 4
 
 
 class CLIConfig(_BaseSettings):
     DISABLE_CUSTOM_PIPE_RESULT: bool = False
 
 
+class EventsConfig(_BaseSettings):
+    # workers and queue size for callbacks subscribed with mode="thread"
+    CALLBACK_THREADS: int = 4
+    CALLBACK_QUEUE_SIZE: int = 1000
+    # seconds to wait for background callbacks on exit
+    CALLBACK_DRAIN_TIMEOUT: float = 5
+
+
 class CoreConfig(BaseConfig):
     API: ApiSettings = ApiSettings()
     WS: WorkspaceSettings = WorkspaceSettings()
     PKG: PackagesConfig = PackagesConfig()
     CLI: CLIConfig = CLIConfig()
+    EVENTS: EventsConfig = EventsConfig()
 
 
-config = CoreConfig()
\ No newline at end of file
+with startup_profiler.phase('core.config'):
+    config = CoreConfig()
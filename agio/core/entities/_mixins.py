@@ -2,7 +2,6 @@ from __future__ import annotations
 from functools import cached_property
 from typing import TYPE_CHECKING
 
-from agio.core import api
 if TYPE_CHECKING:
     from agio.core.entities import AEntity
 
@@ -16,6 +15,5 @@ class EntityRelationMixin:
     def entity(self) -> AEntity|None:
         from agio.core.entities import AEntity
         if self.entity_id:
-            entity_data = api.track.get_entity(self.entity_id, client=self.client)
-            return AEntity.from_data(entity_data)
+            return AEntity.from_id(self.entity_id, client=self.client)
         return None
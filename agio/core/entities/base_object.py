@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import functools
 import json
-from abc import ABC, abstractmethod
+import weakref
+from abc import ABCMeta, abstractmethod
 from datetime import datetime
 from functools import cached_property
 from typing import Iterator
@@ -9,36 +11,191 @@ from uuid import UUID
 
 from agio.core.api import client as default_client, ApiClient
 from agio.tools import modules
+from agio.tools.identity_map import IdentityMap
 
 
-class BaseObject(ABC):
+class _ObjectData(dict):
+    """
+    Object fields, fields missing in partial data are loaded with one request on first access,
+    get() included. Partial data is hydrated only for clients with the identity map (API.IDENTITY_MAP)
+    """
+    __slots__ = ('_owner', 'complete')
+
+    def __init__(self, data: dict, owner: BaseObject, complete: bool = False):
+        super().__init__(data)
+        self._owner = weakref.ref(owner)
+        self.complete = complete
+
+    def _hydrate(self, key) -> bool:
+        if self.complete or not isinstance(key, str) or key.startswith('_'):
+            return False
+        owner = self._owner()
+        if owner is None:
+            return False
+        known_fields = type(owner)._known_fields
+        if known_fields is not None and key not in known_fields:
+            return False
+        owner._load_missing_fields()
+        return key in self
+
+    def __missing__(self, key):
+        if self._hydrate(key):
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key not in self:
+            self._hydrate(key)
+        return dict.get(self, key, default)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def _object_id(data) -> str | None:
+    if isinstance(data, str):
+        return data
+    if isinstance(data, UUID):
+        return str(data)
+    if isinstance(data, dict) and data.get('id'):
+        return str(data['id'])
+    return None
+
+
+def _get_identity_map(client) -> IdentityMap | None:
+    return getattr(client or default_client, 'identity_map', None)
+
+
+class _BaseObjectMeta(ABCMeta):
+    """
+    Objects of one type with the same id created with the same client are the same instance
+    """
+    def __call__(cls, data, client: ApiClient = None):
+        identity_map = _get_identity_map(client)
+        object_id = _object_id(data)
+        if identity_map is None or object_id is None:
+            return super().__call__(data, client=client)
+        obj = cls.get_cached(object_id, client=client)
+        if obj is not None:
+            if isinstance(data, dict):
+                obj._merge_data(data)
+            return obj
+        obj = super().__call__(data, client=client)
+        identity_map.add((cls.object_name, object_id), obj)
+        return obj
+
+
+class BaseObject(metaclass=_BaseObjectMeta):
     """
     Base class for database entity
     """
     object_name = None
+    # fields of complete object data, learned from the first loaded object
+    _known_fields: frozenset | None = None
 
     def __init__(self, data: str | UUID | dict, client: ApiClient = None):
         if self.object_name is None:
             raise AttributeError(f"object_name not set for {self.__class__.__name__}")
+        self._client = client or default_client
         if isinstance(data, (str, UUID)):
             # from ID
-            self._data: dict = self.get_data(data)
-            if not self._data:
+            object_data = self.get_data(data, client=self._client)
+            if not object_data:
                 raise Exception(f"No data found for {data}")
+            self._set_data(object_data, complete=True)
         elif isinstance(data, dict):
-            # from data
-            self._data: dict = data
-            if set(self._data.keys()) == {'type', 'id'}:
+            # from data, missing fields are loaded on access
+            self._set_data(data)
+            if _get_identity_map(self._client) is None and data.keys() == {'type', 'id'}:
+                # without hydration a stub is loaded right away
                 self.reload()
         else:
             raise TypeError(f'entity must be a string or dict: {type(data)}')
-        fields_data = self._data.get('fields')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, hook in (('update', cls._after_update), ('delete', cls._after_delete)):
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, '__isabstractmethod__', False):
+                setattr(cls, name, _with_hook(method, hook))
+
+    @classmethod
+    def get_cached(cls, object_id: str | UUID, client: ApiClient = None) -> BaseObject | None:
+        """Live instance of this type from the client identity map, data older than ttl is marked for reload"""
+        identity_map = _get_identity_map(client)
+        if identity_map is None:
+            return None
+        key = (cls.object_name, str(object_id))
+        obj = identity_map.get(key)
+        if not isinstance(obj, cls):
+            return None
+        if identity_map.is_expired(key):
+            obj.invalidate()
+            identity_map.touch(key)
+        return obj
+
+    def _set_data(self, data: dict, complete: bool = False):
+        # without the identity map objects keep the data they are created with
+        hydrate = _get_identity_map(self._client) is not None
+        data = _ObjectData(data, self, complete or not hydrate)
+        fields_data = dict.get(data, 'fields')
         if isinstance(fields_data, str):
-            self.data['fields'] = json.loads(fields_data)
-        self._client = client or default_client
+            data['fields'] = json.loads(fields_data)
+        if complete:
+            cls = type(self)
+            cls._known_fields = frozenset(data) | (cls._known_fields or frozenset())
+        self._data = data
+
+    def _merge_data(self, data: dict):
+        if data is self._data or data.keys() <= {'id', 'type'}:
+            return
+        complete = self._data.complete
+        self._set_data({**self._data, **data})
+        self._data.complete = complete
+        self._clear_cached_properties()
+
+    def _load_missing_fields(self):
+        self._data.complete = True
+        data = self.get_data(self.id, client=self.client)
+        if data:
+            loaded = _ObjectData(data, self, True)
+            fields_data = dict.get(loaded, 'fields')
+            if isinstance(fields_data, str):
+                loaded['fields'] = json.loads(fields_data)
+            for key, value in loaded.items():
+                self._data.setdefault(key, value)
+            cls = type(self)
+            cls._known_fields = frozenset(loaded) | (cls._known_fields or frozenset())
+
+    def _clear_cached_properties(self):
+        for cls in type(self).__mro__:
+            for name, attr in cls.__dict__.items():
+                if isinstance(attr, cached_property):
+                    self.__dict__.pop(name, None)
+
+    def invalidate(self):
+        """Drop loaded data and cached properties, fields are loaded again on next access"""
+        self._data = _ObjectData({'id': self.id}, self)
+        self._clear_cached_properties()
+
+    def _after_update(self, data_before: dict):
+        if self._data is data_before:
+            # not reloaded by update
+            self.invalidate()
+        else:
+            self._clear_cached_properties()
+
+    def _after_delete(self, data_before: dict):
+        identity_map = _get_identity_map(self.client)
+        if identity_map is not None and identity_map.get((self.object_name, str(self.id))) is self:
+            identity_map.discard((self.object_name, str(self.id)))
+        self._clear_cached_properties()
 
     def reload(self):
-        self._data = self.get_data(self.id)
+        data = self.get_data(self.id, client=self.client)
+        if not data:
+            raise Exception(f"No data found for {self.id}")
+        self._set_data(data, complete=True)
 
     @property
     def client(self):
@@ -101,7 +258,7 @@ class BaseObject(ABC):
 
     @classmethod
     @abstractmethod
-    def get_data(cls, object_id: str) -> dict:
+    def get_data(cls, object_id: str, client: ApiClient = None) -> dict:
         raise NotImplementedError()
 
     @abstractmethod
@@ -140,3 +297,13 @@ class BaseObject(ABC):
         class_dotted_path = entity_data.pop('_')
         _cls = modules.import_object_by_dotted_path(class_dotted_path)
         return _cls(entity_data)
+
+
+def _with_hook(method, hook):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        data_before = self._data
+        result = method(self, *args, **kwargs)
+        hook(self, data_before)
+        return result
+    return wrapper
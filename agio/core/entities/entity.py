@@ -9,6 +9,7 @@ from uuid import UUID
 from agio.core import api
 from ._mixins import EntityRelationMixin
 from .base_object import BaseObject
+from .hierarchy import EntityHierarchyIndex, get_project_hierarchy
 if TYPE_CHECKING:
     from .project import AProject
 
@@ -72,7 +73,7 @@ class AEntity(EntityRelationMixin, BaseObject):
     @cached_property
     def fields(self):
         fields_data = self._data.get('fields')
-        if not fields_data:
+        if fields_data is None:
             self.reload()
         fields_data = self._data.get('fields')
         if isinstance(fields_data, dict):
@@ -99,6 +100,9 @@ class AEntity(EntityRelationMixin, BaseObject):
             raise KeyError('Field id is missing')
         entity_class = entity_data.get('class', {}).get('name')
         if entity_class is None:
+            cached = AEntity.get_cached(entity_id, client=client)
+            if cached is not None:
+                return type(cached)(entity_data, client=client)
             entity_data = api.track.get_entity(entity_id, client=client)
             entity_class = entity_data.get('class', {}).get('name')
         cls_ = cls.find_entity_class(entity_class)
@@ -108,6 +112,9 @@ class AEntity(EntityRelationMixin, BaseObject):
 
     @classmethod
     def from_id(cls, entity_id: str, client=None) -> T_Entity:
+        cached = AEntity.get_cached(entity_id, client=client)
+        if cached is not None:
+            return cached
         entity_data = api.track.get_entity(entity_id, client=client)
         entity_class = entity_data.get('class', {}).get('name')
         cls_ = cls.find_entity_class(entity_class)
@@ -116,6 +123,11 @@ class AEntity(EntityRelationMixin, BaseObject):
         else:
             return cls_(entity_data, client=client)
 
+    @classmethod
+    def from_ids(cls, entity_ids: list[str], client=None) -> list[T_Entity]:
+        """Load several entities with one request"""
+        return [cls.from_data(data, client=client) for data in api.track.get_entities(entity_ids, client=client)]
+
     @property
     def name(self):
         return self._data['name']
@@ -139,7 +151,7 @@ class AEntity(EntityRelationMixin, BaseObject):
     @cached_property
     def project(self) -> 'AProject':
         from .project import AProject
-        return AProject(self.project_id)
+        return AProject(self.project_id, client=self.client)
 
     @classmethod
     def find_entity_class(cls, class_name: str) -> type[T_Entity]|None:
@@ -161,24 +173,31 @@ class AEntity(EntityRelationMixin, BaseObject):
     def add_child(self, child: T_Entity) -> None:
         ...
 
-    def _load_parents_data(self, depth: int = 10):
-        return api.track.get_entity_hierarchy(self.id, depth, False, client=self.client)
+    def get_hierarchy_index(self) -> EntityHierarchyIndex:
+        return get_project_hierarchy(self.project_id, client=self.client)
 
     def get_parents(self) -> Generator[T_Entity|None]:
-        items = self._load_parents_data(10)
-        if not items:
-            return
-        for item in items:
-            yield self.from_data(item)
+        """Parents from the project root"""
+        for item in self.get_hierarchy_index().ancestors(self.id, client=self.client):
+            yield self.from_data(item, client=self.client)
 
-    @cached_property
+    def iter_descendants(self) -> Generator[T_Entity]:
+        for item in self.get_hierarchy_index().descendants(self.id, client=self.client):
+            yield self.from_data(item, client=self.client)
+
+    @property
+    def depth(self) -> int:
+        return self.get_hierarchy_index().depth(self.id, client=self.client)
+
+    @property
     def hierarchy(self) -> str:
-        return '/'.join([x['name'] for x in self._load_parents_data()])
+        """Path of parent names"""
+        return self.get_hierarchy_index().path(self.id, include_self=False, client=self.client)
 
     @cached_property
     def parent(self) -> AEntity | None:
         if self._data.get('parent'):
-            return AEntity.from_id(self._data['parent']['id'])
+            return AEntity.from_id(self._data['parent']['id'], client=self.client)
         return None
 
     @property
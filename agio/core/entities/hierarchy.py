@@ -0,0 +1,215 @@
+"""
+In-memory entity tree of a project.
+
+The short entity list of a project is loaded once and kept as parent-pointer
+arrays with an id -> index map, so ancestors, descendants, paths and depth
+are resolved without requests. ``refresh()`` loads the list again, an index
+older than HIERARCHY_MAX_AGE is refreshed on the next ``get_project_hierarchy()``.
+An unknown id loads the list again at most once per HIERARCHY_MISS_INTERVAL.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Iterator
+from uuid import UUID
+
+from agio.core import api
+from agio.core.config import config
+from agio.core.exceptions import EntityNotExists
+
+logger = logging.getLogger(__name__)
+
+NO_PARENT = -1
+
+
+class EntityHierarchyIndex:
+    def __init__(self, project_id: str | UUID):
+        self.project_id = str(project_id)
+        self._ids: list[str] = []
+        self._index: dict[str, int] = {}
+        self._names: list[str] = []
+        self._classes: list[str] = []
+        self._class_ids: list[str | None] = []
+        self._fields: list[dict | str | None] = []
+        self._parent_ids: list[str | None] = []
+        self._parents = array('q')
+        self._children: dict[int, list[int]] | None = None
+        self._paths: dict[int, tuple[str, ...]] = {}
+        self.loaded_at: float | None = None
+        self._lock = threading.RLock()
+
+    # loading
+
+    def load(self, client=None) -> EntityHierarchyIndex:
+        nodes = list(api.track.iter_entities(
+            self.project_id, short=True, items_per_page=config.API.MAX_ITEMS_PER_PAGE, client=client))
+        with self._lock:
+            self._ids, self._index, self._names, self._parent_ids = [], {}, [], []
+            self._classes, self._class_ids, self._fields = [], [], []
+            self._apply(nodes)
+        logger.debug(f'Loaded hierarchy of project {self.project_id}: {len(nodes)} entities')
+        return self
+
+    def refresh(self, client=None) -> int:
+        """Load the entity list again, created, changed and deleted entities are picked up"""
+        self.load(client=client)
+        return len(self)
+
+    def ensure_loaded(self, client=None, max_age: float = None) -> EntityHierarchyIndex:
+        if self.loaded_at is None:
+            self.load(client=client)
+        elif max_age is not None and time.monotonic() - self.loaded_at > max_age:
+            self.refresh(client=client)
+        return self
+
+    def _apply(self, nodes: list[dict]):
+        for node in nodes:
+            entity_id = node['id']
+            i = self._index.get(entity_id)
+            if i is None:
+                self._index[entity_id] = len(self._ids)
+                self._ids.append(entity_id)
+                self._names.append(node['name'])
+                self._classes.append(node['class']['name'])
+                self._class_ids.append(node['class'].get('id'))
+                self._fields.append(node.get('fields'))
+                self._parent_ids.append(node.get('parentId'))
+            else:
+                self._names[i] = node['name']
+                self._classes[i] = node['class']['name']
+                self._class_ids[i] = node['class'].get('id')
+                self._fields[i] = node.get('fields')
+                self._parent_ids[i] = node.get('parentId')
+        # parents may be listed after children, pointers are resolved when all ids are known
+        self._parents = array('q', (self._index.get(parent_id, NO_PARENT) if parent_id else NO_PARENT
+                                    for parent_id in self._parent_ids))
+        self._children = None
+        self._paths.clear()
+        self.loaded_at = time.monotonic()
+
+    def _position(self, entity_id: str | UUID, client=None) -> int:
+        entity_id = str(entity_id)
+        i = self._index.get(entity_id)
+        if i is None:
+            # created after the last load, loaded again at most once per interval for all unknown ids
+            with self._lock:
+                i = self._index.get(entity_id)
+                if i is None and time.monotonic() - self.loaded_at >= config.API.HIERARCHY_MISS_INTERVAL:
+                    self.refresh(client=client)
+                    i = self._index.get(entity_id)
+            if i is None:
+                raise EntityNotExists(detail=f'Entity {entity_id} not found in project {self.project_id}')
+        return i
+
+    # queries
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, entity_id: str | UUID) -> bool:
+        return str(entity_id) in self._index
+
+    def _node(self, i: int) -> dict:
+        node = {
+            'id': self._ids[i],
+            'name': self._names[i],
+            'class': {'name': self._classes[i]},
+            'parentId': self._parent_ids[i],
+            'projectId': self.project_id,
+        }
+        if self._class_ids[i] is not None:
+            node['class']['id'] = self._class_ids[i]
+        if self._fields[i] is not None:
+            node['fields'] = self._fields[i]
+        return node
+
+    def get(self, entity_id: str | UUID, client=None) -> dict:
+        """Short entity data: id, name, class, fields and parent id"""
+        return self._node(self._position(entity_id, client))
+
+    def parent_id(self, entity_id: str | UUID, client=None) -> str | None:
+        parent = self._parents[self._position(entity_id, client)]
+        return None if parent == NO_PARENT else self._ids[parent]
+
+    def _iter_ancestors(self, i: int) -> Iterator[int]:
+        seen = {i}
+        i = self._parents[i]
+        while i != NO_PARENT and i not in seen:
+            yield i
+            seen.add(i)
+            i = self._parents[i]
+
+    def ancestors(self, entity_id: str | UUID, include_self: bool = False, client=None) -> list[dict]:
+        """Ancestors from the root to the entity"""
+        i = self._position(entity_id, client)
+        positions = list(self._iter_ancestors(i))[::-1]
+        if include_self:
+            positions.append(i)
+        return [self._node(p) for p in positions]
+
+    def depth(self, entity_id: str | UUID, client=None) -> int:
+        """Number of ancestors, 0 for root entities"""
+        return sum(1 for _ in self._iter_ancestors(self._position(entity_id, client)))
+
+    def path(self, entity_id: str | UUID, include_self: bool = True, sep: str = '/', client=None) -> str:
+        i = self._position(entity_id, client)
+        names = self._paths.get(i)
+        if names is None:
+            names = self._paths[i] = tuple(self._names[p] for p in reversed(list(self._iter_ancestors(i))))
+        if include_self:
+            names += (self._names[i],)
+        return sep.join(names)
+
+    def paths(self, entity_ids: list[str | UUID], include_self: bool = True, sep: str = '/', client=None) -> dict[str, str]:
+        return {str(entity_id): self.path(entity_id, include_self, sep, client=client) for entity_id in entity_ids}
+
+    def _children_map(self) -> dict[int, list[int]]:
+        with self._lock:
+            if self._children is None:
+                children: dict[int, list[int]] = {}
+                for i, parent in enumerate(self._parents):
+                    children.setdefault(parent, []).append(i)
+                self._children = children
+            return self._children
+
+    def children(self, entity_id: str | UUID | None, client=None) -> list[dict]:
+        """Direct children, root entities for None"""
+        i = NO_PARENT if entity_id is None else self._position(entity_id, client)
+        return [self._node(c) for c in self._children_map().get(i, ())]
+
+    def descendants(self, entity_id: str | UUID, client=None) -> list[dict]:
+        """All descendants, breadth first"""
+        children = self._children_map()
+        result = []
+        queue = deque(children.get(self._position(entity_id, client), ()))
+        seen = set(queue)
+        while queue:
+            i = queue.popleft()
+            result.append(i)
+            for child in children.get(i, ()):
+                if child not in seen:
+                    seen.add(child)
+                    queue.append(child)
+        return [self._node(i) for i in result]
+
+
+_indexes: dict[str, EntityHierarchyIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_hierarchy(project_id: str | UUID, client=None) -> EntityHierarchyIndex:
+    """Shared index of a project, loaded again when older than HIERARCHY_MAX_AGE"""
+    with _indexes_lock:
+        index = _indexes.get(str(project_id))
+        if index is None:
+            index = _indexes[str(project_id)] = EntityHierarchyIndex(project_id)
+    return index.ensure_loaded(client=client, max_age=config.API.HIERARCHY_MAX_AGE)
+
+
+def clear_hierarchy_cache():
+    with _indexes_lock:
+        _indexes.clear()
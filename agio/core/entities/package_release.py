@@ -83,7 +83,7 @@ class APackageRelease(BaseObject):
 
     def get_package(self) -> "APackage":
         from .package import APackage
-        return APackage(self.get_package_id())
+        return APackage(self.get_package_id(), client=self.client)
 
     def get_assets(self):
         return self._data.get('assets', {}).get('whl')
@@ -91,8 +91,22 @@ class APackageRelease(BaseObject):
     def get_version(self):
         return self._data.get('name')
 
-    def get_installation_command(self, **kwargs):
-        package = self.get_package()
+    @classmethod
+    def get_installation_commands(cls, releases: list[APackageRelease], **kwargs) -> list[str]:
+        """Commands for several releases, packages required to build commands are loaded in one request"""
+        from .package import APackage
+
+        without_assets = [rel for rel in releases if not rel.get_assets()]
+        packages = {}
+        if without_assets:
+            client = without_assets[0].client
+            package_ids = list(dict.fromkeys(rel.get_package_id() for rel in without_assets))
+            for data in api.package.get_packages(package_ids, client=client):
+                packages[data['id']] = APackage(data, client=client)
+        return [rel.get_installation_command(package=packages.get(rel.get_package_id()), **kwargs)
+                for rel in releases]
+
+    def get_installation_command(self, package: APackage = None, **kwargs):
         # force_download = kwargs.pop('force_download', False)
 
         if assets := self.get_assets():
@@ -121,7 +135,7 @@ class APackageRelease(BaseObject):
                     raise PackageError(f"Error fetching package {self}, file not found: {url}")
                 cmd = path
             return cmd
-        elif package.source_url:
+        elif (package := package or self.get_package()).source_url:
             # use source repository path. Repository must be installable! (pyproject.toml)
             cmd = os.path.expandvars(Path(package.source_url).expanduser())
         else:
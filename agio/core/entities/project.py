@@ -10,6 +10,7 @@ from agio.core import settings
 from agio.core.entities import company as company_entity
 from agio.core.entities import workspace as ws, BaseObject
 from agio.core.entities import workspace_revision
+from agio.core.entities.hierarchy import EntityHierarchyIndex, get_project_hierarchy
 from agio.core.settings import settings_hub
 from agio.core.settings.settings_hub import LocalSettingsHub
 
@@ -69,8 +70,12 @@ class AProject(BaseObject):
     def company_id(self):
         return self._data.get('companyId') or self._data.get('company', {}).get('id')
 
+    def get_hierarchy(self) -> EntityHierarchyIndex:
+        """Entity tree of the project, loaded once and shared"""
+        return get_project_hierarchy(self.id, client=self.client)
+
     def get_company(self):
-        return company_entity.ACompany(self._data['company']['id'])
+        return company_entity.ACompany(self.company_id, client=self.client)
 
     @cached_property
     def company(self):
@@ -84,15 +89,15 @@ class AProject(BaseObject):
         workspace_dict = self._data['workspace']
         if workspace_dict is None:
             if self.revision_id:
-                revision = workspace_revision.AWorkspaceRevision(self.revision_id)
+                revision = workspace_revision.AWorkspaceRevision(self.revision_id, client=self.client)
                 return revision.get_workspace()
             return None
         else:
-            return ws.AWorkspace(workspace_dict['id'])
+            return ws.AWorkspace(workspace_dict['id'], client=self.client)
 
     def get_revision(self) -> workspace_revision.AWorkspaceRevision|None:
         if self.revision_id:
-            return workspace_revision.AWorkspaceRevision(self.revision_id)
+            return workspace_revision.AWorkspaceRevision(self.revision_id, client=self.client)
         else:
             workspace = self.get_workspace()
             if workspace:
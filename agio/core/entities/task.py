@@ -17,8 +17,8 @@ class ATask(entity.AEntity):
 
     @cached_property
     def entity(self) -> entity.AEntity:
-        return entity.AEntity.from_id(self._data['parent']['id'])
+        return entity.AEntity.from_id(self._data['parent']['id'], client=self.client)
 
     @cached_property
     def project(self):
-        return project.AProject(self._data['projectId'])
+        return project.AProject(self._data['projectId'], client=self.client)
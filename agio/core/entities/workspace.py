@@ -110,7 +110,7 @@ class AWorkspace(BaseObject):
     def get_company(self):
         from .company import ACompany
 
-        return ACompany(self.company_id)
+        return ACompany(self.company_id, client=self.client)
 
     def _find_release(self, input_data: dict|str|APackageRelease|APackage) -> APackageRelease:
         if isinstance(input_data, APackageRelease):
@@ -95,7 +95,7 @@ class AWorkspaceRevision(BaseObject):
     def get_workspace(self):
         from agio.core.entities import AWorkspace
 
-        return AWorkspace(self.workspace_id)
+        return AWorkspace(self.workspace_id, client=self.client)
 
     def get_comment(self):
         return self._data.get("comment")
@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import Callable, Any, Union
 
 from agio.core.events.event_hub import EventHub
+from agio.tools import startup_profiler
 from agio.tools.modules import import_module_by_path
 from .event import AEvent
 
@@ -18,7 +19,19 @@ def emit(event_name: str, payload: Any = None) -> AEvent:
     return event_hub.emit(event_name, payload)
 
 
+async def emit_async(event_name: str, payload: Any = None) -> AEvent:
+    if payload is not None:
+        if not isinstance(payload, dict):
+            raise TypeError("payload must be a dict")
+    return await event_hub.emit_async(event_name, payload)
+
+
 def subscribe(event_name: Union[str, list[str]], callback_func: Callable = None, /, raise_error=False, **kwargs):
+    """
+    Register callback for event name or pattern.
+    mode: "sync" (default) runs the callback inside emit(), "thread" on the worker pool,
+    "async" as a task of the running asyncio loop
+    """
 
     def register(func: Callable):
         added = event_hub.add_callback(event_name, func, raise_error=raise_error, **kwargs)
@@ -69,8 +82,14 @@ def subscribe_manager(event_name, func, raise_error=False, **kwargs):
         unsubscribe(func, event_name)
 
 
+def drain(timeout: float = None) -> bool:
+    """Wait for callbacks delivered in background, False if some are still running"""
+    return event_hub.drain(timeout)
+
+
 def register_callbacks(path_list: list[str]):
     for path, pkg in path_list:
         rel_path = Path(path).relative_to(pkg.root.parent)
         name = '.'.join([*rel_path.parts[:-1], Path(path).stem])
-        import_module_by_path(path, name)
+        with startup_profiler.span(name, 'callback', package=pkg.package_name, file=str(path)):
+            import_module_by_path(path, name)
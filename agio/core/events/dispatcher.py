@@ -0,0 +1,151 @@
+"""
+Background delivery of event callbacks.
+
+Callbacks subscribed with ``mode='thread'`` run on a bounded worker pool.
+Jobs of one event name run one after another in emit order, different event
+names run in parallel. ``submit()`` blocks while the queue is full.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackStats:
+    __slots__ = ('calls', 'errors', 'total_time', 'max_time')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def add(self, duration: float, failed: bool):
+        self.calls += 1
+        self.errors += failed
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'avg_time': self.total_time / self.calls if self.calls else 0.0,
+            'max_time': self.max_time,
+        }
+
+
+class ThreadDispatcher:
+    def __init__(self, max_workers: int = 4, max_queue_size: int = 1000):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self._lanes: dict[str, deque] = {}
+        # event names with jobs and no worker
+        self._ready: deque[str] = deque()
+        self._pending = 0
+        self._running = 0
+        self._workers: list[threading.Thread] = []
+        self._idle_workers = 0
+        self._worker_ids: set[int] = set()
+        self._cond = threading.Condition()
+        # metrics
+        self.max_queue_depth = 0
+        self.wait_stats = CallbackStats()
+        self.callback_stats: defaultdict[str, CallbackStats] = defaultdict(CallbackStats)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def submit(self, event_name: str, callback: Callable, event, callback_name: str = None):
+        job = (callback, event, callback_name or getattr(callback, '__name__', str(callback)), time.perf_counter())
+        with self._cond:
+            # callbacks emitting events don't wait, the queue may be full of their own jobs
+            if threading.get_ident() not in self._worker_ids:
+                while self._pending >= self.max_queue_size:
+                    self._cond.wait()
+            lane = self._lanes.get(event_name)
+            if lane is None:
+                lane = self._lanes[event_name] = deque()
+                self._ready.append(event_name)
+            lane.append(job)
+            self._pending += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._pending)
+            if self._idle_workers:
+                self._cond.notify_all()
+            elif len(self._workers) < self.max_workers:
+                self._start_worker()
+
+    def _start_worker(self):
+        worker = threading.Thread(target=self._work, name=f'agio-events-{len(self._workers)}', daemon=True)
+        self._workers.append(worker)
+        worker.start()
+
+    def _work(self):
+        with self._cond:
+            self._worker_ids.add(threading.get_ident())
+        while True:
+            with self._cond:
+                while not self._ready:
+                    self._idle_workers += 1
+                    self._cond.wait()
+                    self._idle_workers -= 1
+                event_name = self._ready.popleft()
+                lane = self._lanes[event_name]
+                self._running += 1
+            # the lane belongs to this worker until it is empty
+            while True:
+                with self._cond:
+                    if not lane:
+                        del self._lanes[event_name]
+                        self._running -= 1
+                        self._cond.notify_all()
+                        break
+                    callback, event, callback_name, queued_at = lane.popleft()
+                    self._pending -= 1
+                    self._cond.notify_all()
+                self._run(callback, event, callback_name, queued_at)
+
+    def _run(self, callback: Callable, event, callback_name: str, queued_at: float):
+        start = time.perf_counter()
+        failed = False
+        try:
+            callback(event)
+        except Exception:
+            failed = True
+            logger.exception(f"Callback {callback_name} for event {event.name} failed in background thread.")
+        end = time.perf_counter()
+        with self._cond:
+            self.wait_stats.add(start - queued_at, False)
+            self.callback_stats[callback_name].add(end - start, failed)
+
+    def drain(self, timeout: float = None) -> bool:
+        """Wait until all submitted callbacks are done, False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running:
+                if threading.get_ident() in self._worker_ids:
+                    # a callback can't wait for itself
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    logger.warning(f'Event queue not drained in {timeout} s, {self._pending} callbacks left')
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def metrics(self) -> dict:
+        with self._cond:
+            return {
+                'queue_depth': self._pending,
+                'max_queue_depth': self.max_queue_depth,
+                'running': self._running,
+                'workers': len(self._workers),
+                'queue_wait': self.wait_stats.to_dict(),
+                'callbacks': {name: stats.to_dict() for name, stats in self.callback_stats.items()},
+            }
@@ -1,19 +1,104 @@
+import asyncio
+import concurrent.futures
+import inspect
 import logging
+import os
+import re
+import threading
+import time
 from collections import defaultdict
-from fnmatch import fnmatch
+from fnmatch import translate
 from typing import Callable
 
+from agio.core.events.dispatcher import ThreadDispatcher
 from agio.core.events.event import AEvent
 from agio.core.exceptions import StopEventPropagate, EventRuntimeError, CallbackInitError
 from agio.tools.singleton import Singleton
 
 logger = logging.getLogger(__name__)
 
+WILDCARD_CHARS = re.compile(r'[*?\[]')
+# distinct event names with resolved callbacks
+RESOLVED_CACHE_SIZE = 4096
+# delivery modes
+SYNC = 'sync'       # in the emitting thread, before emit() returns
+THREAD = 'thread'   # on the worker pool, in emit order per event name
+ASYNC = 'async'     # as a task of the asyncio loop running at subscription or emit
+DELIVERY_MODES = (SYNC, THREAD, ASYNC)
+
+
+async def _call_async(callback: Callable, event: AEvent):
+    result = callback(event)
+    if inspect.isawaitable(result):
+        await result
+
 
 class EventHub(metaclass=Singleton):
     """Registering callbacks and executing them when an event occurs"""
     def __init__(self):
         self._callbacks: defaultdict[str, dict[Callable, dict]] = defaultdict(dict)
+        # event name -> matched patterns with their callbacks, rebuilt after any change of callbacks
+        self._resolved: dict[str, tuple[tuple[str, tuple[tuple[Callable, dict], ...]], ...]] = {}
+        self._index: tuple[dict[str, list[str]], dict[str, Callable], Callable | None] | None = None
+        self._dispatcher: ThreadDispatcher | None = None
+        self._dispatcher_lock = threading.Lock()
+        # futures of async callbacks scheduled to loops of other threads
+        self._async_futures: set[concurrent.futures.Future] = set()
+
+    @property
+    def dispatcher(self) -> ThreadDispatcher:
+        if self._dispatcher is None:
+            with self._dispatcher_lock:
+                if self._dispatcher is None:
+                    from agio.core.config import config
+
+                    self._dispatcher = ThreadDispatcher(config.EVENTS.CALLBACK_THREADS, config.EVENTS.CALLBACK_QUEUE_SIZE)
+        return self._dispatcher
+
+    def _invalidate(self):
+        self._index = None
+        self._resolved = {}
+
+    def _build_index(self) -> tuple[dict[str, list[str]], dict[str, Callable], Callable | None]:
+        """
+        Exact names map to patterns directly, wildcard patterns are compiled once
+        and joined into one regex to skip names matching none of them
+        """
+        exact: dict[str, list[str]] = defaultdict(list)
+        wildcards: dict[str, Callable] = {}
+        # snapshot, callbacks may be added from other threads while emitting
+        for pattern in list(self._callbacks):
+            normalized = os.path.normcase(pattern)
+            if WILDCARD_CHARS.search(pattern):
+                wildcards[pattern] = re.compile(translate(normalized)).match
+            else:
+                exact[normalized].append(pattern)
+        any_wildcard = None
+        if wildcards:
+            any_wildcard = re.compile('|'.join(translate(os.path.normcase(p)) for p in wildcards)).match
+        return dict(exact), wildcards, any_wildcard
+
+    def _resolve(self, event_name: str) -> tuple[tuple[str, tuple[tuple[Callable, dict], ...]], ...]:
+        """Patterns matching the event name with their callbacks, in registration order"""
+        resolved = self._resolved.get(event_name)
+        if resolved is not None:
+            return resolved
+        index = self._index
+        if index is None:
+            index = self._index = self._build_index()
+        exact, wildcards, any_wildcard = index
+        name = os.path.normcase(event_name)
+        matched = set(exact.get(name, ()))
+        if any_wildcard is not None and any_wildcard(name):
+            matched.update(pattern for pattern, match in wildcards.items() if match(name))
+        resolved = tuple(
+            (pattern, tuple(callbacks.items()))
+            for pattern, callbacks in list(self._callbacks.items()) if pattern in matched and callbacks
+        )
+        if len(self._resolved) >= RESOLVED_CACHE_SIZE:
+            self._resolved = {}
+        self._resolved[event_name] = resolved
+        return resolved
 
     def __check_event_name(self, event_name: str):
         if not isinstance(event_name, str):
@@ -25,9 +110,21 @@ class EventHub(metaclass=Singleton):
         if not callable(callback):
             raise CallbackInitError("Callback must be callable")
 
+    def __check_mode(self, mode: str):
+        if mode not in DELIVERY_MODES:
+            raise CallbackInitError(f"Delivery mode must be one of {', '.join(DELIVERY_MODES)}")
+
     def add_callback(self, event_name: str|str, callback: Callable, **kwargs) -> list[str]:
         if isinstance(event_name, str):
             event_name = [event_name]
+        mode = kwargs.get("mode", SYNC)
+        self.__check_mode(mode)
+        loop = None
+        if mode == ASYNC:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
         added = []
         for name in event_name:
             self.__check_event_name(name)
@@ -39,10 +136,14 @@ class EventHub(metaclass=Singleton):
                 self._callbacks[name][callback] = {
                     "once": kwargs.get("once", False),
                     "raise_error": kwargs.get("raise_error", False),
-                    "name": getattr(callback, '__name__', str(callback))
+                    "name": getattr(callback, '__name__', str(callback)),
+                    "mode": mode,
+                    "loop": loop,
                 }
                 logger.debug(f"Adding callback {self._callbacks[name][callback]['name']} for event {name}")
                 added.append(name)
+        if added:
+            self._invalidate()
         return added
 
     def remove_callback(self, callback: Callable, event_name: str = None) -> bool:
@@ -63,22 +164,83 @@ class EventHub(metaclass=Singleton):
                 removed_count = 1
                 if not self._callbacks[event_name]:
                     self._callbacks.pop(event_name)
+        if removed_count:
+            self._invalidate()
         return bool(removed_count)
 
     def emit(self, event_name: str, payload: dict) -> AEvent:
-        callbacks_to_remove = []
+        sender = None
+        event_obj = AEvent(event_name, sender, payload=payload)
+        self._deliver(event_obj)
+        return event_obj
 
+    async def emit_async(self, event_name: str, payload: dict) -> AEvent:
+        """
+        Emit from a coroutine, async callbacks are awaited concurrently in the current loop.
+        Sync and thread callbacks are delivered as with emit().
+        """
         sender = None
         event_obj = AEvent(event_name, sender, payload=payload)
-        for event_pattern, callbacks_dict in list(self._callbacks.items()):
-            if not fnmatch(event_name, event_pattern):
-                continue
+        awaitables = []
+        self._deliver(event_obj, awaitables)
+        if awaitables:
+            results = await asyncio.gather(*(coro for coro, _ in awaitables), return_exceptions=True)
+            for (_, metadata), result in zip(awaitables, results):
+                if not isinstance(result, Exception):
+                    continue
+                if metadata["raise_error"]:
+                    logger.error(f"Callback {metadata['name']} for event {event_name} raised an error (re-raising).")
+                    raise result
+                logger.error(f"Callback {metadata['name']} for event {event_name} failed (error suppressed).",
+                             exc_info=result)
+        return event_obj
+
+    def _schedule_async(self, callback_func: Callable, event_obj: AEvent, metadata: dict):
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        loop = metadata["loop"]
+        if loop is None or loop.is_closed() or not loop.is_running():
+            loop = running_loop
+
+        def report(future):
+            self._async_futures.discard(future)
+            if not future.cancelled() and future.exception() is not None:
+                logger.error(f"Callback {metadata['name']} for event {event_obj.name} failed (error suppressed).",
+                             exc_info=future.exception())
+
+        if loop is None:
+            # no loop to schedule on, run in own loop of a worker
+            self.dispatcher.submit(event_obj.name, lambda e: asyncio.run(_call_async(callback_func, e)),
+                                   event_obj, metadata["name"])
+        elif loop is running_loop:
+            task = loop.create_task(_call_async(callback_func, event_obj))
+            self._async_futures.add(task)
+            task.add_done_callback(report)
+        else:
+            future = asyncio.run_coroutine_threadsafe(_call_async(callback_func, event_obj), loop)
+            self._async_futures.add(future)
+            future.add_done_callback(report)
 
-            for callback_func, metadata in list(callbacks_dict.items()):
+    def _deliver(self, event_obj: AEvent, awaitables: list = None):
+        callbacks_to_remove = []
+        event_name = event_obj.name
+        for event_pattern, callbacks in self._resolve(event_name):
+            for callback_func, metadata in callbacks:
                 try:
-                    ##### EXECUTE CALLBACK #####
-                    callback_func(event_obj)
-                    ############################
+                    mode = metadata["mode"]
+                    if mode == THREAD:
+                        self.dispatcher.submit(event_name, callback_func, event_obj, metadata["name"])
+                    elif mode == ASYNC:
+                        if awaitables is not None:
+                            awaitables.append((_call_async(callback_func, event_obj), metadata))
+                        else:
+                            self._schedule_async(callback_func, event_obj, metadata)
+                    else:
+                        ##### EXECUTE CALLBACK #####
+                        callback_func(event_obj)
+                        ############################
                 except StopEventPropagate:
                     logger.debug(f"Event propagation stopped by {metadata['name']} for event {event_name}")
                     break
@@ -97,14 +259,38 @@ class EventHub(metaclass=Singleton):
 
         for callback_func, event_pattern in callbacks_to_remove:
             self.remove_callback(callback_func, event_pattern)
-        return event_obj
+
+    def drain(self, timeout: float = None) -> bool:
+        """
+        Wait for thread callbacks and async callbacks running in loops of other threads.
+        Returns False if they are not done in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        drained = self._dispatcher is None or self._dispatcher.drain(timeout)
+        futures = [f for f in list(self._async_futures) if isinstance(f, concurrent.futures.Future)]
+        if futures:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            _, not_done = concurrent.futures.wait(futures, remaining)
+            drained = drained and not not_done
+        return drained
+
+    def flush(self) -> bool:
+        return self.drain()
+
+    def metrics(self) -> dict:
+        """Queue depth and callback latency of background delivery"""
+        metrics = self._dispatcher.metrics() if self._dispatcher is not None else {
+            'queue_depth': 0, 'max_queue_depth': 0, 'running': 0, 'workers': 0, 'queue_wait': {}, 'callbacks': {}}
+        metrics['async_pending'] = len(self._async_futures)
+        return metrics
 
     def clear(self):
         self._callbacks.clear()
+        self._invalidate()
 
     def callback_registered(self, callback: Callable) -> bool:
         self.__check_callback(callback)
-        for callbacks in self._callbacks.values():
+        for callbacks in list(self._callbacks.values()):
             if callback in callbacks:
                 return True
         return False
@@ -134,6 +134,9 @@ class ValueTypeError(SettingsError):
 class DependencyError(SettingsError):
     detail = "Dependency error"
 
+class DependencyCycleError(DependencyError):
+    detail = "Dependency cycle"
+
 class ParameterError(SettingsError):
     detail = "Parameter error"
 
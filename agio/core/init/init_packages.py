@@ -2,6 +2,7 @@ import logging
 
 from agio.core.events import register_callbacks, emit
 from agio.core.workspaces import package_hub
+from agio.tools import startup_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -9,11 +10,13 @@ logger = logging.getLogger(__name__)
 def init_packages():
     logger.debug('Initializing package hub...')
     ph = package_hub.APackageHub()
+    if startup_profiler.enabled():
+        startup_profiler.set_package_roots({pkg.root: pkg.package_name for pkg in ph.get_package_list()})
     # load package callbacks
     callback_paths = ph.collect_callbacks()
     register_callbacks(callback_paths)
     # now we can execute callbacks
-    for pkg in ph.iter_packages():
+    for pkg in ph.get_package_list():
         emit('core.app.package_loaded', {'package': pkg})
     emit('core.app.all_packages_loaded', {'package_hub': ph})
     logger.debug('Loaded packages: %s', ph.packages_count)
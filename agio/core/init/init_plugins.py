@@ -3,6 +3,7 @@ import logging
 from agio.core.events import emit
 from agio.core.plugins import plugin_hub
 from agio.core.workspaces import package_hub
+from agio.tools import startup_profiler
 # from agio.apps import app
 
 logger = logging.getLogger(__name__)
@@ -17,7 +18,9 @@ def init_plugins(pkg_hub: package_hub.APackageHub = None):
     # logger.debug(f'Initializing plugin hub for app {app.name}...')
     plg_hub = plugin_hub.APluginHub(pkg_hub)
     # collect plugins
-    plg_hub.collect_plugins()
-    plg_hub.collect_chips()
+    with startup_profiler.phase('core.collect_plugins'):
+        plg_hub.collect_plugins()
+    with startup_profiler.phase('core.collect_chips'):
+        plg_hub.collect_chips()
     logger.debug(f'Loaded plugins: {plg_hub.plugins_count}')
     return plg_hub
\ No newline at end of file
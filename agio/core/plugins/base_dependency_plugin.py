@@ -8,4 +8,12 @@ class SettingsDependencySolverPlugin(APlugin):
     __is_base_plugin__ = True
 
     def execute(self, field: BaseField, package_settings: APackageSettings, settings_hub: ASettingsHub, **kwargs):
-        raise NotImplementedError()
\ No newline at end of file
+        raise NotImplementedError()
+
+    def get_references(self, field: BaseField) -> list[str]:
+        """Names "package.parameter" of parameters the value is computed from"""
+        return []
+
+    def is_cacheable(self, field: BaseField) -> bool:
+        """The value depends only on referenced parameters and can be reused until they change"""
+        return False
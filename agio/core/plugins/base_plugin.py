@@ -59,28 +59,43 @@ class APlugin(metaclass=PluginMeta):
         for imp in plugin_info.get('implementations', []):
             if not app.filter_by_name_and_group(imp.get('apps'), imp.get('app_groups')):
                 continue
-            module = imp.get('module')
-            if not module:
-                raise PluginLoadingError(f"Module is required")
-            full_path = Path(info_file_path).parent / module
-            logger.debug(f'Load implementation for plugin: {module}')
-            if not full_path.exists():
-                raise PluginLoadingError(f"Module file not found: {full_path} in {info_file_path}")
-            try:
-                module_name = module.split('.')[0].replace('/', '.')
-                # todo: add from package root
-                plugin_module = import_module_by_path(full_path, module_name)
-            except Exception as e:
-                raise PluginLoadingError(f"Error loading plugin: {full_path} [{e}]") from e
-
-            for obj in plugin_module.__dict__.values():
-                if inspect.isclass(obj):
-                    if issubclass(obj, APlugin) and not obj.__name__ == APlugin.__name__:
-                        if not obj.__dict__.get("__is_base_plugin__"):
-                            if obj.__module__ == plugin_module.__name__:
-                                if not obj.name:
-                                    raise PluginLoadingError(f'{obj.__name__}: plugin name is required ({full_path})')
-                                yield obj
+            plugin_module = cls.import_implementation(imp, info_file_path)
+            yield from cls.iter_module_plugin_classes(plugin_module)
+
+    @staticmethod
+    def get_implementation_file(imp: dict, info_file_path: str) -> Path:
+        module = imp.get('module')
+        if not module:
+            raise PluginLoadingError(f"Module is required")
+        full_path = Path(info_file_path).parent / module
+        if not full_path.exists():
+            raise PluginLoadingError(f"Module file not found: {full_path} in {info_file_path}")
+        return full_path
+
+    @staticmethod
+    def get_implementation_module_name(imp: dict) -> str:
+        # todo: add from package root
+        return imp['module'].split('.')[0].replace('/', '.')
+
+    @classmethod
+    def import_implementation(cls, imp: dict, info_file_path: str):
+        full_path = cls.get_implementation_file(imp, info_file_path)
+        logger.debug(f'Load implementation for plugin: {imp["module"]}')
+        try:
+            return import_module_by_path(full_path, cls.get_implementation_module_name(imp))
+        except Exception as e:
+            raise PluginLoadingError(f"Error loading plugin: {full_path} [{e}]") from e
+
+    @staticmethod
+    def iter_module_plugin_classes(plugin_module) -> Generator[type[APlugin], None, None]:
+        for obj in plugin_module.__dict__.values():
+            if inspect.isclass(obj):
+                if issubclass(obj, APlugin) and not obj.__name__ == APlugin.__name__:
+                    if not obj.__dict__.get("__is_base_plugin__"):
+                        if obj.__module__ == plugin_module.__name__:
+                            if not obj.name:
+                                raise PluginLoadingError(f'{obj.__name__}: plugin name is required ({plugin_module.__file__})')
+                            yield obj
 
     @property
     def package(self):
@@ -0,0 +1,292 @@
+"""
+Plugins registered from source without import.
+
+Plugin modules are parsed with ``ast`` once, class names, bases and constant
+class attributes are cached per file stat. A plugin type is resolved from base
+classes already loaded or found in previously scanned modules. The hub gets
+``LazyPlugin`` proxies, name, label, command name and help come from the source,
+the module is imported and the plugin is created on first access to any other attribute.
+Modules the scan can't resolve are imported at once as before.
+Set AGIO_EAGER_PLUGINS=1 to import all plugins at startup.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Generator
+
+from agio.core.exceptions import PluginLoadingError
+# base classes of plugins, their names resolve plugin types of scanned modules
+from agio.core.plugins import (  # noqa: F401
+    base_app_api, base_app_launcher_plugin, base_application_main_api, base_command,
+    base_dependency_plugin, base_remote_repository, base_service,
+)
+from agio.core.plugins.base_plugin import APlugin
+from agio.core.workspaces.package_index import default_index_file
+from agio.tools import env_names, startup_profiler
+from agio.tools.modules import get_module_classes, get_object_dot_path, import_module_by_path, iter_subclasses
+
+if TYPE_CHECKING:
+    from agio.core.workspaces.package import APackageManager
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 3
+# resolved classes of scanned modules: module.Class -> plugin type, None for plugin bases without type
+_scanned_plugin_classes: dict[str, str | None] = {}
+_modules: dict[str, object] = {}
+_modules_lock = threading.Lock()
+
+
+class ModuleScanCache:
+    def __init__(self, cache_file: str | Path = None):
+        self.cache_file = Path(cache_file) if cache_file else default_index_file().with_name('plugin-scan.pickle')
+        self._items: dict | None = None
+        self._changed = False
+
+    def _load(self) -> dict:
+        if self._items is None:
+            try:
+                with open(self.cache_file, 'rb') as f:
+                    data = pickle.load(f)
+                self._items = data['items'] if data.get('version') == FORMAT_VERSION else {}
+            except Exception:
+                self._items = {}
+        return self._items
+
+    def get(self, path: Path) -> tuple[dict, dict, bool]:
+        st = path.stat()
+        key = path.as_posix()
+        stat_key = (st.st_mtime_ns, st.st_size)
+        item = self._load().get(key)
+        if item is None or item[0] != stat_key:
+            item = (stat_key, *get_module_classes(path))
+            self._items[key] = item
+            self._changed = True
+        return item[1:]
+
+    def save(self):
+        if not self._changed:
+            return
+        tmp_file = self.cache_file.with_name(f'{self.cache_file.name}.{os.getpid()}.tmp')
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({'version': FORMAT_VERSION, 'items': self._items}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+            self._changed = False
+        except OSError as e:
+            logger.debug(f'Plugin scan cache not saved: {e}')
+            tmp_file.unlink(missing_ok=True)
+
+
+def _import_module(path: Path, module_name: str, package_name: str = None):
+    """Plugin module imported once for all its plugins"""
+    key = path.as_posix()
+    with _modules_lock:
+        module = _modules.get(key)
+        if module is None:
+            logger.debug(f'Load implementation for plugin: {path}')
+            try:
+                with startup_profiler.span(module_name, 'plugin', package=package_name, file=key):
+                    module = _modules[key] = import_module_by_path(path, module_name)
+            except Exception as e:
+                raise PluginLoadingError(f"Error loading plugin: {path} [{e}]") from e
+        return module
+
+
+class LazyPlugin:
+    """
+    Registered plugin, static attributes declared as constants in the class body are
+    available without import, any other attribute creates the plugin instance
+    """
+    # plugins may change other class attributes in __init__
+    static_attributes = ('name', 'label', 'command_name', 'help')
+
+    def __init__(self, package: APackageManager, plugin_info: dict, path: Path, module_name: str,
+                 class_name: str, plugin_type: str, attrs: dict):
+        self.__dict__.update({key: attrs[key] for key in self.static_attributes if key in attrs})
+        self.plugin_type = plugin_type
+        self.path = os.path.abspath(path)
+        self._package = package
+        self._plugin_info = plugin_info
+        self._module_path = path
+        self._module_name = module_name
+        self._class_name = class_name
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def package(self) -> APackageManager:
+        return self._package
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self) -> APlugin:
+        with self._lock:
+            if self._instance is None:
+                module = _import_module(self._module_path, self._module_name, self._package.package_name)
+                plugin_class = module.__dict__.get(self._class_name)
+                if not (isinstance(plugin_class, type) and issubclass(plugin_class, APlugin)):
+                    raise PluginLoadingError(f'Plugin class {self._class_name} not found in {self._module_path}')
+                self._instance = plugin_class(self._package, self._plugin_info)
+            return self._instance
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return getattr(self.load(), item)
+
+    def __str__(self):
+        return str(self._instance) if self._instance is not None else self.name
+
+    def __repr__(self):
+        if self._instance is not None:
+            return repr(self._instance)
+        return f'<{self._class_name} "{self._package.package_name}.{self.name}" (not loaded)>'
+
+
+def _loaded_plugin_classes() -> dict[str, str | None]:
+    return {get_object_dot_path(cls): cls.plugin_type for cls in [APlugin, *iter_subclasses(APlugin)]}
+
+
+def _qualified_name(imports: dict[str, str], name: str) -> str | None:
+    """Dotted path of a name used by the module, None if it is not imported"""
+    head, _, rest = name.partition('.')
+    if head not in imports:
+        return None
+    return f'{imports[head]}.{rest}' if rest else imports[head]
+
+
+def _imported_class(qualified_name: str) -> type | None:
+    """Class of an already imported module"""
+    parts = qualified_name.split('.')
+    for i in range(len(parts) - 1, 0, -1):
+        module = sys.modules.get('.'.join(parts[:i]))
+        if module is not None:
+            obj = module
+            for attr in parts[i:]:
+                obj = getattr(obj, attr, None)
+            return obj if isinstance(obj, type) else None
+    return None
+
+
+def _resolve_classes(classes: dict[str, dict], imports: dict[str, str]) -> dict[str, str | None] | None:
+    """
+    Plugin type of every plugin class of the module, other classes are skipped.
+    None if a class with unknown bases may be a plugin.
+    """
+    known = {**_loaded_plugin_classes(), **_scanned_plugin_classes}
+    resolved: dict[str, str | None] = {}
+    not_plugins = {'object', 'ABC'}
+
+    def resolve(name: str, stack: tuple = ()) -> bool | None:
+        """True for plugin class, False for other class, None if unknown"""
+        if name in resolved:
+            return True
+        if name in not_plugins:
+            return False
+        info = classes.get(name)
+        if info is None or name in stack:
+            qualified_name = _qualified_name(imports, name)
+            if qualified_name is None:
+                return None
+            imported = _imported_class(qualified_name)
+            if imported is not None:
+                if issubclass(imported, APlugin):
+                    resolved[name] = imported.plugin_type
+                    return True
+                not_plugins.add(name)
+                return False
+            if qualified_name in known:
+                resolved[name] = known[qualified_name]
+                return True
+            return None
+        if not info['bases']:
+            not_plugins.add(name)
+            return False
+        plugin_type = info['attrs'].get('plugin_type')
+        unknown = False
+        is_plugin = False
+        for base in info['bases']:
+            result = None if base is None else resolve(base, stack + (name,))
+            if result:
+                is_plugin = True
+                if plugin_type is None:
+                    plugin_type = resolved[base]
+            elif result is None:
+                unknown = True
+        if is_plugin:
+            resolved[name] = plugin_type
+            return True
+        if unknown:
+            return None
+        not_plugins.add(name)
+        return False
+
+    for class_name in classes:
+        if resolve(class_name) is None:
+            return None
+    return {name: resolved[name] for name in classes if name in resolved}
+
+
+def _lazy_plugins(package: APackageManager, plugin_info: dict, imp: dict,
+                  scan_cache: ModuleScanCache) -> list[LazyPlugin] | None:
+    path = APlugin.get_implementation_file(imp, package.metadata_file.as_posix())
+    try:
+        classes, imports, complete = scan_cache.get(path)
+    except SyntaxError:
+        return None
+    if not complete:
+        return None
+    plugin_types = _resolve_classes(classes, imports)
+    if plugin_types is None:
+        return None
+    module_name = APlugin.get_implementation_module_name(imp)
+    plugins = []
+    for class_name, plugin_type in plugin_types.items():
+        attrs = classes[class_name]['attrs']
+        if attrs.get('__is_base_plugin__'):
+            continue
+        if not attrs.get('name') or plugin_type is None:
+            # name or type is not declared in class body, import reports the error
+            return None
+        if class_name.startswith('_'):
+            logger.debug('Skip hidden plugin class %s', class_name)
+            continue
+        plugins.append(LazyPlugin(package, plugin_info, path, module_name, class_name, plugin_type, attrs))
+    _scanned_plugin_classes.update({f'{module_name}.{name}': plugin_type for name, plugin_type in plugin_types.items()})
+    return plugins
+
+
+def iter_package_plugins(package: APackageManager, scan_cache: ModuleScanCache = None
+                         ) -> Generator[APlugin | LazyPlugin, None, None]:
+    """Plugins of the package, lazy when the module is resolved by scan"""
+    from agio.apps import app
+
+    if not package.metadata_file.exists():
+        raise PluginLoadingError(f"Package metafile file is not found")
+    eager = bool(os.getenv(env_names.EAGER_PLUGINS))
+    scan_cache = scan_cache or ModuleScanCache()
+    for plugin_info in package.iter_plugin_descriptions():
+        for imp in plugin_info.get('implementations', []):
+            if not app.filter_by_name_and_group(imp.get('apps'), imp.get('app_groups')):
+                continue
+            plugins = None if eager else _lazy_plugins(package, plugin_info, imp, scan_cache)
+            if plugins is not None:
+                yield from plugins
+                continue
+            with startup_profiler.span(imp['module'], 'plugin', package=package.package_name):
+                module = APlugin.import_implementation(imp, package.metadata_file.as_posix())
+            for plugin_class in APlugin.iter_module_plugin_classes(module):
+                if plugin_class.__name__.startswith('_'):
+                    logger.debug('Skip hidden plugin class %s', plugin_class.__name__)
+                    continue
+                yield plugin_class(package, plugin_info)
+    scan_cache.save()
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import logging
-import sys
 from collections import defaultdict
 from typing import Iterator, TYPE_CHECKING, Generator
 
@@ -32,24 +31,25 @@ class APluginHub(metaclass=Singleton):
         return sum([len(types) for types in self.plugins.values()])
 
     def _collect_plugins(self, packages: list[APackageManager]) -> None:
+        from agio.core.plugins.lazy_plugin import LazyPlugin, ModuleScanCache
+
         if self.plugins:
             logger.debug(f"PluginHub already initialized or in progress...")
             return
+        scan_cache = ModuleScanCache()
         for pkg in packages:
-            for plugin in pkg.collect_plugins():
-                if not plugin.__class__.__dict__.get('name'):
+            for plugin in pkg.collect_plugins(scan_cache):
+                if not isinstance(plugin, LazyPlugin) and not plugin.__class__.__dict__.get('name'):
                     raise PluginLoadingError(f"Plugin name must be defined: {plugin.__class__.__name__}")
                 if plugin.name in self.plugins[plugin.plugin_type]:
                     if plugin in self.plugins[plugin.plugin_type].values():
                         logger.debug(f"Plugin {plugin.plugin_type}.{plugin.name} already loaded.")
                         continue
                     existing_plugin = self.plugins[plugin.plugin_type][plugin.name]
-                    m1 = sys.modules.get(plugin.__class__.__module__)
-                    m2 = sys.modules.get(existing_plugin.__class__.__module__)
                     logger.warning(
                         f"Plugin will be overridden by: "
-                            f"\nOLD: {m1.__file__}:{plugin.__class__.__name__} ({plugin.name})"
-                            f"\nNEW: {m2.__file__}:{existing_plugin.__class__.__name__} ({existing_plugin.name})")
+                            f"\nOLD: {plugin.path} ({plugin.name})"
+                            f"\nNEW: {existing_plugin.path} ({existing_plugin.name})")
                     self._overridden_plugins.append(f'{plugin.plugin_type}.{plugin.name}')
                 self.plugins[plugin.plugin_type][plugin.name] = plugin
                 emit('core.app.plugin_loaded', {'plugin': plugin, 'package': pkg})
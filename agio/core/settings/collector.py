@@ -80,9 +80,8 @@ def _expand_parameter_class(parm_class):
     new_parm.update(parm_class)
     if not issubclass(cls, APackageSettings):
         raise TypeError(f'Param class {parm_class} must be a subclass of APackageSettings')
-    obj = cls(_init_only=1)
-    new_parm['label'] = obj.label
-    params = obj.__schema__()
+    new_parm['label'] = cls.get_label()
+    params = cls.__schema__()
     exclude = parm_class.pop('exclude', None)
     if exclude:
         params = {k: v for k, v in params.items() if k not in exclude}
@@ -145,7 +144,7 @@ def collect_layout(layout_type: str) -> dict:
             all_settings[name] = pkg_settings
     # collect parameters to single list with prefixes
     for pkg_name, pkg_settings in all_settings.items():
-        settings_schema = pkg_settings(_init_only=True).__schema__()
+        settings_schema = pkg_settings.__schema__()
         for parm_name, parm in settings_schema.items():
             parameters[f'{pkg_name}.{parm_name}'] = parm
     return {
@@ -0,0 +1,223 @@
+"""
+Graph of dependencies between parameters of a settings hub.
+
+Nodes are "package.parameter" names of parameters with an enabled dependency, edges go to
+parameters referenced by the dependency solver. Values of cacheable nodes are computed in
+topological order and kept until an upstream parameter changes.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, TYPE_CHECKING
+
+from agio.core.exceptions import DependencyCycleError
+
+if TYPE_CHECKING:
+    from agio.core.settings.settings_hub import ASettingsHub
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyGraph:
+    def __init__(self, settings_hub: ASettingsHub):
+        self._hub = settings_hub
+        # node -> referenced parameters
+        self.upstream: dict[str, tuple[str, ...]] = {}
+        # parameter -> dependent nodes
+        self.downstream: dict[str, set[str]] = {}
+        # node -> chain of names closing the cycle
+        self.cycles: dict[str, list[str]] = {}
+        self._cacheable: set[str] = set()
+        self._values: dict[str, Any] = {}
+        self._costs: dict[str, float] = {}
+        self._local = threading.local()
+        self._changes = -1
+
+    def build(self):
+        """Collect dependencies of all parameters, called again after changes not made by the hub"""
+        self.upstream.clear()
+        self.downstream.clear()
+        self.cycles.clear()
+        self._values.clear()
+        solvers = {}
+        for package_name, package_settings in self._hub.iter_package_settings():
+            for name, field in package_settings.iter_fields():
+                if not field.is_depended():
+                    continue
+                node = f'{package_name}.{name}'
+                try:
+                    solver = self._hub._get_dep_plugin(field.get_dependency().type)
+                    references = tuple(solver.get_references(field))
+                    cacheable = solver.is_cacheable(field)
+                except Exception as e:
+                    # reported on read of the parameter
+                    logger.debug(f'Dependency of {node} not resolved: {e}')
+                    references, cacheable = (), False
+                solvers[node] = cacheable
+                self.upstream[node] = references
+                for ref in references:
+                    self.downstream.setdefault(ref, set()).add(node)
+        self._find_cycles()
+        # values are reused only if nothing upstream is computed on each read
+        self._cacheable = {node for node in self.upstream
+                           if node not in self.cycles and all(solvers.get(n, True) for n in self._chain(node))}
+        self._changes = self._hub.changes_count()
+
+    def _find_cycles(self):
+        visited, stack = set(), []
+
+        def visit(node):
+            if node in stack:
+                cycle = stack[stack.index(node):] + [node]
+                for name in cycle:
+                    self.cycles.setdefault(name, cycle)
+                return
+            if node in visited:
+                return
+            visited.add(node)
+            stack.append(node)
+            for ref in self.upstream.get(node, ()):
+                visit(ref)
+            stack.pop()
+
+        for node in self.upstream:
+            visit(node)
+        # nodes depending on a cycle can't be computed too
+        for node in self.upstream:
+            for name in self._chain(node):
+                if name in self.cycles and node not in self.cycles:
+                    self.cycles[node] = self.cycles[name]
+                    break
+
+    def _chain(self, node: str) -> list[str]:
+        """Node and its dependent upstream nodes, each after the nodes it references"""
+        order, visited = [], set()
+
+        def visit(name):
+            if name in visited:
+                return
+            visited.add(name)
+            for ref in self.upstream.get(name, ()):
+                if ref in self.upstream:
+                    visit(ref)
+            order.append(name)
+
+        visit(node)
+        return order
+
+    def copy(self, settings_hub: ASettingsHub) -> DependencyGraph:
+        """Graph of a copy of the hub, computed values are kept"""
+        graph = DependencyGraph(settings_hub)
+        graph.upstream = self.upstream.copy()
+        graph.downstream = {name: nodes.copy() for name, nodes in self.downstream.items()}
+        graph.cycles = self.cycles.copy()
+        graph._cacheable = self._cacheable.copy()
+        graph._values = self._values.copy()
+        graph._costs = self._costs.copy()
+        graph._changes = self._changes
+        return graph
+
+    def _sync(self):
+        if self._changes != self._hub.changes_count():
+            self.build()
+
+    def changed(self, param_name: str):
+        """Forget values computed from the parameter, called after the hub changed it"""
+        # with other changes of this hub since the last build the graph is rebuilt on next read,
+        # changes of other hubs are not counted
+        changes = self._hub.changes_count()
+        if self._changes == changes - 1:
+            for node in self.iter_downstream(param_name):
+                self._values.pop(node, None)
+            self._changes = changes
+
+    def iter_downstream(self, param_name: str):
+        visited = set()
+        pending = list(self.downstream.get(param_name, ()))
+        while pending:
+            node = pending.pop()
+            if node in visited:
+                continue
+            visited.add(node)
+            yield node
+            pending.extend(self.downstream.get(node, ()))
+
+    def solve(self, param_name: str, **kwargs) -> Any:
+        self._sync()
+        if param_name in self.cycles:
+            raise DependencyCycleError(f'Dependency cycle: {" -> ".join(self.cycles[param_name])}')
+        if kwargs or param_name not in self._cacheable:
+            return self._compute(param_name, **kwargs)
+        if param_name not in self._values:
+            for node in self._chain(param_name):
+                if node not in self._values:
+                    self._values[node] = self._compute(node)
+        return self._values[param_name]
+
+    @property
+    def _evaluating(self) -> list[str]:
+        """Nodes computed by the current thread"""
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _compute(self, param_name: str, **kwargs) -> Any:
+        evaluating = self._evaluating
+        if param_name in evaluating:
+            # references not reported by the solver
+            chain = evaluating[evaluating.index(param_name):] + [param_name]
+            raise DependencyCycleError(f'Dependency cycle: {" -> ".join(chain)}')
+        package_name, name = param_name.split('.')
+        package_settings = self._hub.get_package_settings(package_name)
+        field = package_settings.get_parameter(name)
+        solver = self._hub._get_dep_plugin(field.get_dependency().type)
+        evaluating.append(param_name)
+        start = time.perf_counter()
+        try:
+            return solver.execute(field, package_settings, self._hub, **kwargs)
+        finally:
+            self._costs[param_name] = time.perf_counter() - start
+            evaluating.pop()
+
+    def is_cached(self, param_name: str) -> bool:
+        return param_name in self._values
+
+    def explain(self, param_name: str) -> str:
+        """Tree of the parameter dependencies with the last evaluation time of each node"""
+        self._sync()
+        lines = []
+
+        def describe(name: str, depth: int, path: tuple):
+            indent = '  ' * depth
+            if name not in self.upstream:
+                try:
+                    value = self._hub.get(name)
+                except Exception as e:
+                    value = f'<{type(e).__name__}: {e}>'
+                lines.append(f'{indent}{name} = {value!r}')
+                return
+            if name in path:
+                lines.append(f'{indent}{name} <- cycle')
+                return
+            dependency = self._hub.get_parameter(name).get_dependency()
+            cost = self._costs.get(name)
+            notes = [f'{cost * 1e3:.3f} ms' if cost is not None else 'not evaluated']
+            if name in self._values:
+                notes.append('cached')
+            elif name not in self._cacheable:
+                notes.append('computed on each read')
+            lines.append(f'{indent}{name} = {dependency.type}: {dependency.value} [{", ".join(notes)}]')
+            for ref in self.upstream[name]:
+                describe(ref, depth + 1, path + (name,))
+
+        if param_name not in self.cycles:
+            try:
+                self._hub.get(param_name)
+            except Exception as e:
+                lines.append(f'{param_name}: {type(e).__name__}: {e}')
+        else:
+            lines.append(f'Dependency cycle: {" -> ".join(self.cycles[param_name])}')
+        describe(param_name, 0, ())
+        return '\n'.join(lines)
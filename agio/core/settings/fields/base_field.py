@@ -1,7 +1,7 @@
+import copy
 import inspect
 import re
 from abc import ABC, ABCMeta
-from functools import cached_property
 from typing import Any, Callable, Type, Union, TypeVar, Generic
 from weakref import ref
 
@@ -12,6 +12,7 @@ from agio.core.exceptions import ValueTypeError, ParameterError, DependencyError
 from agio.core.plugins import plugin_hub
 from agio.core.settings.dependency import DependencyConfig
 from agio.core.settings.fields.js_types import to_js_type
+from agio.core.settings.fields.type_adapters import get_type_adapter
 from agio.core.settings.generic_types import REQUIRED, NOT_SET
 from agio.core.settings.validators import ValidatorBase
 from agio.tools.text_helpers import unslugify
@@ -22,11 +23,42 @@ ValidatorClass = Type[ValidatorBase]
 FieldType = TypeVar('FieldType')
 ValidatorType = Union[ValidatorInstance, ValidatorFactory, ValidatorClass]
 
+# values of these types are never changed in place, instances can share them
+_IMMUTABLE_TYPES = frozenset({type(None), type(NOT_SET), type(REQUIRED), str, bytes, int, float, bool, complex})
+
+
+def _own_copy(value: Any) -> Any:
+    """Deep copy of a value, skipped for immutable values"""
+    if type(value) in _IMMUTABLE_TYPES:
+        return value
+    if type(value) is tuple and all(type(item) in _IMMUTABLE_TYPES for item in value):
+        return value
+    return copy.deepcopy(value)
+
+
+def detached(value: Any) -> Any:
+    """Shallow copy of builtin containers, cached values are not changed by callers"""
+    if isinstance(value, (list, dict, set)):
+        return value.copy()
+    return value
+
+
+_EMPTY_DEPENDENCY = {
+    'type': None,  # dependency type:  ref (reference)|exp (expression)|pdg, ...
+    'value': None, # any json data
+    'options': None,
+    'enabled': False, # for disable in overrides
+}
+
 
 class BaseFieldMeta(ABCMeta):
+    # incremented for each new field class, lookups of field class by type are cached until it changes
+    version = 0
+
     def __new__(mcs, name, bases, namespace, **kwargs):
         cls = super().__new__(mcs, name, bases, namespace)
         cls._creation_flags = kwargs
+        BaseFieldMeta.version += 1
         return cls
 
 
@@ -34,6 +66,8 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
     field_type: type[FieldType] = None
     default_validators: list[ValidatorBase, ...] = []
     default_widget = None
+    # schema depends only on the field declaration and is cached with the settings class
+    static_schema = True
     __name_pattern = re.compile(r'^[a-zA-Z](?:[a-zA-Z0-9_]*[a-zA-Z0-9])?$')
     __dep_plugins_cache = {}
 
@@ -52,6 +86,10 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
         **kwargs
     ):
         self._dependency_callback = None
+        # called on any change of the value or dependency, parent settings count changes
+        self._changed_callback = None
+        # stored value and its validated form, get() validates each stored value once
+        self._validated_cache: tuple[Any, Any] | None = None
         if self.field_type is None:
             raise ValueError(f'Field type not set for {self.__class__.__name__}')
         if default is Ellipsis:
@@ -62,12 +100,7 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
             # values
             'value': NOT_SET,
             'locked': locked,
-            'dependency': {
-                'type': None,  # dependency type:  ref (reference)|exp (expression)|pdg, ...
-                'value': None, # any json data
-                'options': None,
-                'enabled': False, # for disable in overrides
-            },
+            'dependency': dict(_EMPTY_DEPENDENCY),
 
             # props
             'required': default is REQUIRED,
@@ -87,6 +120,25 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
         self.__parent_settings = None   # settings class
         self._init_default(default)
 
+    def clone(self, share_value: bool = False) -> 'BaseField':
+        """
+        Copy with own value and dependency, configuration is shared.
+        share_value: keep the same value object, set() replaces it and never changes it in place
+        """
+        field = object.__new__(self.__class__)
+        field.__dict__.update(self.__dict__)
+        data = field._data = self._data.copy()
+        dependency = data['dependency']
+        data['dependency'] = dependency.copy() if dependency == _EMPTY_DEPENDENCY else copy.deepcopy(dependency)
+        if not share_value:
+            data['value'] = _own_copy(data['value'])
+            field._validated_cache = None
+        return field
+
+    def _changed(self):
+        if self._changed_callback:
+            self._changed_callback(self)
+
     def _get_class_config_value(self, name: str, default=None) -> Any:
         return self.__class__._creation_flags.get(name, default)
 
@@ -103,9 +155,9 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
     def __repr__(self):
         return f"{self.__class__.__name__} [{self.field_type}] ({self._data['value']})"
 
-    @cached_property
+    @property
     def type_adapter(self) -> TypeAdapter:
-        return TypeAdapter(self.field_type)
+        return get_type_adapter(self.field_type)
 
     def _init_default(self, default_value: Any):
         if default_value in (REQUIRED, NOT_SET):
@@ -174,15 +226,23 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
         if self.is_depended():
             raise ParameterError('Parameter has dependency and cant be changed directly')
         self._data['value'] = self._validate(value)
+        self._changed()
 
     def get(self, **kwargs) -> Any:
         if self.is_depended():
             return self.type_adapter.validate_python(self._solve_dependency(**kwargs))
-        if self._data['value'] != NOT_SET:
-            return self.type_adapter.validate_python(self._data['value'])
-        if not self._data['required']:
-            return self.type_adapter.validate_python(self._data['default'])
-        raise ValueError("Field is required but value is not set")
+        value = self._data['value']
+        if value is NOT_SET:
+            if self._data['required']:
+                raise ValueError("Field is required but value is not set")
+            value = self._data['default']
+        return detached(self._validated(value))
+
+    def _validated(self, value: Any) -> Any:
+        cached = self._validated_cache
+        if cached is None or cached[0] is not value:
+            cached = self._validated_cache = (value, self.type_adapter.validate_python(value))
+        return cached[1]
 
     def _get_save_values_list(self):
         return {
@@ -207,28 +267,33 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
         if self.is_locked():
             raise ParameterError('Parameter is locked')
         self._data.update(saved_settings)
+        self._changed()
 
     def get_dependency(self) -> DependencyConfig|None:
         dep = self._data.get('dependency')
         return DependencyConfig(**dep) if dep else None
 
-    def set_dependency(self, dependency_config: DependencyConfig) -> None:
+    def set_dependency(self, dependency_config: DependencyConfig | dict) -> None:
         if self.is_locked():
             raise ParameterError('Parameter is locked')
+        if isinstance(dependency_config, dict):
+            # saved settings
+            dependency_config = DependencyConfig(**dependency_config)
         self._data['dependency'] = dependency_config.as_dict()
+        self._changed()
 
     def has_dependency(self) -> bool:
         return bool(self.get_dependency())
 
     def is_depended(self) -> bool:
-        dep = self.get_dependency()
-        if not dep:
-            return False
-        return dep.enabled
+        dep = self._data.get('dependency')
+        # same as DependencyConfig truth value and enabled flag
+        return bool(dep and dep.get('type') and dep.get('enabled', True))
 
     def clear_dependency(self) -> bool:
         if self.is_depended():
             self._data['dependency'] = None
+            self._changed()
             return True
         return False
 
@@ -236,14 +301,15 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
         if self._data.get('dependency'):
             if self._data['dependency'].get('enabled') != value:
                 self._data['dependency']['enabled'] = value
+                self._changed()
                 return True
         return False
 
     def _solve_dependency(self, **kwargs):
-        dep = self.get_dependency()
-        if not dep:
+        dep = self._data.get('dependency')
+        if not dep or not dep.get('type'):
             raise DependencyError('Dependency not enabled')
-        if not dep.enabled:
+        if not dep.get('enabled', True):
             raise DependencyError('Dependency not enabled')
         if not self._dependency_callback:
             raise DependencyError('Dependency callback not provided')
@@ -253,7 +319,7 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
         return (self._data.get('dependency') or {}).get('type')
 
     def set_comment(self, value: str) -> None:
-        self._data['comment'] = TypeAdapter(str).validate_python(value)
+        self._data['comment'] = get_type_adapter(str).validate_python(value)
 
     def get_comment(self) -> str:
         return self._data['comment']
@@ -275,6 +341,7 @@ class BaseField(ABC, Generic[FieldType], metaclass=BaseFieldMeta):
         if self._data['required']:
             raise ParameterError('Parameter is required and have no default value')
         self._data['value'] = self._data['default']
+        self._changed()
 
     def get_serialized(self) -> Any:
         value = self.get()
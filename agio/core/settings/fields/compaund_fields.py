@@ -1,10 +1,10 @@
 from typing import Generic, Any, Type, Iterable, Collection, Union, Sized, TypeVar
 
-from pydantic import TypeAdapter, BaseModel
 from pydantic_core import ValidationError
 
 from agio.core.settings.fields.base_field import BaseField
 from agio.core.settings.fields.js_types import to_js_type
+from agio.core.settings.fields.type_adapters import get_type_adapter
 from agio.core.settings.generic_types import REQUIRED
 
 
@@ -38,15 +38,14 @@ class CollectionField(BaseField[list[T]]):
     def _validate_elements(self, iterable: Iterable) -> Iterable[T] | None:
         if iterable is None:
             return None
-        return type(iterable)(self._validate_element(item) for item in iterable)
+        items = self._validate_list(iterable)
+        return items if type(iterable) is list else type(iterable)(items)
 
-    def _validate_element(self, element: Any) -> T:
+    def _validate_list(self, iterable: Iterable) -> list[T]:
+        """Validate all elements with one call of the shared list[T] adapter"""
         if self.element_type is None:
-            return element
-        # Use model_validate for Pydantic BaseModel to properly convert dicts to model instances
-        if isinstance(self.element_type, type) and issubclass(self.element_type, BaseModel):
-            return self.element_type.model_validate(element)
-        return TypeAdapter(self.element_type).validate_python(element)
+            return list(iterable)
+        return get_type_adapter(list[self.element_type]).validate_python(iterable)
 
     def _validate(self, value: Any) -> Iterable[T]:
         try:
@@ -77,7 +76,7 @@ class SetField(CollectionField[T]):
     def _validate_elements(self, iterable: Iterable) -> set[T] | None:
         if iterable is None:
             return
-        return set(self._validate_element(item) for item in iterable)
+        return set(self._validate_list(iterable))
 
 
 class TupleField(CollectionField[T]):
@@ -143,11 +142,7 @@ class DictField(BaseField, Generic[K, V]):
 
         if self.key_type is not None and self.value_type is not None:
             try:
-                return {
-                    TypeAdapter(self.key_type).validate_python(k):
-                        TypeAdapter(self.value_type).validate_python(v)
-                    for k, v in value.items()
-                }
+                return get_type_adapter(dict[self.key_type, self.value_type]).validate_python(value)
             except ValidationError as e:
                 raise ValueError(f"Dict validation failed: {e}")
 
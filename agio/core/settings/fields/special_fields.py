@@ -5,6 +5,7 @@ from agio.core.chips import chips_hub
 
 class PluginSelectField(BaseField):
     field_type = str
+    static_schema = False
 
     def __init__(self, plugin_type: str, **kwargs):
         if not plugin_type:
@@ -24,6 +25,7 @@ class PluginSelectField(BaseField):
 
 class ChipSelectField(BaseField):
     field_type = str
+    static_schema = False
     def __init__(self, chip_collection_name: str, **kwargs):
         if not chip_collection_name:
             raise ValueError("Chip type must be specified")
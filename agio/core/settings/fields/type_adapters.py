@@ -0,0 +1,33 @@
+"""
+Process-wide cache of pydantic TypeAdapters.
+
+Building an adapter compiles a core schema for the type, fields of the same type
+share one adapter instead of compiling it per field or per value.
+"""
+import threading
+from typing import Any
+
+from pydantic import TypeAdapter
+
+_adapters: dict[Any, TypeAdapter] = {}
+_lock = threading.Lock()
+
+
+def get_type_adapter(python_type: Any) -> TypeAdapter:
+    """Shared adapter for the type, types that can't be hashed get a new adapter"""
+    try:
+        return _adapters[python_type]
+    except KeyError:
+        pass
+    except TypeError:
+        return TypeAdapter(python_type)
+    with _lock:
+        adapter = _adapters.get(python_type)
+        if adapter is None:
+            adapter = _adapters[python_type] = TypeAdapter(python_type)
+    return adapter
+
+
+def clear_cache() -> None:
+    with _lock:
+        _adapters.clear()
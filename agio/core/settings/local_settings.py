@@ -15,6 +15,8 @@ logger = logging.getLogger(__name__)
 
 _settings_dir = Path(os.getenv(env_names.SETTINGS_DIR) or local_dirs.projects_settings_dir())
 _settings_file_name = 'settings.json'
+# project dir name -> (stat of settings files, hub), load() returns copies of the hub
+_loaded: dict[str, tuple[tuple, settings_hub.LocalSettingsHub]] = {}
 
 
 def get_settings_dir(project_id: str = ''):
@@ -44,17 +46,47 @@ def load_default_settings():
     return default_settings
 
 
-def load(project: str | pd.AProject = None) -> settings_hub.LocalSettingsHub:
-    if project:
-        settings_data = load_default_settings()
+def _file_stat(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def clear_cache():
+    _loaded.clear()
+
+
+def load(project: str | pd.AProject = None, use_cache: bool = True) -> settings_hub.LocalSettingsHub:
+    """
+    Local settings of the project merged over default settings.
+    Each call returns an own copy of the hub, unsaved changes are not seen by other callers.
+    The hub copied from is kept until one of the files changes or settings are saved.
+    """
+    project_dir = get_project_dir_name(project)
+    key = (
+        _file_stat(get_project_settings_file()) if project else None,
+        _file_stat(get_project_settings_file(project)),
+    )
+    cached = _loaded.get(project_dir)
+    if use_cache and cached is not None and cached[0] == key:
+        settings = cached[1].copy()
     else:
-        settings_data = {}
-    settings_file = get_project_settings_file(project)
-    if settings_file.exists():
-        settings_data.update(json.loads(settings_file.read_text(encoding='utf-8')))
-    settings = settings_hub.LocalSettingsHub(settings_data)
+        if project:
+            settings_data = load_default_settings()
+        else:
+            settings_data = {}
+        settings_file = get_project_settings_file(project)
+        if settings_file.exists():
+            settings_data.update(json.loads(settings_file.read_text(encoding='utf-8')))
+        template = settings_hub.LocalSettingsHub(settings_data)
+        # validated once, shared by the copies
+        template.snapshot()
+        _loaded[project_dir] = (key, template)
+        logger.debug(f'Loaded settings from {settings_file}')
+        settings = template.copy()
     emit('core.settings.project_settings_loaded', {'settings': settings, 'project': project})
-    logger.debug(f'Loaded settings from {settings_file}')
     return settings
 
 
@@ -63,6 +95,8 @@ def save(settings: settings_hub.LocalSettingsHub|dict, project: str | pd.AProjec
     emit('core.settings.before_project_settings_save', {'settings': settings, 'project': project, 'settings_file': settings_file})
     if not isinstance(settings, dict):
         settings = settings.dump(skip_default=True)
+    # default settings are merged into every project
+    clear_cache()
     if settings:
         settings_file.parent.mkdir(parents=True, exist_ok=True)
         settings_file.write_text(json.dumps(settings, indent=2, cls=JsonSerializer))
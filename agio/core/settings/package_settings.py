@@ -6,21 +6,39 @@ import types
 from typing import Any, Iterator, get_origin, get_args, Union, Type, Mapping, Sequence
 from types import GenericAlias
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PydanticSchemaGenerationError
 
 from agio.core.exceptions import RequiredValueNotSetError
 from agio.core.exceptions import SettingsInitError
-from agio.core.settings.fields.base_field import BaseField
+from agio.core.settings.fields.base_field import BaseField, BaseFieldMeta
 from agio.core.settings.fields.compaund_fields import CollectionField
 from agio.core.settings.fields.model_fields import ModelField
 from agio.core.settings.generic_types import REQUIRED
 from agio.tools.json_serializer import JsonSerializer
 
 
+# python type -> field class, valid while no new field classes are defined
+_field_classes_by_type: dict[type, Type[BaseField] | None] = {}
+_field_classes_version = -1
+
+
 def _get_field_class_for_type(python_type: type, args: tuple = None) -> Type[BaseField] | None:
     """finding correct class for specified Python type"""
+    global _field_classes_version
+
     if not isinstance(python_type, type):
         return None
+    if _field_classes_version != BaseFieldMeta.version:
+        _field_classes_by_type.clear()
+        _field_classes_version = BaseFieldMeta.version
+    try:
+        return _field_classes_by_type[python_type]
+    except KeyError:
+        field_class = _field_classes_by_type[python_type] = _find_field_class_for_type(python_type)
+        return field_class
+
+
+def _find_field_class_for_type(python_type: type) -> Type[BaseField] | None:
     # collect classes with field_type attribute
     field_classes = [
         cls for cls in BaseField.__subclasses__() + CollectionField.__subclasses__()
@@ -225,10 +243,23 @@ class _SettingsMeta(type):
             except ValueError as e:
                 raise ValueError(f"Error processing field '{attr_name}': {e}")
 
+        # fields of the class are templates for instances, prepare them once
+        for attr_name, field in fields.items():
+            if not field.name:
+                field.set_name(attr_name)
+            # compile the shared validator of the field type
+            try:
+                _ = field.type_adapter
+            except PydanticSchemaGenerationError:
+                # custom field types may validate without it
+                pass
+
         # store fields in class
         new_ns = {k: v for k, v in namespace.items() if not isinstance(v, BaseField)}
         new_ns['_fields'] = fields
         new_ns['_kwargs'] = kwargs
+        # static part of __schema__, computed on first request
+        new_ns['_schema'] = None
 
         # store required fields in class
         required_fields = [name for name, field in fields.items() if field.is_required()]
@@ -249,16 +280,21 @@ class APackageSettings(metaclass=_SettingsMeta):
         self._get_other_parm_func = class_kwargs.pop('_get_other_parm_func', None)
         self._solve_dependency_func = class_kwargs.pop('_solve_dependency_func', None)
         self._class_kwargs = class_kwargs
+        # incremented on any change of field values or dependencies, snapshots of settings compare it
+        self._changes = 0
         
         package_name = kwargs.pop('_package_name', '')
         if package_name:
             self.set_name(package_name)
         
+        dependency_callback = self._dependency_solver_requested
         for name, field in self._get_fields().items():
-            field.set_name(name)
-            field._dependency_callback = self._dependency_solver_requested
+            # class fields are templates, values belong to the instance
+            field = field.clone()
+            field._dependency_callback = dependency_callback
+            field._changed_callback = self._field_changed
             self._fields_data[name] = field
-            setattr(self, name, self._fields_data[name])
+        self.__dict__.update(self._fields_data)
         
         if self._class_kwargs.get('_init_only'):
             return
@@ -281,6 +317,30 @@ class APackageSettings(metaclass=_SettingsMeta):
     def __repr__(self):
         return f"<{self.__class__.__name__}>"
 
+    def copy(self, **kwargs) -> 'APackageSettings':
+        """
+        Copy with own fields, values are shared until they are set.
+        kwargs: _get_other_parm_func and _solve_dependency_func of the copy
+        """
+        settings = object.__new__(self.__class__)
+        settings.__dict__.update(self.__dict__)
+        settings._get_other_parm_func = kwargs.get('_get_other_parm_func', self._get_other_parm_func)
+        settings._solve_dependency_func = kwargs.get('_solve_dependency_func', self._solve_dependency_func)
+        settings._fields_data = {}
+        for name, field in self._fields_data.items():
+            field = field.clone(share_value=True)
+            field._dependency_callback = settings._dependency_solver_requested
+            field._changed_callback = settings._field_changed
+            settings._fields_data[name] = field
+        settings.__dict__.update(settings._fields_data)
+        return settings
+
+    def _field_changed(self, field: BaseField):
+        self._changes += 1
+
+    def changes_count(self) -> int:
+        return self._changes
+
     def get(self, param_name: str, **kwargs) -> Any:
         return self.get_parameter(param_name).get(**kwargs)
 
@@ -312,7 +372,11 @@ class APackageSettings(metaclass=_SettingsMeta):
 
     @property
     def label(self):
-        return self._kwargs.get('label') or self.__class__.__name__
+        return self.get_label()
+
+    @classmethod
+    def get_label(cls) -> str:
+        return cls._kwargs.get('label') or cls.__name__
 
     def find_parameter(self, name: str) -> BaseField:
         """Find a field by name"""
@@ -384,11 +448,15 @@ class APackageSettings(metaclass=_SettingsMeta):
 
     @classmethod
     def __schema__(cls) -> dict:
-        """Ui schema for current package settings"""
-        obj = cls(_init_only=True)
-        parameters = {}
-        for name, field in obj._fields_data.items():
-            parameters[name] = field.get_schema()
-        return parameters
+        """
+        Ui schema for current package settings.
+        Computed from the class fields once, fields with options from other hubs are
+        recomputed on each call.
+        """
+        fields = cls._fields
+        if cls._schema is None:
+            cls._schema = {name: field.get_schema() for name, field in fields.items() if field.static_schema}
+        static = cls._schema
+        return {name: dict(static[name]) if name in static else field.get_schema() for name, field in fields.items()}
 
 
@@ -1,13 +1,15 @@
 from __future__ import annotations
-from typing import Any, TYPE_CHECKING
+from types import MappingProxyType
+from typing import Any, TYPE_CHECKING, Mapping
 
 from agio.core.api.utils import NOTSET
 from agio.core.events import emit
 from agio.core.plugins import plugin_hub
 from agio.core.settings import package_settings as package_settings_class
 from agio.core.settings import collector
+from agio.core.settings.dependency_graph import DependencyGraph
 from agio.core.workspaces import package_hub
-from agio.core.settings.fields.base_field import BaseField
+from agio.core.settings.fields.base_field import BaseField, detached
 
 if TYPE_CHECKING:
     from agio.core.settings import APackageSettings
@@ -26,6 +28,8 @@ class ASettingsHub:
                 raise ValueError(f'Invalid key: "{key}". Correct format is "package.parameter"')
             package_names.add(key.rsplit('.')[0])
         self._package_settings = {}
+        self._snapshot: dict[str, Any] = {}
+        self._snapshot_changes = -1
         all_packages = package_hub.APackageHub.instance().get_packages()
         for package_name in all_packages.keys():
             if self.settings_type == LocalSettingsHub.settings_type:
@@ -42,6 +46,8 @@ class ASettingsHub:
                     _get_other_parm_func=self.get_parameter,
                     _solve_dependency_func=self._solve_parameter_dependency
                 )
+        self._dependency_graph = DependencyGraph(self)
+        self._dependency_graph.build()
 
     def __str__(self):
         return f"{self.__class__.__name__}:({', '.join(self._package_settings.keys())})"
@@ -49,6 +55,27 @@ class ASettingsHub:
     def __repr__(self):
         return f"<{self}>"
 
+    def copy(self) -> ASettingsHub:
+        """
+        Copy with own parameters, changes of the copy don't affect this hub.
+        Values, the validated snapshot and the dependency graph are shared until the copy changes.
+        """
+        hub = object.__new__(self.__class__)
+        hub.__dict__.update(self.__dict__)
+        hub._package_settings = {
+            name: package_settings.copy(
+                _get_other_parm_func=hub.get_parameter,
+                _solve_dependency_func=hub._solve_parameter_dependency
+            )
+            for name, package_settings in self._package_settings.items()
+        }
+        hub._dependency_graph = self._dependency_graph.copy(hub)
+        return hub
+
+    def changes_count(self) -> int:
+        """Number of changes of parameter values and dependencies made in this hub"""
+        return sum(package_settings.changes_count() for package_settings in self._package_settings.values())
+
     def iter_package_settings(self):
         yield from self._package_settings.items()
 
@@ -59,7 +86,34 @@ class ASettingsHub:
         if param_name.count('.') != 1:
             raise NameError(f"Invalid parameter name: {param_name}")
 
+    def _snapshot_values(self) -> dict[str, Any]:
+        changes = self.changes_count()
+        if self._snapshot_changes != changes:
+            values = {}
+            for package_name, package_settings in self._package_settings.items():
+                for name, field in package_settings.iter_fields():
+                    if field.is_depended():
+                        continue
+                    try:
+                        values[f'{package_name}.{name}'] = field.get()
+                    except ValueError:
+                        # required value is not set, get() reports it
+                        continue
+            self._snapshot = values
+            self._snapshot_changes = changes
+        return self._snapshot
+
+    def snapshot(self) -> Mapping[str, Any]:
+        """
+        Read-only "package.parameter" -> value of parameters without dependency.
+        Values are validated once, the snapshot is rebuilt after any change of the hub settings.
+        """
+        return MappingProxyType(self._snapshot_values())
+
     def get(self, param_name: str, default: Any = NOTSET) -> Any:
+        value = self._snapshot_values().get(param_name, NOTSET)
+        if value is not NOTSET:
+            return detached(value)
         self._check_parm_name(param_name)
         package_name, param_name = param_name.split(".")
         package_settings: package_settings_class.APackageSettings = self._package_settings.get(package_name)
@@ -80,7 +134,8 @@ class ASettingsHub:
         package_settings = self._package_settings.get(package_name)
         if not package_settings:
             raise KeyError(f"Package {package_name} not found in workspace settings")
-        return package_settings.set(param_name, value)
+        package_settings.set(param_name, value)
+        self._dependency_graph.changed(f'{package_name}.{param_name}')
 
     def set_default(self, param_name: str) -> None:
         """
@@ -88,7 +143,8 @@ class ASettingsHub:
         """
         self._check_parm_name(param_name)
         parm = self.get_parameter(param_name)
-        return parm.set_default()
+        parm.set_default()
+        self._dependency_graph.changed(param_name)
 
     def lock(self, param_name: str) -> None:
         self._check_parm_name(param_name)
@@ -115,8 +171,14 @@ class ASettingsHub:
         return package_settings.get_parameter(param_name)
 
     def _solve_parameter_dependency(self, parameter_field: BaseField, package_settings: APackageSettings, **kwargs):
-        dep_plugin = self._get_dep_plugin(parameter_field.get_dependency().type)
-        return dep_plugin.execute(parameter_field, package_settings, self, **kwargs)
+        return self._dependency_graph.solve(f'{package_settings.name}.{parameter_field.name}', **kwargs)
+
+    def explain(self, param_name: str) -> str:
+        """
+        Dependency chain of the parameter with evaluation time of each dependent node
+        """
+        self._check_parm_name(param_name)
+        return self._dependency_graph.explain(param_name)
 
     def _get_dep_plugin(self, plugin_name: str):
         if plugin_name not in self.__dep_plugins_cache:
@@ -155,6 +217,9 @@ class LocalSettingsHub(ASettingsHub):
         data = self.dump()
         emit('core.settings.before_local_settings_save', {'settings': self})
         collector.write_local_settings(data)
+        from agio.core.settings import local_settings
+
+        local_settings.clear_cache()
         emit('core.settings.local_settings_saved', {'settings': self})
 
 
@@ -8,7 +8,7 @@ from typing import Any, Generator, Type
 
 import yaml
 
-from agio.tools import env_names
+from agio.tools import env_names, startup_profiler
 
 try:
     import tomllib as toml
@@ -46,6 +46,16 @@ class APackageManager:
     def __repr__(self):
         return f'APackageManager({repr(self.package_name)})'
 
+    @classmethod
+    def from_metadata(cls, package_root: str|Path, metadata: dict) -> APackageManager:
+        """Manager of already parsed and checked manifest"""
+        pkg = cls.__new__(cls)
+        pkg._root = Path(package_root)
+        pkg._meta_data_file = Path(package_root, cls.metadata_filename)
+        pkg._metadata = metadata
+        pkg._package = None
+        return pkg
+
     # metadata file
 
     def __get_metadata_file(self, path: str | Path) -> Path:
@@ -197,11 +207,11 @@ class APackageManager:
         module_path = f"{package_name}.{dotted_path}"
         return module_path
 
-    def collect_plugins(self):
-        plugin_info: dict
-        for plugin_info, plugin_class in self.iterate_plugin_classes():
-            instance = plugin_class(self, plugin_info)
-            yield instance
+    def collect_plugins(self, scan_cache=None):
+        """Plugin instances, or lazy proxies for plugins resolved from module source"""
+        from agio.core.plugins.lazy_plugin import iter_package_plugins
+
+        yield from iter_package_plugins(self, scan_cache)
 
     def iterate_plugin_classes(self) -> Generator[tuple[dict, Type[base_plugin.APlugin]], None, None]:
         plugin_info: dict
@@ -235,7 +245,8 @@ class APackageManager:
                     module = [module]
                 for module_glob in module:
                     for path in self.root.rglob(module_glob):
-                        mod = import_module_by_path(path.as_posix())
+                        with startup_profiler.span(path.stem, 'chip', package=self.package_name, file=path.as_posix()):
+                            mod = import_module_by_path(path.as_posix())
                         for obj in mod.__dict__.values():
                             if chips.chips_hub.is_chip(obj):
                                 emit("core.app.chip_registered", {'pacakge': self, 'chip': obj})
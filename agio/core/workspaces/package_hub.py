@@ -1,10 +1,10 @@
 from __future__ import annotations
 import glob
 import os
-import sys
 from typing import Generator
 
 from agio.core.workspaces import package
+from agio.core.workspaces.package_index import PackageIndex
 from agio.tools.singleton import Singleton
 
 
@@ -48,28 +48,11 @@ class APackageHub(metaclass=Singleton):
     @classmethod
     def iter_packages(cls) -> Generator[package.APackageManager, None, None]:
         # TODO support zip packages
-
-        def iter_importable_packages():
-            seen = set()
-            for sys_path in sys.path:
-                if not os.path.isdir(sys_path):
-                    continue
-                for entry in os.listdir(sys_path):
-                    if entry.startswith(('_', '.')):
-                        continue
-                    full_path = os.path.join(sys_path, entry)
-                    if os.path.isdir(full_path) and entry not in seen:
-                        seen.add(entry)
-                        yield full_path
-
-        loaded = set()
-        for pkg_path in iter_importable_packages():
-            if package.APackageManager.is_package_root(pkg_path) and pkg_path not in loaded:
-                yield package.APackageManager(pkg_path)
-                loaded.add(pkg_path)
+        for pkg_path, metadata in PackageIndex().load():
+            yield package.APackageManager.from_metadata(pkg_path, metadata)
 
     def collect_callbacks(self):
-        for pkg in self.iter_packages():
+        for pkg in self.get_package_list():
             for pattern in pkg.get_callbacks():
                 for file in glob.glob(pattern, recursive=True):
                     if os.path.isfile(file):
@@ -0,0 +1,141 @@
+"""
+Persistent index of package manifests found on sys.path.
+
+Parsed ``__agio__.yml`` metadata is pickled together with the stat of every
+sys.path directory and every manifest. On warm starts the index is validated
+with a stat sweep instead of listing directories and parsing YAML.
+Changed manifests are parsed again, a changed sys.path directory triggers a full scan.
+Set AGIO_NO_PACKAGE_INDEX=1 to always scan.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Generator
+
+from agio.tools import env_names, local_dirs
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+METADATA_FILENAME = '__agio__.yml'
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def iter_package_roots(paths: list[str]) -> Generator[str, None, None]:
+    """Top level directories with manifest, first one wins for the same directory name"""
+    seen = set()
+    for sys_path in paths:
+        if not os.path.isdir(sys_path):
+            continue
+        for entry in os.listdir(sys_path):
+            if entry.startswith(('_', '.')) or entry in seen:
+                continue
+            full_path = os.path.join(sys_path, entry)
+            if os.path.isdir(full_path):
+                seen.add(entry)
+                if os.path.exists(os.path.join(full_path, METADATA_FILENAME)):
+                    yield full_path
+
+
+def default_index_file() -> Path:
+    if sys.prefix != sys.base_prefix:
+        # next to the workspace venv
+        return Path(sys.prefix, '.agio', 'package-index.pickle')
+    prefix_hash = hashlib.sha1(sys.prefix.encode()).hexdigest()[:12]
+    return local_dirs.cache_dir('package-index', f'{prefix_hash}.pickle')
+
+
+class PackageIndex:
+    def __init__(self, index_file: str | Path = None):
+        self.index_file = Path(index_file) if index_file else default_index_file()
+
+    @staticmethod
+    def _package_entry(root: str) -> dict:
+        from agio.core.workspaces.package import APackageManager
+
+        return {
+            'root': root,
+            'manifest': _stat(os.path.join(root, METADATA_FILENAME)),
+            'pyproject': _stat(os.path.join(root, '..', 'pyproject.toml')),
+            'metadata': APackageManager(root).get_pacakge_metadata(),
+        }
+
+    def _scan(self, paths: tuple[str, ...]) -> dict:
+        return {
+            'version': FORMAT_VERSION,
+            'sys_path': paths,
+            'dirs': [_stat(path) for path in paths],
+            'packages': [self._package_entry(root) for root in iter_package_roots(list(paths))],
+        }
+
+    def _read(self) -> dict | None:
+        try:
+            with open(self.index_file, 'rb') as f:
+                index = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f'Package index is not readable, rescan: {e}')
+            return None
+        if not isinstance(index, dict) or index.get('version') != FORMAT_VERSION:
+            return None
+        return index
+
+    def _write(self, index: dict):
+        tmp_file = self.index_file.with_name(f'{self.index_file.name}.{os.getpid()}.tmp')
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            logger.debug(f'Package index not saved: {e}')
+            tmp_file.unlink(missing_ok=True)
+
+    def _revalidate(self, index: dict, paths: tuple[str, ...]) -> bool | None:
+        """
+        Update changed manifests in place.
+        Returns None if a full scan is required, True if the index was changed
+        """
+        if index['sys_path'] != paths or index['dirs'] != [_stat(path) for path in paths]:
+            return None
+        changed = False
+        for i, entry in enumerate(index['packages']):
+            manifest = _stat(os.path.join(entry['root'], METADATA_FILENAME))
+            if manifest is None:
+                return None
+            if manifest != entry['manifest'] or _stat(os.path.join(entry['root'], '..', 'pyproject.toml')) != entry['pyproject']:
+                index['packages'][i] = self._package_entry(entry['root'])
+                changed = True
+        return changed
+
+    def load(self) -> list[tuple[str, dict]]:
+        """(package root, manifest metadata) of all packages on sys.path"""
+        paths = tuple(sys.path)
+        if os.getenv(env_names.NO_PACKAGE_INDEX):
+            index = self._scan(paths)
+        else:
+            index = self._read()
+            changed = None if index is None else self._revalidate(index, paths)
+            if changed is None:
+                logger.debug('Package index is outdated, scan sys.path')
+                index = self._scan(paths)
+                changed = True
+            if changed:
+                self._write(index)
+        return [(entry['root'], entry['metadata']) for entry in index['packages']]
+
+    def clear(self):
+        self.index_file.unlink(missing_ok=True)
@@ -5,9 +5,11 @@ import logging
 import os
 import shutil
 import sys
+import time
 from typing import TYPE_CHECKING
 
 from diskcache import Cache, Lock
+from packaging.utils import canonicalize_name
 from datetime import datetime
 from functools import cached_property, cache
 from pathlib import Path
@@ -26,9 +28,9 @@ from agio.core.settings import collector
 from agio.core.config import config
 from agio.tools import pkg_manager, local_dirs, env_names
 from agio.tools import launching
+from agio.tools import install_fingerprint, wheel_cache
 from agio.tools.launching import exec_agio_command
 from agio.tools.packaging_tools import collect_packages_to_install
-from agio.tools.venv_helpers import check_current_python_version
 if TYPE_CHECKING:
     from agio.apps.launcher import AApplicationLauncher
 
@@ -39,6 +41,12 @@ class DefaultWorkspaceError(AException):
     pass
 
 
+class InstallLock(Lock):
+    def try_acquire(self) -> bool:
+        """Acquire the lock if it is free, without waiting"""
+        return self._cache.add(self._key, None, expire=self._expire, tag=self._tag, retry=True)
+
+
 class WorkspaceManagerError(AException):
     detail = 'Workspace manager error'
 
@@ -47,6 +55,8 @@ class AWorkspaceManager:
     """Manage workspaces on local host"""
     _meta_file_name = '__agio_ws__.json'
     _local_layout_file_name = '__settings_layout__.json'
+    _timestamp_file_name = 'timestamp'
+    _pids_dir_name = '.pids'
     workspaces_root = Path(config.WS.INSTALL_DIR).expanduser()
     default_python_version = '>=3.11,<3.12'
     __cache_locker = Cache(local_dirs.temp_dir('ws-locker').as_posix())
@@ -71,9 +81,9 @@ class AWorkspaceManager:
         self._extra_launch_envs = {}
         self.app: AApplicationLauncher|None = None
         if self._revision:
-            self.install_lock = Lock(self.__cache_locker, f'ws-locker-{self.revision_id}-{self.root_suffix}')
+            self.install_lock = self.get_install_lock(self.revision_id, self.root_suffix)
         else:
-            self.install_lock = Lock(self.__cache_locker, f'ws-locker-default')
+            self.install_lock = self.get_install_lock()
         if app:
             self.set_app(app)
         else:
@@ -205,6 +215,13 @@ class AWorkspaceManager:
             return cls.from_workspace(ws_id, app=current_app)
         return None
 
+    @classmethod
+    def get_install_lock(cls, revision_id: str = None, suffix: str = None) -> InstallLock:
+        """Lock held while the workspace revision is installed, shared by all processes"""
+        key = f'ws-locker-{revision_id}-{suffix or ""}' if revision_id else 'ws-locker-default'
+        # lock of a crashed install expires
+        return InstallLock(cls.__cache_locker, key, expire=config.WS.INSTALL_LOCK_TIMEOUT)
+
     @classmethod # TODO cache it
     def create_from_id(cls, entity_id: str) -> 'AWorkspaceManager':
         """
@@ -317,55 +334,76 @@ class AWorkspaceManager:
     def install(self, clean: bool = False, no_cache: bool = False):
         if self.install_lock.locked():
             raise WorkspaceInstallationLocked
-        logger.debug(f'Installing workspace {self.install_root}')
-        emit('core.workspace.before_install', {'workspace': self})
-        # check package list
-        if self.revision:
-            package_list = list(self.get_package_list())
-        else:
-            package_list = []
-        # create or recreate venv
-        reinstall = clean or self.need_to_reinstall()
-        if reinstall:
-            logger.info('Reinstalling workspace...')
-            if self.is_installed():
-                self.remove()
-            py_version_required = self.get_py_version()
-            self.venv_manager.create_venv(py_version_required)
-        # install packages
-        if package_list:
-            self.install_packages(*package_list, no_cache=no_cache)
-        # save meta file
-        if self.revision:
-            with open(self.local_meta_file, 'w') as f:
-                data = copy.deepcopy(self.revision.to_dict())
-                data['workspace_suffix'] = self.root_suffix
-                json.dump(data, f, indent=4)
-            logger.debug(f'meta file saved: {self.local_meta_file}')
-            emit('core.workspace.installed',
-                    {'revision': self.revision.id,
-                     'packages': package_list,
-                     'meta_filename': self.local_meta_file,
-                     'workspace_manager': self
-                     }
-                 )
-        else:
-            emit('core.workspace.installed',
-                 {'revision': None,
-                  'packages': [],
-                  'meta_filename': None,
-                  'workspace_manager': self
-                  }
-                 )
+        with self.install_lock:
+            logger.debug(f'Installing workspace {self.install_root}')
+            emit('core.workspace.before_install', {'workspace': self})
+            # check package list
+            if self.revision:
+                package_list = list(self.get_package_list())
+            else:
+                package_list = []
+            releases = collect_packages_to_install(package_list) if package_list else []
+            install_spec = self._get_install_spec(releases)
+            plan = None
+            if not clean and self.is_installed():
+                plan = install_fingerprint.plan_install(self.venv_path, install_spec, self.get_py_version())
+            # create or recreate venv
+            if plan is None or plan.recreate_venv:
+                logger.info('Reinstalling workspace...')
+                if self.is_installed():
+                    self.remove()
+                py_version_required = self.get_py_version()
+                self.venv_manager.create_venv(py_version_required)
+                to_install, reinstall = releases, []
+            else:
+                logger.info(f'Install plan:\n{plan}')
+                if plan.to_remove:
+                    self._remove_packages(*plan.to_remove)
+                to_install = [rel for rel in releases if canonicalize_name(rel.get_package_name()) in plan.to_install]
+                reinstall = plan.to_upgrade
+            # install packages
+            if to_install:
+                self.install_packages(*to_install, no_cache=no_cache, reinstall=reinstall)
+            if plan is None or not plan.is_empty:
+                fingerprint = install_fingerprint.compute_fingerprint(
+                    install_spec, install_fingerprint.read_venv_python_version(self.venv_path))
+                install_fingerprint.save_install_state(self.venv_path, install_spec, fingerprint)
+            # save meta file
+            if self.revision:
+                with open(self.local_meta_file, 'w') as f:
+                    data = copy.deepcopy(self.revision.to_dict())
+                    data['workspace_suffix'] = self.root_suffix
+                    json.dump(data, f, indent=4)
+                logger.debug(f'meta file saved: {self.local_meta_file}')
+                emit('core.workspace.installed',
+                        {'revision': self.revision.id,
+                         'packages': package_list,
+                         'meta_filename': self.local_meta_file,
+                         'workspace_manager': self
+                         }
+                     )
+            else:
+                emit('core.workspace.installed',
+                     {'revision': None,
+                      'packages': [],
+                      'meta_filename': None,
+                      'workspace_manager': self
+                      }
+                     )
         logger.info(f'Workspace installation complete: {self.install_root}')
         if self._revision:
             exec_agio_command(['revision', 'synclocal'], workspace=self.revision_id)
 
     def install_packages(self, *package_list: APackageRelease|str, **kwargs):
         package_list = collect_packages_to_install(package_list)
-        install_args = [pkg.get_installation_command() for pkg in package_list]
+        install_args = APackageRelease.get_installation_commands(package_list)
         event = emit('core.workspace.packages_to_install', {'packages': install_args})
         install_args = event.payload['packages']
+        if config.PKG.WHEEL_CACHE and not kwargs.get('no_cache'):
+            cache = wheel_cache.WheelCache(config.PKG.WHEEL_CACHE_DIR)
+            install_args, report = cache.localize_commands(install_args, config.PKG.WHEEL_PREFETCH_THREADS)
+            if report.items:
+                logger.info(str(report))
         print('='*100)
         print('Venv python version:', self.venv_manager.get_python_version())
         print('Install path:', self.install_root)
@@ -390,15 +428,18 @@ class AWorkspaceManager:
 
     def uninstall_packages(self, *packages: APackage|APackageRelease|str):
         existing_packages = []
+        release_package_ids = []
         for p in packages:
             if isinstance(p, APackage):
                 existing_packages.append(p)
             elif isinstance(p, APackageRelease):
-                existing_packages.append(p.get_package())
+                release_package_ids.append(p.get_package_id())
             elif isinstance(p, str):
                 existing_packages.append(APackage.find(name=p))
             else:
                 raise TypeError(f'Unsupported package type: {type(p)}')
+        if release_package_ids:
+            existing_packages.extend(APackage(data) for data in api.package.get_packages(release_package_ids))
         packages = existing_packages
         all_installed = {x.package_name: x for x in list(self.iter_installed_packages())}
         to_uninstall = [man for _, man in all_installed.items() if man.package in packages]
@@ -413,18 +454,38 @@ class AWorkspaceManager:
     def is_installed(self):
         return self.local_meta_file.exists()
 
+    @property
+    def venv_path(self) -> Path:
+        return self.install_root / '.venv'
+
     def need_to_reinstall(self):
-        if self.is_installed():
-            required_py_version = self.get_py_version()
-            if required_py_version:
-                current_version = self.venv_manager.get_python_version(full=True)
-                if not check_current_python_version(
-                        required_py_version,
-                        current_version):
-                    return True
-        # TODO: check module list hash
-        else:
+        if not self.is_installed():
             return True
+        reason = install_fingerprint.venv_outdated_reason(self.venv_path, self.get_py_version())
+        if reason:
+            logger.debug(f'Workspace venv must be recreated: {reason}')
+        return bool(reason)
+
+    def get_install_plan(self) -> install_fingerprint.InstallPlan:
+        """Packages to add, remove or upgrade to get the revision installed"""
+        package_list = list(self.get_package_list()) if self.revision else []
+        releases = collect_packages_to_install(package_list) if package_list else []
+        return install_fingerprint.plan_install(self.venv_path, self._get_install_spec(releases), self.get_py_version())
+
+    @staticmethod
+    def _get_install_spec(releases: list[APackageRelease]) -> dict[str, dict]:
+        commands = APackageRelease.get_installation_commands(releases) if releases else []
+        return {rel.get_package_name(): {'version': rel.get_version(), 'command': cmd}
+                for rel, cmd in zip(releases, commands)}
+
+    def _remove_packages(self, *names: str):
+        """Uninstall packages by distribution name, not required by the revision anymore"""
+        for pkg in self.iter_installed_packages():
+            if canonicalize_name(pkg.package_name) in names:
+                pkg.execute_package_callback('before_uninstalling', self)
+        status_code = self.venv_manager.uninstall_packages(*names)
+        if status_code:
+            raise PackageInstallationError(f'Failed to uninstall packages. Status code:{status_code}')
 
     @cache
     def get_site_packages_path(self):
@@ -444,22 +505,45 @@ class AWorkspaceManager:
         return False
 
     def touch(self):
-        """Update latest time usage"""
+        """Update latest time usage, the current process is registered as a workspace user"""
         if not self.is_installed():
             raise WorkspaceNotInstalled('Workspace revision not installed locally')
-        timestamp_file = self.install_root / 'timestamp'
-        if not timestamp_file.exists():
-            self.install_root.mkdir(parents=True, exist_ok=True)
-            timestamp_file.write_text(
-                '--- Uses the access time of this file as the last access time of the workspace ---'
-            )
-        timestamp_file.touch(exist_ok=True)
+        # access time is not updated on noatime mounts, time is written to the file
+        self.install_root.joinpath(self._timestamp_file_name).write_text(str(time.time()))
+        # launched apps replace the current process and keep its pid
+        pids_dir = self.install_root / self._pids_dir_name
+        pids_dir.mkdir(exist_ok=True)
+        pids_dir.joinpath(str(os.getpid())).touch()
 
     def get_latest_used_datetime(self):
         if not self.is_installed():
             raise WorkspaceNotInstalled('Workspace revision not installed locally')
-        timestamp_file = self.install_root / 'timestamp'
-        return datetime.fromtimestamp(timestamp_file.stat().st_atime)
+        return datetime.fromtimestamp(self.get_last_used_time(self.install_root))
+
+    @classmethod
+    def get_last_used_time(cls, install_root: Path) -> float:
+        """Time of the last launch or install of the workspace installed to the path"""
+        times = []
+        try:
+            times.append(float(install_root.joinpath(cls._timestamp_file_name).read_text()))
+        except (OSError, ValueError):
+            pass
+        for path in (install_root / cls._meta_file_name, install_root):
+            try:
+                times.append(path.stat().st_mtime)
+                break
+            except OSError:
+                continue
+        return max(times, default=0.0)
+
+    @classmethod
+    def iter_user_pids(cls, install_root: Path):
+        """Processes registered by touch(), may be not running anymore"""
+        pids_dir = install_root / cls._pids_dir_name
+        if pids_dir.exists():
+            for file in pids_dir.iterdir():
+                if file.name.isdigit():
+                    yield int(file.name)
 
     # packages
 
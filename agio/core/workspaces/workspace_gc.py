@@ -0,0 +1,258 @@
+"""
+Garbage collection of installed workspaces and local caches.
+
+Workspaces not used for the max age are removed, then least recently used workspaces and
+cache entries are removed until the total size fits the budget. Workspaces being installed
+(install lock is held) or used by running processes are never removed, the install lock is
+held while a workspace is deleted so an install can't start in the middle.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import psutil
+
+from agio.core.config import config
+from agio.tools import env_names, folder_size, local_dirs, package_store
+from agio.tools.process_utils import process_exists
+from agio.tools.text_helpers import pretty_size
+from .workspace import AWorkspaceManager
+
+logger = logging.getLogger(__name__)
+
+# workspaces without meta file may be installed right now
+INCOMPLETE_INSTALL_AGE = 24 * 3600
+
+
+@dataclass
+class GCItem:
+    path: Path
+    kind: str
+    size: int = 0
+    last_used: float = 0.0
+    revision_id: str | None = None
+    suffix: str = ''
+    remove: bool = False
+    reason: str = ''
+
+
+@dataclass
+class GCReport:
+    items: list[GCItem] = field(default_factory=list)
+    dry_run: bool = False
+    # unused entries of the shared package store
+    store_entries: list = field(default_factory=list)
+
+    @property
+    def removed(self) -> list[GCItem]:
+        return [item for item in self.items if item.remove]
+
+    @property
+    def freed_bytes(self) -> int:
+        return sum(item.size for item in self.removed) + sum(entry.size for entry in self.store_entries)
+
+    @property
+    def kept_bytes(self) -> int:
+        return sum(item.size for item in self.items if not item.remove)
+
+    def __str__(self):
+        lines = []
+        for item in sorted(self.items, key=lambda i: i.last_used):
+            used = time.strftime('%Y-%m-%d %H:%M', time.localtime(item.last_used)) if item.last_used else '-'
+            action = 'REMOVE' if item.remove else 'keep'
+            lines.append(f'{action:<7}{item.kind:<10}{pretty_size(item.size):>10}  {used}  {item.path}  {item.reason}')
+        if self.store_entries:
+            lines.append(f'{"REMOVE":<7}{"store":<10}{pretty_size(sum(e.size for e in self.store_entries)):>10}  '
+                         f'{len(self.store_entries)} unused package store entries')
+        title = 'Can be freed' if self.dry_run else 'Freed'
+        lines.append(f'{title}: {pretty_size(self.freed_bytes)}, kept: {pretty_size(self.kept_bytes)}')
+        return '\n'.join(lines)
+
+
+def _read_meta(install_root: Path) -> dict:
+    try:
+        return json.loads(install_root.joinpath(AWorkspaceManager._meta_file_name).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def iter_workspace_items(root: Path = None):
+    root = Path(root or AWorkspaceManager.workspaces_root)
+    if not root.exists():
+        return
+    for ws_dir in root.iterdir():
+        if not ws_dir.is_dir():
+            continue
+        for install_root in ws_dir.iterdir():
+            if not install_root.is_dir():
+                continue
+            meta = _read_meta(install_root)
+            yield GCItem(
+                path=install_root,
+                kind='workspace',
+                last_used=AWorkspaceManager.get_last_used_time(install_root),
+                revision_id=meta.get('id'),
+                suffix=meta.get('workspace_suffix') or '',
+            )
+
+
+def iter_cache_items():
+    """Entries of caches safe to delete, they are downloaded again when required"""
+    roots = [
+        local_dirs.cache_dir('dependencies'),
+        local_dirs.cache_dir('cached-files'),
+    ]
+    wheel_root = Path(config.PKG.WHEEL_CACHE_DIR, 'sha256')
+    if wheel_root.exists():
+        roots.extend(path for path in wheel_root.iterdir() if path.is_dir())
+    for root in roots:
+        if not root.exists():
+            continue
+        for path in root.iterdir():
+            try:
+                last_used = path.stat().st_mtime
+            except OSError:
+                continue
+            yield GCItem(path=path, kind='cache', last_used=last_used)
+
+
+def find_used_workspaces(items: list[GCItem]) -> dict[Path, str]:
+    """Workspaces used by running processes, {install root: reason}"""
+    used = {}
+    for item in items:
+        for pid in AWorkspaceManager.iter_user_pids(item.path):
+            if pid == os.getpid():
+                continue
+            if process_exists(pid):
+                used[item.path] = f'used by process {pid}'
+                break
+            # process is finished
+            item.path.joinpath(AWorkspaceManager._pids_dir_name, str(pid)).unlink(missing_ok=True)
+    by_revision = {}
+    for item in items:
+        if item.revision_id:
+            by_revision.setdefault(item.revision_id, []).append(item.path)
+    roots = {item.path: os.path.abspath(item.path) + os.sep for item in items}
+    for proc in psutil.process_iter(['pid', 'cmdline']):
+        if proc.pid == os.getpid():
+            continue
+        try:
+            environ = proc.environ()
+        except (psutil.Error, OSError):
+            environ = {}
+        # exe of a venv python is the base interpreter the venv links to, the launched path is in the command line
+        paths = [path for path in (proc.info.get('cmdline') or [])[:1] if os.path.isabs(path)]
+        if environ.get('VIRTUAL_ENV'):
+            paths.append(environ['VIRTUAL_ENV'])
+        for root, prefix in roots.items():
+            if any((path + os.sep).startswith(prefix) for path in paths):
+                used[root] = f'used by process {proc.pid}'
+        for root in by_revision.get(environ.get(env_names.REVISION_ID), ()):
+            used.setdefault(root, f'used by process {proc.pid}')
+    return used
+
+
+def _select(items: list[GCItem], max_age_days: float, size_budget: int, protected: dict[Path, str]):
+    now = time.time()
+    for item in items:
+        if item.path in protected:
+            item.reason = protected[item.path]
+        elif item.kind == 'workspace' and not item.revision_id and now - item.last_used < INCOMPLETE_INSTALL_AGE:
+            item.reason = 'install not completed'
+        elif max_age_days and now - item.last_used > max_age_days * 86400:
+            item.remove, item.reason = True, f'not used for {int((now - item.last_used) / 86400)} days'
+    if size_budget:
+        total = sum(item.size for item in items if not item.remove)
+        for item in sorted(items, key=lambda i: i.last_used):
+            if total <= size_budget:
+                break
+            if item.remove or item.reason:
+                continue
+            item.remove, item.reason = True, 'least recently used, over size budget'
+            total -= item.size
+
+
+def _install_locks(item: GCItem) -> list:
+    if item.revision_id:
+        return [AWorkspaceManager.get_install_lock(item.revision_id, item.suffix)]
+    # meta file is written after install, the folder is named "<revision id>-<suffix>"
+    name = item.path.name
+    splits = [(name, '')] + [(name[:i], name[i + 1:]) for i, char in enumerate(name) if char == '-']
+    return [AWorkspaceManager.get_install_lock(revision_id, suffix) for revision_id, suffix in splits]
+
+
+def _remove_workspace(item: GCItem) -> bool:
+    if not item.revision_id:
+        # not installed completely and not locked, checked on collection
+        shutil.rmtree(item.path)
+        return True
+    lock = _install_locks(item)[0]
+    if not lock.try_acquire():
+        item.remove, item.reason = False, 'install in progress'
+        return False
+    try:
+        # remove events are emitted and the venv is deleted by the package manager
+        if not AWorkspaceManager(root=item.path).remove(fast=True):
+            shutil.rmtree(item.path)
+    finally:
+        lock.release()
+    return True
+
+
+def collect_garbage(
+        max_age_days: float = None,
+        size_budget: int = None,
+        dry_run: bool = False,
+        root: Path = None,
+        include_caches: bool = True,
+) -> GCReport:
+    """
+    max_age_days: remove items not used for this number of days, 0 - no limit
+    size_budget: bytes of workspaces and caches to keep, 0 - no limit
+    """
+    max_age_days = config.WS.GC_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    size_budget = config.WS.GC_SIZE_BUDGET if size_budget is None else size_budget
+    items = list(iter_workspace_items(root))
+    protected = find_used_workspaces(items)
+    current = os.getenv(env_names.REVISION_ID)
+    for item in items:
+        if item.path in protected:
+            continue
+        if any(lock.locked() for lock in _install_locks(item)):
+            protected[item.path] = 'install in progress'
+        elif current and item.revision_id == current:
+            protected[item.path] = 'current workspace'
+    if include_caches:
+        items.extend(iter_cache_items())
+    sizes = folder_size.get_folder_sizes([item.path for item in items if item.path.is_dir()])
+    for item in items:
+        item.size = sizes.get(item.path) or (item.path.stat().st_size if item.path.is_file() else 0)
+    _select(items, max_age_days, size_budget, protected)
+
+    report = GCReport(items, dry_run)
+    if dry_run:
+        report.store_entries = package_store.collect_garbage(dry_run=True)
+        return report
+    for item in report.removed:
+        try:
+            if item.kind == 'workspace':
+                if not _remove_workspace(item):
+                    continue
+            elif item.path.is_dir():
+                shutil.rmtree(item.path)
+            else:
+                item.path.unlink()
+            folder_size.forget(item.path)
+            logger.info(f'Removed {item.kind} {item.path}: {item.reason}')
+        except OSError as e:
+            item.remove, item.reason = False, f'not removed: {e}'
+            logger.warning(f'Failed to remove {item.path}: {e}')
+    # files of removed venvs are not linked anymore
+    report.store_entries = package_store.collect_garbage()
+    return report
@@ -203,6 +203,28 @@ class DiskInfoCommand(ASubCommand):
         click.secho('TODO', fg='yellow')
 
 
+class ApiCacheInfoCommand(ASubCommand):
+    command_name = 'api-cache'
+    help = 'Show API response cache state'
+    arguments = [
+        click.option('--clear', is_flag=True, help='Remove all cached responses'),
+    ]
+
+    def execute(self, clear=False, *args, **kwargs):
+        from agio.core.config import config
+        from agio.core.api.api_client.response_cache import get_response_cache
+
+        cache = get_response_cache()
+        click.echo('Enabled: ', nl=False)
+        click.secho(str(config.API.RESPONSE_CACHE), fg='green' if config.API.RESPONSE_CACHE else 'yellow')
+        click.echo(f'   Path: {cache.path}')
+        click.echo(f'Entries: {len(cache.db)}')
+        click.echo(f'   Size: {cache.db.volume() / 1024 ** 2:.2f} MB')
+        if clear:
+            cache.clear()
+            click.secho('Cache cleared', fg='green')
+
+
 class CurrentAppInfoCommand(ASubCommand):
     command_name = 'current-app'
 
@@ -236,6 +258,7 @@ class InfoCommand(ACommandPlugin):
         ActionsInfoCommand,
         PythonInfoCommand,
         DiskInfoCommand,
+        ApiCacheInfoCommand,
         CurrentAppInfoCommand,
     )
 
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+from agio.core.plugins.base_command import ACommandPlugin
+from agio.tools import env_names, startup_profiler
+
+
+class ProfileStartupCommand(ACommandPlugin):
+    name = 'profile_startup_cmd'
+    command_name = 'profile-startup'
+    arguments = [
+        click.option('-o', '--output', type=click.Path(dir_okay=False), help='Save trace to file'),
+        click.option('-f', '--format', 'output_format', type=click.Choice(['chrome', 'speedscope']),
+                     default='chrome', show_default=True, help='Trace file format'),
+        click.option('-t', '--top', type=int, default=20, show_default=True, help='Number of slowest spans to show'),
+        click.option('-b', '--budget', type=float, help='Fail if startup phases take longer (ms)'),
+        click.argument('command', nargs=-1, type=click.UNPROCESSED),
+    ]
+    context_settings = dict(
+        ignore_unknown_options=True,
+    )
+    help = 'Profile agio startup, imports, plugins and callbacks. Default command: agio --help'
+
+    def execute(self, output: str = None, output_format: str = 'chrome', top: int = 20,
+                budget: float = None, command: tuple = None):
+        trace = self._run_profiled(list(command) or ['--help'])
+        phases = trace['otherData']['phases']
+        self._print_top(trace, top)
+        self._print_packages(trace, top)
+        self._print_phases(phases)
+        if output:
+            data = startup_profiler.to_speedscope(trace) if output_format == 'speedscope' else trace
+            Path(output).write_text(json.dumps(data))
+            click.echo(f'Trace saved: {output}')
+        total = phases.get('cli.ready', phases.get('core.init', 0)) * 1000
+        click.echo('Startup: ', nl=False)
+        click.secho(f'{total:.0f} ms', bold=True)
+        if budget is not None and total > budget:
+            raise click.ClickException(f'Startup time {total:.0f} ms exceeds budget {budget:.0f} ms')
+
+    def _run_profiled(self, args: list[str]) -> dict:
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_file = Path(tmp, 'trace.json')
+            env = dict(os.environ, **{env_names.PROFILE_STARTUP: trace_file.as_posix()})
+            subprocess.run([sys.executable, '-m', 'agio', *args], env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if not trace_file.exists():
+                raise click.ClickException(f'Trace not written, command failed: agio {" ".join(args)}')
+            return startup_profiler.read_trace(trace_file)
+
+    def _print_top(self, trace: dict, count: int):
+        rows = startup_profiler.top_spans(trace, count)
+        width = max([len(row['name']) for row in rows] + [4])
+        click.secho(f"{'self ms':>9} {'total ms':>9}  {'type':<8} {'name':<{width}}  package", fg='yellow')
+        for row in rows:
+            click.echo(f"{row['self'] * 1000:>9.1f} {row['total'] * 1000:>9.1f}  "
+                       f"{row['category']:<8} {row['name']:<{width}}  {row['package']}")
+        click.echo()
+
+    def _print_packages(self, trace: dict, count: int):
+        click.secho(f"{'self ms':>9}  package", fg='yellow')
+        for package, seconds in list(startup_profiler.package_totals(trace).items())[:count]:
+            click.echo(f"{seconds * 1000:>9.1f}  {package}")
+        click.echo()
+
+    def _print_phases(self, phases: dict):
+        click.secho(f"{'ms':>9}  phase", fg='yellow')
+        for name, seconds in phases.items():
+            click.echo(f"{seconds * 1000:>9.1f}  {name}")
+        click.echo()
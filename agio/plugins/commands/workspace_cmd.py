@@ -3,11 +3,10 @@ from collections import defaultdict
 import click
 
 from agio.core.exceptions import WorkspaceNotExists
-from agio.tools import env_names
+from agio.tools import env_names, folder_size
 from agio.core.workspaces import AWorkspaceManager
 from agio.core.workspaces.workspace import AWorkspace
 from agio.core.plugins.base_command import ACommandPlugin, ASubCommand
-from agio.tools.file_utils import get_folder_size
 from agio.tools.text_helpers import pretty_size
 
 
@@ -47,10 +46,11 @@ class ListWorkspaceCommand(ASubCommand):
         if not AWorkspaceManager.workspaces_root.exists():
             print(f'No installed workspaces yet. \nInstall root is not exists: {AWorkspaceManager.workspaces_root.as_posix()}')
             return
-        for ws in AWorkspaceManager.workspaces_root.iterdir():
-            for rev in ws.iterdir():
-                ws_list[ws.name].append({'rev': rev.name, 'size': get_folder_size(rev)})
-                width = max(width, len(rev.name))
+        revisions = [rev for ws in AWorkspaceManager.workspaces_root.iterdir() for rev in ws.iterdir()]
+        sizes = folder_size.get_folder_sizes(revisions)
+        for rev in revisions:
+            ws_list[rev.parent.name].append({'rev': rev.name, 'size': sizes[rev]})
+            width = max(width, len(rev.name))
         if not ws_list:
             print('No workspaces found')
             return
@@ -102,16 +102,30 @@ class UpdateWorkspaceCommand(ASubCommand):
 class CleanupWorkspaceCommand(ASubCommand):
     command_name = 'clean'
     arguments = [
-        click.option('-t', '--time-delta', type=click.INT, default=14, help='Time delta in days'),
+        click.option('-t', '--time-delta', type=click.INT, default=None,
+                     help='Remove workspaces not used for this number of days'),
+        click.option('-s', '--max-size', type=click.FLOAT, default=None,
+                     help='Total size of workspaces and caches in GB, least recently used are removed above it'),
+        click.option('-n', '--dry-run', default=False, is_flag=True, help='Show what would be removed'),
         click.option('-q', '--quiet', default=False, is_flag=True, help='Quiet cleanup'),
     ]
     help = 'Cleanup not used workspaces'
 
-    def execute(self, time_delta: int, quiet: bool = False):
+    def execute(self, time_delta: int = None, max_size: float = None, dry_run: bool = False, quiet: bool = False):
+        from agio.core.workspaces import workspace_gc
+
+        size_budget = int(max_size * 1024 ** 3) if max_size is not None else None
+        report = workspace_gc.collect_garbage(time_delta, size_budget, dry_run=True)
+        if not report.removed and not report.store_entries:
+            print('Nothing to clean')
+            return
+        print(report)
+        if dry_run:
+            return
         if not quiet:
             click.confirm('Do you want to clean workspaces now?', abort=True)
-        print('Cleanup not used workspaces older than {} days'.format(time_delta))
-        click.secho('TODO', fg='yellow')
+        report = workspace_gc.collect_garbage(time_delta, size_budget)
+        click.secho(f'Freed {pretty_size(report.freed_bytes)}', fg='green')
 
 
 class WorkspaceCommand(ACommandPlugin):
@@ -1,9 +1,28 @@
 import os
-from functools import partial
-from typing import Any
+from functools import partial, lru_cache
+from typing import Any, Callable, Sequence, Mapping
 
 from agio.core.plugins.base_dependency_plugin import SettingsDependencySolverPlugin
-from agio.tools.expression_solver import ExpressionSolver
+from agio.tools.expression_solver import compile_expression, CompiledExpression, COMPILED_CACHE_SIZE
+
+
+def _variable_getter(name: str) -> Callable[[Any, dict | None], Any]:
+    """Accessor of the variable value by hub and context, chosen once by the name"""
+    if '.' in name:
+        return lambda settings_hub, context: settings_hub.get(name)
+    elif name.isupper():
+        return lambda settings_hub, context: os.getenv(name)
+
+    def from_context(settings_hub, context):
+        if context and name in context:
+            return context[name]
+        raise NameError(f'Variable named {name} not found')
+    return from_context
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _variable_getters(expression: CompiledExpression) -> tuple[Callable, ...]:
+    return tuple(_variable_getter(name) for name in expression.variables)
 
 
 class ExpressionDependencySolverPlugin(SettingsDependencySolverPlugin):
@@ -13,16 +32,23 @@ class ExpressionDependencySolverPlugin(SettingsDependencySolverPlugin):
     name = 'exp'
 
     def execute(self, field, package_settings, settings_hub, **kwargs):
-        dep = field.get_dependency()
-        solver = ExpressionSolver(partial(self.get_value, settings_hub, kwargs))
-        return solver.solve(dep.value)
+        expression = compile_expression(field.get_dependency().value)
+        context = kwargs.get('context')
+        return expression(*[getter(settings_hub, context) for getter in _variable_getters(expression)])
+
+    def execute_many(self, field, package_settings, settings_hub, contexts: Sequence[Mapping[str, Any]], **kwargs) -> list:
+        """Values for each context, e.g. frame range for many shots"""
+        expression = compile_expression(field.get_dependency().value)
+        return expression.evaluate_many(contexts, partial(self.get_value, settings_hub, kwargs))
+
+    def get_references(self, field) -> list[str]:
+        expression = compile_expression(field.get_dependency().value)
+        return [name for name in expression.variables if '.' in name]
+
+    def is_cacheable(self, field) -> bool:
+        # environment, context and random values may differ on each read
+        expression = compile_expression(field.get_dependency().value)
+        return all('.' in name for name in expression.variables) and not expression.functions & {'random', 'randint'}
 
     def get_value(self, settings_hub, kwargs: dict, name: str) -> Any:
-        if '.' in name:
-            return settings_hub.get(name)
-        elif name.isupper():
-            return os.getenv(name)
-        context = kwargs.get('context')
-        if context and name in context:
-            return context[name]
-        raise NameError(f'Variable named {name} not found')
+        return _variable_getter(name)(settings_hub, kwargs.get('context'))
@@ -19,6 +19,8 @@ SETTINGS_REVISION_ID = 'AGIO_SETTINGS_REVISION_ID'
 SETTINGS_DIR = 'AGIO_SETTINGS_DIR'
 # packages
 GIT_REPOSITORY_TOKEN = 'AGIO_GIT_REPOSITORY_TOKEN'
+PACKAGE_STORE_DIR = 'AGIO_PACKAGE_STORE_DIR'
+PACKAGE_LINK_MODE = 'AGIO_PACKAGE_LINK_MODE'
 # entities
 PROJECT_ID = 'AGIO_PROJECT_ID'
 TASK_ID = 'AGIO_TASK_ID'
@@ -42,7 +44,10 @@ DISABLED_LOGGERS = 'AGIO_DISABLED_LOGGERS'
 # other
 DEBUG = 'AGIO_DEBUG'
 DEBUG_QUERY = 'AGIO_DEBUG_QUERY'
+PROFILE_STARTUP = 'AGIO_PROFILE_STARTUP'
 ALLOW_COMMAND_OUTPUT_TO_CUSTOM_PIPE = 'AGIO_ALLOW_COMMAND_OUTPUT_TO_CUSTOM_PIPE'
 FORCED_GIT_SERVICE = 'AGIO_FORCED_GIT_SERVICE'
 FILE_NO_ENV = 'AGIO_FILE_NO_ENV'
-EXTRA_PACKAGES = 'AGIO_EXTRA_PACKAGES'
\ No newline at end of file
+EXTRA_PACKAGES = 'AGIO_EXTRA_PACKAGES'
+EAGER_PLUGINS = 'AGIO_EAGER_PLUGINS'
+NO_PACKAGE_INDEX = 'AGIO_NO_PACKAGE_INDEX'
\ No newline at end of file
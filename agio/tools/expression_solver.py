@@ -2,123 +2,286 @@ import re
 import math
 import operator
 import random
-from typing import Callable, Dict, List, Optional
+from functools import lru_cache
+from types import CodeType, FunctionType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-class ExpressionSolver:
-    """
-    Expression solver class
-    - any variable must start with "$"
-    - you need to provide function for getting the variables
-    - variable can contain dots and underscores
-    """
-    FUNCTIONS: Dict[str, Callable] = {
-        "sin": math.sin, "cos": math.cos, "tan": math.tan,
-        "sqrt": math.sqrt, "abs": abs, "pow": pow,
-        "random": random.random, "randint": random.randint,
-        "int": int, "float": float,
-    }
-    OPERATORS = {
-        '==': (1, operator.eq), '!=': (1, operator.ne),
-        '<': (1, operator.lt), '<=': (1, operator.le),
-        '>': (1, operator.gt), '>=': (1, operator.ge),
-        '+': (2, operator.add), '-': (2, operator.sub),
-        '*': (3, operator.mul), '/': (3, operator.truediv),
-        '//': (3, operator.floordiv), '%': (3, operator.mod),
-        '**': (4, operator.pow),
+# compiled expressions by source text
+COMPILED_CACHE_SIZE = 1024
+
+FUNCTIONS: Dict[str, Callable] = {
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "sqrt": math.sqrt, "abs": abs, "pow": pow,
+    "random": random.random, "randint": random.randint,
+    "int": int, "float": float,
+}
+OPERATORS = {
+    '==': (1, operator.eq), '!=': (1, operator.ne),
+    '<': (1, operator.lt), '<=': (1, operator.le),
+    '>': (1, operator.gt), '>=': (1, operator.ge),
+    '+': (2, operator.add), '-': (2, operator.sub),
+    '*': (3, operator.mul), '/': (3, operator.truediv),
+    '//': (3, operator.floordiv), '%': (3, operator.mod),
+    '**': (4, operator.pow),
+}
+COMPARISONS = {'==', '!=', '<', '<=', '>', '>='}
+# functions without a vector form with the same results: random values, int() result type
+SCALAR_FUNCTIONS = frozenset({'random', 'randint', 'int'})
+# largest integer exactly represented by float, int results of vector evaluation are exact below it
+_MAX_EXACT_INT = 2 ** 53
+
+# 2-chars operators
+# variables
+# digits
+# funcs
+# 1-char operators
+# anything else is an error
+_TOKEN_PATTERN = re.compile(r'''
+    (\*\*|//|==|!=|<=|>=       |
+    \$[a-zA-Z0-9_.]+           |
+    [0-9]*\.?[0-9]+            |
+    [a-zA-Z_][a-zA-Z0-9_]*     |
+    [+\-*/(),<>%])
+    |(\S)
+    ''',
+    re.VERBOSE)
+
+
+def _as_float(value):
+    # comparison result is a number
+    return float(value) if isinstance(value, bool) else value
+
+
+def _scalar_namespace() -> dict:
+    namespace = {f'fn_{name}': func for name, func in FUNCTIONS.items()}
+    namespace['_as_float'] = _as_float
+    return namespace
+
+
+def _vector_namespace() -> dict | None:
+    if numpy is None:
+        return None
+
+    def as_float(value):
+        return numpy.asarray(value, dtype=float)
+
+    return {
+        'fn_sin': numpy.sin, 'fn_cos': numpy.cos, 'fn_tan': numpy.tan,
+        'fn_sqrt': numpy.sqrt, 'fn_abs': numpy.abs, 'fn_pow': numpy.power,
+        'fn_float': as_float,
+        '_as_float': as_float,
     }
 
-    def __init__(self, eval_variable_callback: Callable[[str], float]):
-        self.eval_var = eval_variable_callback
-        self._tokens: List[str] = []
-        self._pos: int = 0
 
-    def solve(self, expression: str) -> float:
-        self._tokens = self._tokenize(expression)
+class _Parser:
+    """Recursive descent parser producing python source of the expression"""
+
+    def __init__(self, tokens: List[str]):
+        self._tokens = tokens
         self._pos = 0
-        if not self._tokens:
-            return 0.0
-        return self._parse_expression()
-
-    def _tokenize(self, expr: str) -> List[str]:
-        # 2-chars operators
-        # variables
-        # digits
-        # funcs
-        # 1-char operators
-        pattern = re.compile(r'''
-            \*\*                   |  
-            \$[a-zA-Z0-9_.]+       |
-            [0-9]*\.?[0-9]+        |
-            [a-zA-Z_][a-zA-Z0-9_]* |
-            [+\-*/(),<>%]
-            ''',
-        re.VERBOSE)
-        return [t for t in pattern.findall(expr) if t.strip()]
+        self.variables: Dict[str, str] = {}
+        self.functions: set[str] = set()
+        self.vectorizable = True
+
+    def parse(self) -> str:
+        source = self._parse_binary(0)
+        if self._peek() is not None:
+            raise SyntaxError(f"Unexpected token: {self._peek()}")
+        return source
 
     def _peek(self) -> Optional[str]:
         return self._tokens[self._pos] if self._pos < len(self._tokens) else None
 
     def _consume(self, expected: Optional[str] = None) -> str:
+        if self._pos >= len(self._tokens):
+            raise SyntaxError(f"Unexpected end of expression, expected {expected or 'value'}")
         token = self._tokens[self._pos]
         if expected and token != expected:
             raise SyntaxError(f"Expected {expected}, got {token}")
         self._pos += 1
         return token
 
-    def _parse_expression(self) -> float:
-        return self._parse_binary(0)
-
-    def _parse_binary(self, min_precedence: int) -> float:
+    def _parse_binary(self, min_precedence: int) -> str:
         left = self._parse_primary()
         while True:
             token = self._peek()
-            if not token or token not in self.OPERATORS:
+            if not token or token not in OPERATORS:
                 break
 
-            prec, op_func = self.OPERATORS[token]
+            prec, _ = OPERATORS[token]
             if prec < min_precedence:
                 break
 
             self._consume()
             next_min_prec = prec if token == '**' else prec + 1
             right = self._parse_binary(next_min_prec)
-
-            left = op_func(left, right)
-            if isinstance(left, bool):
-                left = float(left)
+            left = f'({left} {token} {right})'
+            if token in COMPARISONS:
+                left = f'_as_float{left}'
         return left
 
-    def _parse_primary(self) -> float:
+    def _parse_primary(self) -> str:
         token = self._consume()
 
         if token == '(':
-            result = self._parse_expression()
+            result = self._parse_binary(0)
             self._consume(')')
             return result
 
         if token == '-':
-            return -self._parse_primary()
+            return f'(-{self._parse_primary()})'
 
         if token.startswith('$'):
-            return self.eval_var(token[1:])
+            name = token[1:]
+            if name not in self.variables:
+                self.variables[name] = f'v{len(self.variables)}'
+            return self.variables[name]
 
-        if token in self.FUNCTIONS:
+        if token in FUNCTIONS:
+            self.functions.add(token)
+            args = []
             if self._peek() == '(':
                 self._consume('(')
-                args = []
                 if self._peek() != ')':
                     while True:
-                        args.append(self._parse_expression())
+                        args.append(self._parse_binary(0))
                         if self._peek() == ',':
                             self._consume(',')
                             continue
                         break
                 self._consume(')')
-                return self.FUNCTIONS[token](*args)
-            return self.FUNCTIONS[token]()
+            if token in SCALAR_FUNCTIONS or (token == 'pow' and len(args) > 2):
+                # pow with modulus, numpy.power takes output array as the third argument
+                self.vectorizable = False
+            return f'fn_{token}({", ".join(args)})'
 
         try:
-            return float(token)
+            return repr(float(token))
         except ValueError:
             raise ValueError(f"Unknown token: {token}")
+
+
+class CompiledExpression:
+    """
+    Expression parsed once to a python function of its variables.
+    Values of variables are passed in order of ``variables``.
+    """
+
+    def __init__(self, expression: str, code: CodeType, variables: tuple[str, ...], functions: frozenset[str],
+                 vectorizable: bool = True):
+        self.expression = expression
+        self.variables = variables
+        self.functions = functions
+        self._vectorizable = vectorizable
+        self._code = code
+        self._func = FunctionType(code, _scalar_namespace())
+        self._vector_func = None
+
+    def __repr__(self):
+        return f'<CompiledExpression {self.expression!r}>'
+
+    def __call__(self, *values) -> Any:
+        return self._func(*values)
+
+    def evaluate(self, get_variable: Callable[[str], Any]) -> Any:
+        return self._func(*[get_variable(name) for name in self.variables])
+
+    @property
+    def vectorizable(self) -> bool:
+        """Batches are evaluated with numpy, functions of SCALAR_FUNCTIONS and pow with modulus have no vector form"""
+        return numpy is not None and self._vectorizable
+
+    def evaluate_many(self, contexts: Sequence[Mapping[str, Any]], get_variable: Callable[[str], Any] = None) -> list:
+        """
+        Evaluate for each context, variables missing in contexts are taken from get_variable once.
+        Numeric batches are evaluated with numpy when it is installed.
+        """
+        if not contexts:
+            return []
+        # list of values per context or one value for all
+        columns = []
+        for name in self.variables:
+            if name in contexts[0]:
+                columns.append([context[name] for context in contexts])
+            elif get_variable is not None:
+                columns.append([get_variable(name)] * len(contexts))
+            else:
+                raise NameError(f'Variable named {name} not found')
+        if self.vectorizable:
+            result = self._evaluate_vector(columns, len(contexts))
+            if result is not None:
+                return result
+        return [self._func(*row) for row in zip(*columns)] if columns else [self._func() for _ in contexts]
+
+    def _evaluate_vector(self, columns: list, size: int) -> list | None:
+        try:
+            arrays = [numpy.asarray(column) for column in columns]
+        except (TypeError, ValueError):
+            return None
+        if any(array.dtype.kind not in 'biuf' for array in arrays):
+            # not numeric values or integers out of int64 range
+            return None
+        if self._vector_func is None:
+            self._vector_func = FunctionType(self._code, _vector_namespace())
+        try:
+            # division by zero, overflow etc. are reported as by the scalar evaluation
+            with numpy.errstate(all='raise'):
+                result = self._vector_func(*[array.astype(float) for array in arrays])
+        except FloatingPointError:
+            return None
+        result = numpy.broadcast_to(result, (size,))
+        integers = arrays and all(array.dtype.kind in 'biu' for array in arrays)
+        if integers and isinstance(self._func(*[column[0] for column in columns]), int):
+            # integer arithmetic gives int for the scalar evaluation
+            if any(numpy.abs(array).max() >= _MAX_EXACT_INT for array in [*arrays, result]):
+                return None
+            result = result.astype(numpy.int64)
+        return result.tolist()
+
+
+def _tokenize(expr: str) -> List[str]:
+    tokens = []
+    for token, unknown in _TOKEN_PATTERN.findall(expr):
+        if unknown:
+            raise SyntaxError(f"Unexpected character {unknown!r} in expression: {expr}")
+        tokens.append(token)
+    return tokens
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def compile_expression(expression: str) -> CompiledExpression:
+    tokens = _tokenize(expression)
+    parser = _Parser(tokens)
+    body = parser.parse() if tokens else '0.0'
+    args = ', '.join(parser.variables.values())
+    code = compile(f'def _expression({args}):\n    return {body}\n', f'<expression {expression!r}>', 'exec')
+    # the function code object, its names are resolved in the namespace of scalar or vector functions
+    func_code = next(const for const in code.co_consts if isinstance(const, CodeType))
+    return CompiledExpression(expression, func_code, tuple(parser.variables), frozenset(parser.functions),
+                              parser.vectorizable)
+
+
+class ExpressionSolver:
+    """
+    Expression solver class
+    - any variable must start with "$"
+    - you need to provide function for getting the variables
+    - variable can contain dots and underscores
+    - expressions are compiled once and cached by text
+    """
+    FUNCTIONS = FUNCTIONS
+    OPERATORS = OPERATORS
+
+    def __init__(self, eval_variable_callback: Callable[[str], float]):
+        self.eval_var = eval_variable_callback
+
+    def solve(self, expression: str) -> float:
+        return compile_expression(expression).evaluate(self.eval_var)
+
+    def solve_many(self, expression: str, contexts: Sequence[Mapping[str, Any]]) -> list:
+        return compile_expression(expression).evaluate_many(contexts, self.eval_var)
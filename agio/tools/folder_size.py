@@ -0,0 +1,117 @@
+"""
+Folder sizes scanned in parallel and cached between runs.
+
+Subfolders of each folder are walked by a thread pool, os.scandir releases the GIL while
+waiting for the disk. Sizes are cached in a diskcache storage and reused while the
+modification times of the upper folder levels are the same, changes deeper in the tree
+are picked up after MAX_AGE.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from agio.tools import local_dirs
+from agio.tools.local_storage import LocalStorage
+
+logger = logging.getLogger(__name__)
+
+# levels of folders checked for changes, enough to see packages added to a venv site-packages
+SIGNATURE_DEPTH = 4
+MAX_AGE = 24 * 3600
+
+_storage = LocalStorage(local_dirs.cache_dir('folder-sizes'))
+
+
+def _walk_size(path: str, seen: set) -> int:
+    """Size of files, each hardlinked file is counted once"""
+    total = 0
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            if stat.st_nlink > 1:
+                                if (stat.st_dev, stat.st_ino) in seen:
+                                    continue
+                                seen.add((stat.st_dev, stat.st_ino))
+                            total += stat.st_size
+                    except OSError:
+                        continue
+        except OSError:
+            logger.debug('Can not read path %s', directory)
+    return total
+
+
+def _signature(path: Path, depth: int = SIGNATURE_DEPTH) -> str:
+    digest = hashlib.sha256()
+    pending = [(str(path), 0)]
+    while pending:
+        directory, level = pending.pop()
+        try:
+            digest.update(f'{directory}:{os.stat(directory).st_mtime_ns};'.encode())
+            if level + 1 < depth:
+                with os.scandir(directory) as entries:
+                    pending.extend((entry.path, level + 1) for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+def _split(path: Path) -> tuple[int, list[str]]:
+    """Size of files directly in the folder and its subfolders"""
+    total, subdirs = 0, []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        logger.debug('Can not read path %s', path)
+    return total, subdirs
+
+
+def get_folder_sizes(paths: list[str | Path], max_workers: int = 8, use_cache: bool = True) -> dict[Path, int]:
+    """Sizes of folders in bytes, unchanged folders are taken from the cache"""
+    sizes, signatures, futures = {}, {}, {}
+    now = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='agio-folder-size') as executor:
+        for path in map(Path, paths):
+            key = str(path.absolute())
+            signatures[path] = _signature(path)
+            if use_cache:
+                cached = _storage.get(key)
+                if cached and cached['signature'] == signatures[path] and now - cached['time'] < MAX_AGE:
+                    sizes[path] = cached['size']
+                    continue
+            # hardlinks are deduplicated inside each subfolder, links between subfolders are rare
+            sizes[path], subdirs = _split(path)
+            futures[path] = [executor.submit(_walk_size, subdir, set()) for subdir in subdirs]
+        for path, path_futures in futures.items():
+            sizes[path] += sum(future.result() for future in path_futures)
+            _storage.set(str(path.absolute()), {'size': sizes[path], 'signature': signatures[path], 'time': now})
+    return sizes
+
+
+def get_folder_size(path: str | Path, use_cache: bool = True) -> int:
+    return get_folder_sizes([path], use_cache=use_cache)[Path(path)]
+
+
+def forget(path: str | Path):
+    """Drop the cached size of a removed folder"""
+    _storage.delete(str(Path(path).absolute()))
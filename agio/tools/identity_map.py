@@ -0,0 +1,64 @@
+"""
+Weak-valued map of live objects by key.
+
+An object stays in the map while something else references it, entries
+older than ``ttl`` seconds are reported as expired so the owner can refresh them.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from typing import Hashable
+
+
+class IdentityMap:
+    def __init__(self, ttl: float = 0):
+        self.ttl = ttl
+        self._objects: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._loaded_at: dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable):
+        obj = self._objects.get(key)
+        if obj is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return obj
+
+    def is_expired(self, key: Hashable) -> bool:
+        if not self.ttl:
+            return False
+        loaded_at = self._loaded_at.get(key)
+        return loaded_at is None or time.monotonic() - loaded_at > self.ttl
+
+    def add(self, key: Hashable, obj):
+        with self._lock:
+            self._objects[key] = obj
+            self._loaded_at[key] = time.monotonic()
+            if len(self._loaded_at) > 2 * len(self._objects) + 100:
+                # timestamps of collected objects
+                self._loaded_at = {k: v for k, v in self._loaded_at.items() if k in self._objects}
+
+    def touch(self, key: Hashable):
+        if key in self._objects:
+            self._loaded_at[key] = time.monotonic()
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._objects.pop(key, None)
+            self._loaded_at.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+            self._loaded_at.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._objects
+
+    def __len__(self) -> int:
+        return len(self._objects)
@@ -0,0 +1,249 @@
+"""
+Install fingerprint of a workspace venv.
+
+The fingerprint is a hash of the resolved install commands, python version and platform.
+It is saved in the venv with the installed packages and the stat of their RECORD files.
+An install plan compares the saved state, the scanned ``*.dist-info`` directories and the
+required packages and lists only packages to add, remove or upgrade.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import platform
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from packaging.utils import canonicalize_name
+from packaging.version import Version, InvalidVersion
+
+from agio.tools.venv_helpers import check_current_python_version
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE_NAME = 'agio-install.json'
+STATE_VERSION = 1
+
+
+def platform_tag() -> str:
+    return f'{sys.platform}-{platform.machine().lower()}'
+
+
+def compute_fingerprint(packages: dict[str, dict], python_version: str, platform_name: str = None) -> str:
+    """
+    packages: {name: {'version': ..., 'command': ...}}
+    """
+    data = {
+        'packages': {canonicalize_name(name): [str(info.get('version')), str(info.get('command'))]
+                     for name, info in packages.items()},
+        'python': python_version,
+        'platform': platform_name or platform_tag(),
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def read_venv_python_version(venv_path: str | Path) -> str | None:
+    """Python version from pyvenv.cfg, without starting the interpreter"""
+    cfg = Path(venv_path, 'pyvenv.cfg')
+    if not cfg.exists():
+        return None
+    for line in cfg.read_text(encoding='utf-8').splitlines():
+        key, _, value = line.partition('=')
+        if key.strip() in ('version_info', 'version'):
+            return value.strip()
+    return None
+
+
+def find_site_packages(venv_path: str | Path) -> Path | None:
+    venv_path = Path(venv_path)
+    if os.name == 'nt':
+        path = venv_path / 'Lib' / 'site-packages'
+        return path if path.exists() else None
+    return next(iter(sorted(venv_path.glob('lib/python*/site-packages'))), None)
+
+
+def _record_signature(dist_info: Path) -> list | None:
+    try:
+        stat = dist_info.joinpath('RECORD').stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def scan_installed(site_packages: str | Path | None) -> dict[str, dict]:
+    """
+    Installed distributions from the names of *.dist-info directories and the stat of their RECORD files.
+    {name: {'version': ..., 'dist_info': ..., 'record': [size, mtime_ns]}}
+    """
+    installed = {}
+    if not site_packages or not Path(site_packages).exists():
+        return installed
+    with os.scandir(site_packages) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.dist-info') or not entry.is_dir():
+                continue
+            name, _, version = entry.name[:-len('.dist-info')].partition('-')
+            installed[canonicalize_name(name)] = {
+                'version': version,
+                'dist_info': entry.name,
+                'record': _record_signature(Path(entry.path)),
+            }
+    return installed
+
+
+@dataclass
+class InstallState:
+    fingerprint: str
+    python_version: str
+    platform: str
+    # {name: {'version', 'command', 'dist_info', 'record'}}
+    packages: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, venv_path: str | Path) -> InstallState | None:
+        path = Path(venv_path, STATE_FILE_NAME)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+            if data.pop('state_version', None) != STATE_VERSION:
+                return None
+            return cls(**data)
+        except (ValueError, TypeError) as e:
+            logger.warning(f'Install state {path} is not readable: {e}')
+            return None
+
+    def save(self, venv_path: str | Path) -> Path:
+        path = Path(venv_path, STATE_FILE_NAME)
+        data = {'state_version': STATE_VERSION, **self.__dict__}
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data, indent=4, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, path)
+        return path
+
+
+@dataclass
+class InstallPlan:
+    fingerprint: str
+    recreate_venv: bool = False
+    to_add: list[str] = field(default_factory=list)
+    to_remove: list[str] = field(default_factory=list)
+    to_upgrade: list[str] = field(default_factory=list)
+    # why packages are changed, {name: reason}
+    reasons: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.recreate_venv or self.to_add or self.to_remove or self.to_upgrade)
+
+    @property
+    def to_install(self) -> list[str]:
+        return self.to_add + self.to_upgrade
+
+    def __str__(self):
+        if self.recreate_venv:
+            return f'Recreate venv: {self.reasons.get("", "")}'
+        if self.is_empty:
+            return 'Up to date'
+        lines = []
+        for title, names in (('add', self.to_add), ('upgrade', self.to_upgrade), ('remove', self.to_remove)):
+            for name in names:
+                lines.append(f'{title:<8} {name}: {self.reasons.get(name, "")}')
+        return '\n'.join(lines)
+
+
+def venv_outdated_reason(venv_path: str | Path, python_required: str = None) -> str | None:
+    """Why the venv must be created again, None if packages can be installed into it"""
+    venv_python = read_venv_python_version(venv_path)
+    if venv_python is None:
+        return 'venv not exists'
+    if python_required and not check_current_python_version(python_required, venv_python):
+        return f'python {venv_python} not match {python_required}'
+    state = InstallState.load(venv_path)
+    if state and (state.python_version, state.platform) != (venv_python, platform_tag()):
+        return f'installed for {state.python_version} {state.platform}'
+    return None
+
+
+def plan_install(venv_path: str | Path, packages: dict[str, dict], python_required: str = None) -> InstallPlan:
+    """
+    Changes required to get the packages installed in the venv.
+    packages: {name: {'version': ..., 'command': ...}}, resolved install commands
+    python_required: version specifier the venv python must match
+    """
+    venv_path = Path(venv_path)
+    packages = {canonicalize_name(name): info for name, info in packages.items()}
+    venv_python = read_venv_python_version(venv_path)
+    plan = InstallPlan(compute_fingerprint(packages, venv_python))
+    reason = venv_outdated_reason(venv_path, python_required)
+    if reason:
+        plan.recreate_venv, plan.reasons[''] = True, reason
+        return plan
+    # venvs installed before install states get all packages installed again
+    state = InstallState.load(venv_path) or InstallState('', venv_python, platform_tag())
+    if state.fingerprint == plan.fingerprint and _same_records(state, venv_path):
+        return plan
+
+    installed = scan_installed(find_site_packages(venv_path))
+    for name, info in packages.items():
+        saved = state.packages.get(name)
+        current = installed.get(name)
+        if current is None:
+            plan.to_add.append(name)
+            plan.reasons[name] = 'not installed'
+        elif saved is None:
+            plan.to_upgrade.append(name)
+            plan.reasons[name] = f'installed {current["version"]} not by workspace'
+        elif (saved['version'], saved['command']) != (info['version'], info['command']):
+            plan.to_upgrade.append(name)
+            plan.reasons[name] = f'{saved["version"]} -> {info["version"]}'
+        elif not _same_version(current['version'], saved['version']) or current['record'] != saved.get('record'):
+            plan.to_upgrade.append(name)
+            plan.reasons[name] = f'changed outside of workspace install ({current["version"]})'
+    for name in state.packages:
+        if name not in packages and name in installed:
+            plan.to_remove.append(name)
+            plan.reasons[name] = 'not required'
+    return plan
+
+
+def _same_version(first: str, second: str) -> bool:
+    try:
+        return Version(first) == Version(second)
+    except InvalidVersion:
+        return first == second
+
+
+def _same_records(state: InstallState, venv_path: Path) -> bool:
+    """Cheap check of installed packages, RECORD files of packages are not changed"""
+    site_packages = find_site_packages(venv_path)
+    if not site_packages:
+        return False
+    for info in state.packages.values():
+        if not info.get('dist_info') or _record_signature(site_packages / info['dist_info']) != info.get('record'):
+            return False
+    return True
+
+
+def save_install_state(venv_path: str | Path, packages: dict[str, dict], fingerprint: str) -> InstallState:
+    """Record installed packages after successful installation"""
+    venv_path = Path(venv_path)
+    installed = scan_installed(find_site_packages(venv_path))
+    state = InstallState(
+        fingerprint=fingerprint,
+        python_version=read_venv_python_version(venv_path),
+        platform=platform_tag(),
+        packages={
+            canonicalize_name(name): {
+                'version': info['version'],
+                'command': info['command'],
+                'dist_info': (installed.get(canonicalize_name(name)) or {}).get('dist_info'),
+                'record': (installed.get(canonicalize_name(name)) or {}).get('record'),
+            } for name, info in packages.items()
+        },
+    )
+    state.save(venv_path)
+    return state
@@ -0,0 +1,151 @@
+"""
+Metadata of python interpreters, probed once and cached on disk.
+
+One probe script returns version, site-packages, sysconfig paths, platform and ABI of an
+interpreter. Results are shared between processes in a diskcache storage and keyed by the
+interpreter path and the stat of the executable and of pyvenv.cfg, so an upgraded
+interpreter or a recreated venv is probed again.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+import threading
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+
+from agio.tools import local_dirs
+from agio.tools.local_storage import LocalStorage
+
+logger = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = 30
+# changed with the probe output
+PROBE_VERSION = 1
+
+PROBE_SCRIPT = '''
+import json, platform, site, sys, sysconfig
+try:
+    site_packages = site.getsitepackages()
+except AttributeError:
+    site_packages = []
+print(json.dumps({
+    "executable": sys.executable,
+    "version": platform.python_version(),
+    "version_info": list(sys.version_info[:3]),
+    "implementation": sys.implementation.name,
+    "prefix": sys.prefix,
+    "base_prefix": getattr(sys, "base_prefix", sys.prefix),
+    "paths": sysconfig.get_paths(),
+    "site_packages": site_packages,
+    "platform": sysconfig.get_platform(),
+    "abi": sysconfig.get_config_var("SOABI") or "",
+    "ext_suffix": sysconfig.get_config_var("EXT_SUFFIX") or "",
+}))
+'''
+
+
+class InterpreterProbeError(RuntimeError):
+    pass
+
+
+@dataclass
+class InterpreterInfo:
+    executable: str
+    version: str
+    version_info: list[int]
+    implementation: str
+    prefix: str
+    base_prefix: str
+    paths: dict[str, str] = field(default_factory=dict)
+    site_packages: list[str] = field(default_factory=list)
+    platform: str = ''
+    abi: str = ''
+    ext_suffix: str = ''
+
+    @property
+    def short_version(self) -> str:
+        return '.'.join(map(str, self.version_info[:2]))
+
+    @property
+    def purelib(self) -> str:
+        return self.paths.get('purelib') or (self.site_packages[0] if self.site_packages else '')
+
+    @property
+    def python_tag(self) -> str:
+        prefix = 'cp' if self.implementation == 'cpython' else self.implementation[:2]
+        return f'{prefix}{self.version_info[0]}{self.version_info[1]}'
+
+    @property
+    def is_venv(self) -> bool:
+        return self.prefix != self.base_prefix
+
+
+_storage = LocalStorage(local_dirs.cache_dir('interpreters'))
+# probed by this process, {key: info}
+_memory: dict[str, InterpreterInfo] = {}
+_lock = threading.Lock()
+
+
+def _cache_key(executable: Path) -> str:
+    """Interpreter path with stat of the executable and venv config, changed by upgrade or venv recreation"""
+    stat = executable.stat()
+    parts = [str(executable), str(stat.st_ino), str(stat.st_size), str(stat.st_mtime_ns)]
+    pyvenv_cfg = executable.parent.parent / 'pyvenv.cfg'
+    try:
+        cfg_stat = pyvenv_cfg.stat()
+        parts.append(str(cfg_stat.st_mtime_ns))
+    except OSError:
+        pass
+    return f'v{PROBE_VERSION}:' + '|'.join(parts)
+
+
+def probe(executable: str | Path) -> InterpreterInfo:
+    """Run the interpreter to get its metadata"""
+    try:
+        result = subprocess.run(
+            [str(executable), '-c', PROBE_SCRIPT],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            timeout=PROBE_TIMEOUT,
+            check=True,
+        )
+        # interpreters of applications may print banners before the script output
+        return InterpreterInfo(**json.loads(result.stdout.strip().splitlines()[-1]))
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError, TypeError) as e:
+        raise InterpreterProbeError(f'Failed to probe python interpreter {executable}: {e}') from e
+
+
+def get_interpreter_info(executable: str | Path, use_cache: bool = True) -> InterpreterInfo:
+    """Interpreter metadata, the interpreter is started only if it is not probed yet"""
+    # venv interpreters are links to the base interpreter, the link path defines the venv
+    executable = Path(os.path.abspath(executable))
+    try:
+        key = _cache_key(executable)
+    except OSError as e:
+        raise InterpreterProbeError(f'Python interpreter not found: {executable}') from e
+    if use_cache:
+        info = _memory.get(key)
+        if info is not None:
+            return info
+        data = _storage.get(key)
+        if data is not None:
+            try:
+                info = _memory[key] = InterpreterInfo(**data)
+                return info
+            except TypeError:
+                pass
+    with _lock:
+        info = probe(executable)
+        _memory[key] = info
+        _storage.set(key, asdict(info))
+    logger.debug(f'Interpreter probed: {executable} {info.version}')
+    return info
+
+
+def clear_cache():
+    _memory.clear()
+    _storage.clear()
@@ -93,6 +93,14 @@ def temp_dir(*inner_parts) -> Path:
     return path
 
 
+def package_store_dir(*inner_parts) -> Path:
+    """Unpacked distributions shared by all venvs, must be on the same disk as venvs to be hardlinked"""
+    path = os.getenv(env_names.PACKAGE_STORE_DIR)
+    if path:
+        return Path(path, *inner_parts).expanduser()
+    return install_dir('store', *inner_parts)
+
+
 # venv directories
 def venv_installation_root(install_path: str|Path = None) -> Path:
     """All virtual envs root"""
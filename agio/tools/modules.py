@@ -73,6 +73,59 @@ def get_class_attrib_value(filepath: str, attribute: str, base_class_name: str):
     return result
 
 
+def _dotted_name(node: ast.expr) -> str | None:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return f'{value}.{node.attr}' if value else None
+    return None
+
+
+def get_module_classes(filepath: str | Path) -> tuple[dict[str, dict], dict[str, str], bool]:
+    """
+    Scan module source without importing.
+    Returns classes defined at module level with base names (dotted as written) and constant class attributes,
+    names bound by absolute imports with the dotted path they refer to and False if the module
+    may define classes the scan can't see (inside if/try/with blocks).
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=str(filepath))
+
+    classes = {}
+    imports = {}
+    complete = True
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            if node.level == 0 and node.module:
+                for alias in node.names:
+                    imports[alias.asname or alias.name] = f'{node.module}.{alias.name}'
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    imports[alias.asname] = alias.name
+                else:
+                    # "import a.b" binds "a"
+                    top = alias.name.split('.')[0]
+                    imports[top] = top
+        elif isinstance(node, ast.ClassDef):
+            bases = [_dotted_name(base) for base in node.bases]
+            attrs = {}
+            for stmt in node.body:
+                if isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Constant):
+                    for target in stmt.targets:
+                        if isinstance(target, ast.Name):
+                            attrs[target.id] = stmt.value.value
+                elif (isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name)
+                      and isinstance(stmt.value, ast.Constant)):
+                    attrs[stmt.target.id] = stmt.value.value
+            classes[node.name] = {'bases': bases, 'attrs': attrs}
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if any(isinstance(child, ast.ClassDef) for child in ast.walk(node)):
+                complete = False
+    return classes, imports, complete
+
+
 def import_modules_from_dir(root: str|Path, parent_name: str, ignore_list=None):
     files_to_import = []
     for file in Path(root).rglob('*.py'):
@@ -0,0 +1,103 @@
+"""
+Machine-wide store of unpacked distributions shared by workspace venvs.
+
+The store is the uv cache: each wheel is unpacked once into an entry addressed by the wheel
+hash and installed into venvs by hardlinks, or reflinks on copy-on-write filesystems.
+A hardlinked file is shared by the store and each venv using it, so its link count is the
+reference count of the entry. Removing an entry never breaks a venv, the files stay alive
+while any venv links them; garbage collection only frees entries no venv uses anymore.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from agio.tools import env_names, local_dirs
+
+logger = logging.getLogger(__name__)
+
+LINK_MODES = ('hardlink', 'clone', 'copy', 'symlink')
+# entries may be unpacked but not linked yet by a running install
+GC_MIN_AGE = 3600
+
+
+def store_dir() -> Path:
+    return local_dirs.package_store_dir()
+
+
+def link_mode() -> str:
+    mode = os.getenv(env_names.PACKAGE_LINK_MODE)
+    if mode:
+        if mode not in LINK_MODES:
+            raise ValueError(f'Unsupported link mode {mode}, expected one of {", ".join(LINK_MODES)}')
+        return mode
+    # APFS clones files, on other systems reflinks are not available everywhere
+    return 'clone' if local_dirs.IS_MAC else 'hardlink'
+
+
+def uv_envs() -> dict:
+    """Environment of uv commands to install packages from the shared store"""
+    envs = {'UV_LINK_MODE': link_mode()}
+    # store configured for uv explicitly is kept
+    if not os.getenv('UV_CACHE_DIR'):
+        envs['UV_CACHE_DIR'] = store_dir().as_posix()
+    return envs
+
+
+@dataclass
+class StoreEntry:
+    path: Path
+    size: int
+    # number of venvs linking files of the entry
+    references: int
+    modified: float
+
+
+def _scan_entry(path: Path) -> StoreEntry:
+    size, references, modified = 0, 0, path.stat().st_mtime
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            size += stat.st_size
+            references = max(references, stat.st_nlink - 1)
+            modified = max(modified, stat.st_mtime)
+    return StoreEntry(path, size, references, modified)
+
+
+def iter_entries(root: str | Path = None):
+    """Unpacked distributions of the store"""
+    root = Path(root or os.getenv('UV_CACHE_DIR') or store_dir())
+    for archive_dir in sorted(root.glob('archive-v*')):
+        with os.scandir(archive_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield _scan_entry(Path(entry.path))
+
+
+def collect_garbage(root: str | Path = None, min_age: float = GC_MIN_AGE, dry_run: bool = False) -> list[StoreEntry]:
+    """
+    Delete entries not linked by any venv.
+    Usage is known only for hardlinked entries, nothing is deleted for other link modes.
+    """
+    if link_mode() != 'hardlink':
+        logger.info(f'Package store usage is not tracked for link mode {link_mode()}')
+        return []
+    now = time.time()
+    removed = []
+    for entry in iter_entries(root):
+        if entry.references or now - entry.modified < min_age:
+            continue
+        if not dry_run:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        removed.append(entry)
+    if removed:
+        logger.info(f'Package store: {len(removed)} unused entries, {sum(e.size for e in removed) / 1024 ** 2:.1f} MB'
+                    f'{" (dry run)" if dry_run else " removed"}')
+    return removed
@@ -1,4 +1,5 @@
 import re
+from functools import cache
 from typing import Callable
 
 from packaging.requirements import Requirement
@@ -6,37 +7,20 @@ from packaging.specifiers import SpecifierSet
 from packaging.version import Version
 
 from agio.core.entities import package as p, package_release as r
-from agio.core.exceptions import PackageNotFound
+from agio.tools.release_resolver import ReleaseIndex, ReleaseResolver, ResolutionImpossible
+from agio.tools.version_ranges import VersionRange, conflicting_bounds
 
 
 class DependencyConflictError(Exception):
-    pass
+    def __init__(self, message: str, bounds: tuple = ()):
+        super().__init__(message)
+        self.bounds = bounds
 
 
 def _specifiers_conflict(spec1: SpecifierSet, spec2: SpecifierSet) -> bool:
-    """Checks if there is at least one version that satisfies both conditions."""
-    # Extract all == constraints from both specifiers
-    eq_versions = []
-    for spec in list(spec1) + list(spec2):
-        if spec.operator in ("==", "==="):
-            eq_versions.append(Version(spec.version))
-
-    # If there are exact version constraints, check if they satisfy the other specifier
-    if eq_versions:
-        for eq_ver in eq_versions:
-            if eq_ver in spec1 and eq_ver in spec2:
-                return False  # Found an exact version that satisfies both
-
-    # Generate a wider range of test versions for other cases
-    test_versions = [Version(f"{major}.{minor}.{patch}")
-                     for major in range(0, 100)
-                     for minor in range(0, 100)
-                     for patch in range(0, 100)]
-
-    for v in reversed(test_versions):  # check from new to old
-        if v in spec1 and v in spec2:
-            return False  # intersection found, no conflict
-    return True  # no intersection, conflict!
+    """Checks if there is no version that satisfies both conditions."""
+    return VersionRange.from_specifier_set(spec1).intersection(
+        VersionRange.from_specifier_set(spec2)).is_empty
 
 
 def _simplify_specifiers(spec: SpecifierSet) -> SpecifierSet:
@@ -44,44 +28,24 @@ def _simplify_specifiers(spec: SpecifierSet) -> SpecifierSet:
     Simplifies the set of specifiers by removing duplicates and leaving only the most restrictive ones.
     For example: ">=0.1.0,>=0.2.0" => ">=0.2.0"
     """
-    specs = list(spec)
-    if not specs:
+    if not spec:
         return spec
-
-    ge_versions = [s for s in specs if s.operator in (">", ">=")]
-    le_versions = [s for s in specs if s.operator in ("<", "<=")]
-    eq_versions = [s for s in specs if s.operator in ("==", "===")]
-
-    # if there are specific versions ==, leave only the newest ones
-    if eq_versions:
-        max_ver = max(Version(s.version) for s in eq_versions)
-        return SpecifierSet(f"=={max_ver}")
-
-    # leave the "newest" lower boundary (>=)
-    ge_spec = None
-    if ge_versions:
-        ge_spec = max(ge_versions, key=lambda s: Version(s.version))
-
-    # leave the "lowest" upper limit (<=)
-    le_spec = None
-    if le_versions:
-        le_spec = min(le_versions, key=lambda s: Version(s.version))
-
-    simplified = []
-    if ge_spec:
-        simplified.append(str(ge_spec))
-    if le_spec:
-        simplified.append(str(le_spec))
-
-    return SpecifierSet(",".join(simplified))
+    version_range = VersionRange.from_specifier_set(spec)
+    if version_range.is_empty:
+        raise DependencyConflictError(f"Version conflict: {spec}")
+    return version_range.to_specifier_set()
 
 
 def _merge_specifiers(spec1: SpecifierSet, spec2: SpecifierSet) -> SpecifierSet:
     """combines two sets of specifiers, checking for conflict."""
-    if _specifiers_conflict(spec1, spec2):
-        raise DependencyConflictError(f"Version conflict: {spec1} and {spec2}")
-    combined = SpecifierSet(str(spec1) + "," + str(spec2))
-    return _simplify_specifiers(combined)
+    range1 = VersionRange.from_specifier_set(spec1)
+    range2 = VersionRange.from_specifier_set(spec2)
+    merged = range1.intersection(range2)
+    if merged.is_empty:
+        bounds = conflicting_bounds(range1, range2) or ()
+        details = f" ({' vs '.join(map(str, bounds))})" if bounds else ""
+        raise DependencyConflictError(f"Version conflict: {spec1} and {spec2}{details}", bounds)
+    return merged.to_specifier_set()
 
 
 def resolve_dependencies(packages: dict) -> list[str]:
@@ -109,61 +73,42 @@ def resolve_dependencies(packages: dict) -> list[str]:
     return sorted(result)
 
 
-def collect_packages_to_install(packages: list[p.APackage|r.APackageRelease|str]) -> list[r.APackageRelease]:
+@cache
+def get_release_index() -> ReleaseIndex:
+    """Process-wide release index shared by all resolutions"""
+    return ReleaseIndex()
+
+
+def collect_packages_to_install(
+        packages: list[p.APackage|r.APackageRelease|str],
+        index: ReleaseIndex = None,
+    ) -> list[r.APackageRelease]:
     """
     Collect and check packages.
     Collect and resolve dependencies
-    return list of package names and versions [package_name==0.0.0, ...]
+    Releases are installed as is, packages and requirement strings ("name>=1.0") get the newest matching release.
     """
-    releases_to_install = []
+    index = index or get_release_index()
+    requirements: dict[str, VersionRange] = {}
+    pinned_releases: list[r.APackageRelease] = []
     for pkg in packages:
         if isinstance(pkg, p.APackageRelease):
-            releases_to_install.append(pkg)
+            pinned_releases.append(pkg)
         elif isinstance(pkg, p.APackage):
-            releases_to_install.append(pkg.latest_release())
+            requirements.setdefault(pkg.name, VersionRange())
         elif isinstance(pkg, str):
-            package_name, version = _split_name_constrain(pkg)
-            if version:
-                package = p.APackage.find(package_name)
-                if not package:
-                    raise PackageNotFound()
-                all_versions = [rel.get_version() for rel in package.iter_releases()]
-                version_to_install = find_best_available_version(None, version, all_versions)
-                rel = package.get_release(version_to_install)
-                releases_to_install.append(rel)
-            else:
-                releases_to_install.append(p.APackage.find(package_name).latest_release())
-    all_dependencies = {}
-    for release in releases_to_install:
-        deps = release.get_dependencies()
-        if deps:
-            all_dependencies[release.get_package_name()] = deps
-    resolved_dependencies = resolve_dependencies(all_dependencies)
-    for release_name in resolved_dependencies:
-        name, version = _split_name_constrain(release_name, strip_constraints=True)
-        pkg = p.APackage.find(name)
-        if not pkg:
-            raise Exception(f'Dependency package "{name}" not found')
-        release = pkg.get_release(version)
-        if not release:
-            _, version_with_constraint = _split_name_constrain(release_name)
-            all_versions = [rel.get_version() for rel in pkg.iter_releases()]
-            version_to_install = find_best_available_version(None, version_with_constraint, all_versions)
-            release = pkg.get_release(version_to_install)
-            if not release:
-                raise Exception(f'Dependency release "{name} v{version}" not found')
-        releases_to_install.append(release)
-    # filter duplicates with max version
-    filtered = dict()
-    for r in releases_to_install:
-        pkg_name = r.get_package_name()
-        if pkg_name not in filtered:
-            filtered[pkg_name] = r
+            req = Requirement(pkg)
+            requirements[req.name] = (requirements.get(req.name, VersionRange())
+                                      & VersionRange.from_specifier_set(req.specifier))
         else:
-            if r.get_version() > filtered[pkg_name].get_version():
-                filtered[pkg_name] = r
-    return list(filtered.values())
-
+            raise TypeError(f'Unsupported package type: {type(pkg)}')
+    index.load([*requirements, *(rel.get_package_name() for rel in pinned_releases)])
+    pinned = {index.add_release(rel.to_dict()): rel for rel in pinned_releases}
+    try:
+        resolved = ReleaseResolver(index).resolve(requirements, list(pinned))
+    except ResolutionImpossible as e:
+        raise DependencyConflictError(f"Version conflict: {e}") from e
+    return [pinned.get(candidate) or r.APackageRelease(candidate.data) for candidate in resolved.values()]
 
 
 def find_best_available_version(
@@ -1,7 +1,6 @@
 import inspect
 import os
 import logging
-import subprocess
 from importlib.metadata import PackageNotFoundError
 from pathlib import Path
 import shlex
@@ -11,7 +10,7 @@ import yaml
 from agio.core.entities import APackage, APackageRelease
 from agio.core.workspaces import APackageManager
 from agio.tools.process_utils import start_process
-from agio.tools import venv_helpers
+from agio.tools import venv_helpers, interpreter_info
 
 try:
     import tomllib as toml
@@ -56,11 +55,10 @@ class PackageManagerBase:
     def site_packages(self):
         if not self.venv_exists():
             raise FileNotFoundError(f'venv is not installed yet: {self.path}')
-        resp = self.run(['run', 'python', '-c', "import sysconfig; print(sysconfig.get_paths()['purelib'])"],
-                        start_process_kwargs=dict(get_output=True))
-        if not resp:
+        site_packages = venv_helpers.get_site_packages_path(self.python_executable)
+        if not site_packages:
             raise ValueError('Get site packages failed, empty response')
-        return resp.strip()
+        return site_packages
 
     @property
     def pyproject_file_path(self):
@@ -75,12 +73,10 @@ class PackageManagerBase:
     def get_python_version(self, full=False):
         if not self.venv_exists():
             return None
-        cmd = [self.python_executable, '--version']
-        result = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True)
-        version = result.split(' ')[-1]
+        info = interpreter_info.get_interpreter_info(self.python_executable)
         if full:
-            return version
-        return '.'.join(version.split('.')[:2])
+            return info.version
+        return info.short_version
 
     def install_package_by_name(self, package_name: str, version: str = None, **kwargs):
         package = APackage.find(package_name)
@@ -13,6 +13,7 @@ from pathlib import Path
 
 import requests
 
+from agio.tools import package_store
 from agio.tools.packaging_tools import find_best_available_version
 from agio.tools.process_utils import start_process
 from .pkg_manager_base import PackageManagerBase
@@ -27,9 +28,7 @@ class UVPackageManager(PackageManagerBase):
     """
 
     def run_envs(self) -> dict|None:
-        return {
-            'UV_LINK_MODE': 'hardlink'
-        }
+        return package_store.uv_envs()
 
     @property
     def venv_path(self):
@@ -43,6 +42,8 @@ class UVPackageManager(PackageManagerBase):
         cmd = ['pip', 'install']
         if kwargs.get('no_cache'):
             cmd.append('--no-cache')
+        for name in kwargs.get('reinstall') or ():
+            cmd.extend(['--reinstall-package', name])
         cmd.extend(packages)
         return self.run(cmd)
 
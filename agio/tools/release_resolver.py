@@ -0,0 +1,222 @@
+"""
+Dependency resolution over an in-memory index of package releases.
+
+ReleaseIndex loads releases of a whole package set with one bulk query per
+dependency level, ReleaseResolver picks one release per package with a
+backtracking search over that index without any further API calls.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+from agio.core import api
+from agio.core.exceptions import PackageNotFound
+from agio.tools.version_ranges import VersionRange
+
+logger = logging.getLogger(__name__)
+
+ANY_VERSION = VersionRange()
+
+
+@dataclass(frozen=True, slots=True)
+class ReleaseCandidate:
+    name: str
+    version: Version
+    data: dict = field(compare=False, repr=False)
+    # (canonical package name, allowed versions) for each required package
+    dependencies: tuple[tuple[str, VersionRange], ...] = field(compare=False, repr=False)
+
+
+def _parse_dependencies(requirements: list[str]) -> tuple[tuple[str, VersionRange], ...]:
+    result = {}
+    for req_str in requirements or ():
+        try:
+            req = Requirement(req_str)
+        except InvalidRequirement:
+            logger.warning(f'Invalid requirement skipped: {req_str!r}')
+            continue
+        name = canonicalize_name(req.name)
+        result[name] = result.get(name, ANY_VERSION) & VersionRange.from_specifier_set(req.specifier)
+    return tuple(result.items())
+
+
+class ReleaseIndex:
+    """
+    {package: releases newest first} with parsed required_packages.
+    Entries older than ``max_age`` seconds are reloaded on next ``load()``.
+    """
+    def __init__(self, client=None, max_age: float = 300):
+        self.client = client
+        self.max_age = max_age
+        self._releases: dict[str, tuple[ReleaseCandidate, ...]] = {}
+        self._loaded_at: dict[str, float] = {}
+        self.queries_count = 0
+
+    def __contains__(self, name: str) -> bool:
+        return canonicalize_name(name) in self._releases
+
+    def releases(self, name: str) -> tuple[ReleaseCandidate, ...]:
+        return self._releases.get(canonicalize_name(name), ())
+
+    def clear(self):
+        self._releases.clear()
+        self._loaded_at.clear()
+
+    def _is_fresh(self, name: str) -> bool:
+        loaded_at = self._loaded_at.get(name)
+        return loaded_at is not None and time.monotonic() - loaded_at < self.max_age
+
+    def load(self, package_names) -> None:
+        """Load given packages and all their dependencies, one bulk query per dependency level."""
+        pending = {canonicalize_name(name) for name in package_names}
+        pending = {name for name in pending if not self._is_fresh(name)}
+        while pending:
+            self._fetch(pending)
+            next_level = set()
+            for name in pending:
+                for release in self._releases[name]:
+                    next_level.update(dep for dep, _ in release.dependencies)
+            pending = {name for name in next_level if not self._is_fresh(name)}
+
+    def _fetch(self, names: set[str]) -> None:
+        found = {name: [] for name in names}
+        self.queries_count += 1
+        for data in api.package.iter_package_releases_by_package_names(list(names), client=self.client):
+            candidate = self._make_candidate(data)
+            if candidate is not None and candidate.name in found:
+                found[candidate.name].append(candidate)
+        now = time.monotonic()
+        for name, candidates in found.items():
+            candidates.sort(key=lambda c: c.version, reverse=True)
+            self._releases[name] = tuple(candidates)
+            self._loaded_at[name] = now
+        logger.debug(f'Release index loaded {sum(map(len, found.values()))} releases of {len(names)} packages')
+
+    @staticmethod
+    def _make_candidate(data: dict) -> ReleaseCandidate | None:
+        try:
+            version = Version(data['name'])
+        except InvalidVersion:
+            logger.warning(f'Release {data["package"]["name"]} {data["name"]!r} has invalid version, skipped')
+            return None
+        return ReleaseCandidate(
+            name=canonicalize_name(data['package']['name']),
+            version=version,
+            data=data,
+            dependencies=_parse_dependencies((data.get('metadata') or {}).get('required_packages')),
+        )
+
+    def add_release(self, data: dict) -> ReleaseCandidate:
+        """Make sure release is in index, e.g. a pinned release missing from the package list"""
+        candidate = self._make_candidate(data)
+        if candidate is None:
+            raise ValueError(f'Release {data["package"]["name"]} has invalid version {data["name"]!r}')
+        releases = self._releases.get(candidate.name, ())
+        for existing in releases:
+            if existing.version == candidate.version:
+                return existing
+        self._releases[candidate.name] = tuple(sorted(releases + (candidate,), key=lambda c: c.version, reverse=True))
+        self._loaded_at.setdefault(candidate.name, time.monotonic())
+        return candidate
+
+
+class ResolutionImpossible(Exception):
+    def __init__(self, name: str, constraint: VersionRange, reason: str):
+        super().__init__(f'{name}: {reason} (allowed versions: {constraint})')
+        self.name = name
+        self.constraint = constraint
+
+
+class ReleaseResolver:
+    """
+    Backtracking search: the most constrained package is decided first, newest
+    candidate first, and its dependencies narrow the ranges of the others.
+    """
+    def __init__(self, index: ReleaseIndex):
+        self.index = index
+        self._candidates_cache: dict[tuple[str, VersionRange], tuple[ReleaseCandidate, ...]] = {}
+        self._dead_ends: set[frozenset] = set()
+        self._conflict: ResolutionImpossible | None = None
+
+    def _candidates(self, name: str, constraint: VersionRange) -> tuple[ReleaseCandidate, ...]:
+        key = (name, constraint)
+        if key not in self._candidates_cache:
+            self._candidates_cache[key] = tuple(c for c in self.index.releases(name) if c.version in constraint)
+        return self._candidates_cache[key]
+
+    def resolve(self,
+                requirements: dict[str, VersionRange],
+                pinned: list[ReleaseCandidate] = ()) -> dict[str, ReleaseCandidate]:
+        """
+        requirements: {package name: allowed versions}
+        pinned: releases that must be installed as is
+        """
+        decisions: dict[str, ReleaseCandidate] = {}
+        constraints: dict[str, VersionRange] = {}
+        for name, constraint in requirements.items():
+            name = canonicalize_name(name)
+            constraints[name] = constraints.get(name, ANY_VERSION) & constraint
+        for candidate in pinned:
+            constraint = constraints.get(candidate.name, ANY_VERSION)
+            if candidate.version not in constraint:
+                raise ResolutionImpossible(candidate.name, constraint, f'pinned release {candidate.version} not allowed')
+            decisions[candidate.name] = candidate
+        for candidate in pinned:
+            if not self._apply_dependencies(candidate, decisions, constraints):
+                raise self._conflict
+        for name in constraints:
+            if not self.index.releases(name):
+                raise PackageNotFound(f'Package "{name}" not found')
+        self._conflict = None
+        pending = set(constraints) - set(decisions)
+        result = self._solve(decisions, constraints, pending)
+        if result is None:
+            raise self._conflict or ResolutionImpossible('', ANY_VERSION, 'no solution')
+        return result
+
+    def _apply_dependencies(self, candidate: ReleaseCandidate, decisions: dict, constraints: dict) -> bool:
+        """Narrow constraints by candidate dependencies in place, False on conflict"""
+        for dep_name, dep_range in candidate.dependencies:
+            merged = constraints.get(dep_name, ANY_VERSION) & dep_range
+            if merged.is_empty:
+                self._conflict = ResolutionImpossible(
+                    dep_name, constraints.get(dep_name, ANY_VERSION),
+                    f'{candidate.name} {candidate.version} requires {dep_range}')
+                return False
+            decided = decisions.get(dep_name)
+            if decided is not None and decided.version not in merged:
+                self._conflict = ResolutionImpossible(
+                    dep_name, merged, f'{decided.version} already selected, {candidate.name} {candidate.version} requires {dep_range}')
+                return False
+            constraints[dep_name] = merged
+        return True
+
+    def _solve(self, decisions: dict, constraints: dict, pending: set) -> dict | None:
+        if not pending:
+            return decisions
+        state = frozenset((n, c.version) for n, c in decisions.items())
+        if state in self._dead_ends:
+            return None
+        name = min(pending, key=lambda n: (len(self._candidates(n, constraints[n])), n))
+        candidates = self._candidates(name, constraints[name])
+        if not candidates:
+            reason = 'no matching release' if self.index.releases(name) else 'package not found'
+            self._conflict = ResolutionImpossible(name, constraints[name], reason)
+        for candidate in candidates:
+            new_decisions = dict(decisions)
+            new_decisions[name] = candidate
+            new_constraints = dict(constraints)
+            if not self._apply_dependencies(candidate, new_decisions, new_constraints):
+                continue
+            new_pending = (pending | {dep for dep, _ in candidate.dependencies}) - new_decisions.keys()
+            result = self._solve(new_decisions, new_constraints, new_pending)
+            if result is not None:
+                return result
+        self._dead_ends.add(state)
+        return None
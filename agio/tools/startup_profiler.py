@@ -0,0 +1,281 @@
+"""
+Startup phases and import timings.
+
+Phases marked with ``phase()`` are always timed, ``phase_timings()`` returns them
+for the ``core.app.startup_timing`` event. With AGIO_PROFILE_STARTUP=<file> every
+module import, plugin, callback and chip module load is recorded as a span and the
+spans are written to the file as Chrome trace events at exit.
+``agio profile-startup`` runs a command with it and prints the slowest spans.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from agio.tools import env_names
+
+_start = time.perf_counter()
+_phases: dict[str, float] = {}
+_spans: list[dict] = []
+_package_roots: dict[str, str] = {}
+_finder: _ImportTimer | None = None
+
+
+def enabled() -> bool:
+    return _finder is not None
+
+
+def _now_us() -> float:
+    return (time.perf_counter() - _start) * 1e6
+
+
+def _add_span(name: str, category: str, ts: float, dur: float, args: dict):
+    _spans.append({
+        'name': name, 'cat': category, 'ph': 'X', 'ts': ts, 'dur': dur,
+        'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+    })
+
+
+@contextmanager
+def span(name: str, category: str, **args):
+    """Recorded only while profiling"""
+    if _finder is None:
+        yield
+        return
+    ts = _now_us()
+    try:
+        yield
+    finally:
+        _add_span(name, category, ts, _now_us() - ts, args)
+
+
+@contextmanager
+def phase(name: str):
+    ts = _now_us()
+    try:
+        yield
+    finally:
+        dur = _now_us() - ts
+        _phases[name] = dur / 1e6
+        if _finder is not None:
+            _add_span(name, 'phase', ts, dur, {})
+
+
+def mark(name: str):
+    """Phase from the profiler import until now"""
+    dur = _now_us()
+    _phases[name] = dur / 1e6
+    if _finder is not None:
+        _add_span(name, 'phase', 0, dur, {})
+
+
+def phase_timings() -> dict[str, float]:
+    """Seconds per finished phase, nested phases are included in their parents"""
+    return dict(_phases)
+
+
+def set_package_roots(roots: dict[str, str]):
+    """Package name per root directory, imports from these directories are attributed to the package"""
+    _package_roots.update({os.path.abspath(root): name for root, name in roots.items()})
+
+
+# import hook
+
+class _TimedLoader:
+    """Times module creation and execution, the original loader is restored on the module"""
+    def __init__(self, loader, name: str):
+        self.loader = loader
+        self.name = name
+        self._ts = None
+
+    def __getattr__(self, item):
+        return getattr(self.loader, item)
+
+    def create_module(self, spec):
+        self._ts = _now_us()
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        spec = module.__spec__
+        if spec is not None and spec.loader is self:
+            spec.loader = self.loader
+        if getattr(module, '__loader__', None) is self:
+            module.__loader__ = self.loader
+        ts = self._ts if self._ts is not None else _now_us()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            _add_span(self.name, 'import', ts, _now_us() - ts,
+                      {'file': getattr(spec, 'origin', None) if spec is not None else None})
+
+
+class _ImportTimer:
+    """Meta path finder wrapping loaders found by the next finders"""
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            if loader is not None and hasattr(loader, 'exec_module') and hasattr(loader, 'create_module'):
+                spec.loader = _TimedLoader(loader, fullname)
+            return spec
+        return None
+
+
+def start(trace_file: str | Path = None):
+    """Record imports and spans, the trace is written to trace_file at exit"""
+    global _finder
+    if _finder is not None:
+        return
+    _finder = _ImportTimer()
+    sys.meta_path.insert(0, _finder)
+    if trace_file:
+        atexit.register(write_trace, trace_file)
+
+
+def stop():
+    global _finder
+    if _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
+    _finder = None
+
+
+def reset():
+    _spans.clear()
+    _phases.clear()
+
+
+# reports
+
+def _package_of(event: dict) -> str:
+    args = event.get('args') or {}
+    if args.get('package'):
+        return args['package']
+    path = args.get('file')
+    if path and os.path.isabs(path):
+        path = os.path.abspath(path)
+        for root, name in _package_roots.items():
+            if path.startswith(root + os.sep):
+                return name
+    if event['cat'] == 'import':
+        return event['name'].split('.')[0]
+    return ''
+
+
+def get_trace() -> dict:
+    """Chrome trace event format, loads in chrome://tracing, Perfetto and speedscope"""
+    events = []
+    for event in _spans:
+        event = dict(event, args=dict(event['args']))
+        event['args']['package'] = _package_of(event)
+        events.append(event)
+    return {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'otherData': {'phases': phase_timings(), 'argv': sys.argv},
+    }
+
+
+def write_trace(trace_file: str | Path):
+    Path(trace_file).write_text(json.dumps(get_trace(), default=str))
+
+
+def read_trace(trace_file: str | Path) -> dict:
+    return json.loads(Path(trace_file).read_text())
+
+
+def _iter_nested(events: list[dict]):
+    """(event, self time) for complete events, children are subtracted per thread"""
+    by_thread = defaultdict(list)
+    for event in events:
+        if event.get('ph') == 'X':
+            by_thread[(event['pid'], event['tid'])].append(event)
+    for thread_events in by_thread.values():
+        thread_events.sort(key=lambda e: (e['ts'], -e['dur']))
+        self_times = [e['dur'] for e in thread_events]
+        stack: list[int] = []
+        for i, event in enumerate(thread_events):
+            while stack and thread_events[stack[-1]]['ts'] + thread_events[stack[-1]]['dur'] <= event['ts']:
+                stack.pop()
+            if stack:
+                self_times[stack[-1]] -= event['dur']
+            stack.append(i)
+        yield from zip(thread_events, self_times)
+
+
+def top_spans(trace: dict, count: int = 20, category: str = None) -> list[dict]:
+    """Slowest spans by self time"""
+    rows = [
+        {'name': e['name'], 'category': e['cat'], 'package': e['args'].get('package', ''),
+         'self': max(self_time, 0) / 1e6, 'total': e['dur'] / 1e6}
+        for e, self_time in _iter_nested(trace['traceEvents'])
+        if category is None or e['cat'] == category
+    ]
+    rows.sort(key=lambda r: r['self'], reverse=True)
+    return rows[:count]
+
+
+def package_totals(trace: dict) -> dict[str, float]:
+    """Self time in seconds per package, phases are not attributed"""
+    totals = defaultdict(float)
+    for event, self_time in _iter_nested(trace['traceEvents']):
+        if event['cat'] != 'phase':
+            totals[event['args'].get('package') or '?'] += max(self_time, 0) / 1e6
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def to_speedscope(trace: dict, name: str = 'agio startup') -> dict:
+    """Evented speedscope profile of the main thread"""
+    events = [e for e in trace['traceEvents'] if e.get('ph') == 'X']
+    if not events:
+        return {'$schema': 'https://www.speedscope.app/file-format-schema.json',
+                'shared': {'frames': []}, 'profiles': []}
+    main_tid = events[0]['tid']
+    events = sorted((e for e in events if e['tid'] == main_tid), key=lambda e: (e['ts'], -e['dur']))
+    frames, frame_index, profile_events = [], {}, []
+    stack: list[tuple[int, float]] = []
+
+    def close_until(ts: float):
+        while stack and stack[-1][1] <= ts:
+            frame, end = stack.pop()
+            profile_events.append({'type': 'C', 'frame': frame, 'at': end})
+
+    for event in events:
+        close_until(event['ts'])
+        key = (event['name'], event['cat'])
+        if key not in frame_index:
+            frame_index[key] = len(frames)
+            frames.append({'name': event['name'], 'file': event['args'].get('file') or event['cat']})
+        end = event['ts'] + event['dur']
+        if stack:
+            # rounding may leave a child ending after its parent
+            end = min(end, stack[-1][1])
+        profile_events.append({'type': 'O', 'frame': frame_index[key], 'at': event['ts']})
+        stack.append((frame_index[key], end))
+    close_until(float('inf'))
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'evented', 'name': name, 'unit': 'microseconds',
+            'startValue': events[0]['ts'], 'endValue': profile_events[-1]['at'],
+            'events': profile_events,
+        }],
+        'name': name,
+        'exporter': 'agio',
+    }
+
+
+_trace_file = os.getenv(env_names.PROFILE_STARTUP)
+if _trace_file:
+    start(_trace_file)
@@ -24,17 +24,11 @@ def _get_site_packages_path(venv_python_path: str) -> str | None: # OLD VERSION
 
 
 def get_site_packages_path(venv_python_path: str) -> str | None:
+    from agio.tools.interpreter_info import get_interpreter_info, InterpreterProbeError
+
     try:
-        result = subprocess.run(
-            [venv_python_path, "-c", "import sysconfig; print(sysconfig.get_paths()['purelib'])"],
-            capture_output=True,
-            text=True,
-            check=True,
-            encoding="utf-8",
-        )
-        site_package = result.stdout.strip()
-        return site_package
-    except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError) as e:
+        return get_interpreter_info(venv_python_path).paths['purelib']
+    except (InterpreterProbeError, KeyError):
         return None
 
 
@@ -0,0 +1,307 @@
+"""
+Interval algebra for PEP 440 version specifiers.
+
+Every specifier is turned into a sorted tuple of disjoint version intervals,
+so intersections are a linear merge instead of probing candidate versions.
+
+    >>> r = VersionRange.from_specifier_set(SpecifierSet('>=1.0,!=1.3'))
+    >>> r.intersection(VersionRange.from_specifier_set(SpecifierSet('<2'))).to_specifier_set()
+    <SpecifierSet('!=1.3,<2,>=1.0')>
+
+Pre-release and local-version filtering rules are not modelled: ranges
+work on the plain PEP 440 version ordering.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from packaging.specifiers import Specifier, SpecifierSet
+from packaging.version import Version
+
+__all__ = ["Bound", "VersionInterval", "VersionRange", "conflicting_bounds"]
+
+# operators whose single interval can be re-emitted as the original specifier text
+_SINGLE_INTERVAL_OPERATORS = frozenset((">=", ">", "<=", "<", "==", "===", "~="))
+
+
+@dataclass(frozen=True, slots=True)
+class Bound:
+    version: Version
+    inclusive: bool
+    source: Specifier | None = field(default=None, compare=False)
+
+    def lower_key(self):
+        # exclusive lower bound is tighter than inclusive one at the same version
+        return self.version, not self.inclusive
+
+    def upper_key(self):
+        # exclusive upper bound is tighter than inclusive one at the same version
+        return self.version, self.inclusive
+
+    def as_lower_spec(self) -> str:
+        if self.source is not None and self.source.operator in _SINGLE_INTERVAL_OPERATORS:
+            return str(self.source)
+        return f"{'>=' if self.inclusive else '>'}{self.version}"
+
+    def as_upper_spec(self) -> str:
+        if self.source is not None and self.source.operator in _SINGLE_INTERVAL_OPERATORS:
+            return str(self.source)
+        return f"{'<=' if self.inclusive else '<'}{self.version}"
+
+    def __str__(self):
+        if self.source is not None:
+            return str(self.source)
+        return f"{'[' if self.inclusive else '('}{self.version}"
+
+
+@dataclass(frozen=True, slots=True)
+class VersionInterval:
+    """Interval of versions, ``None`` bound means unbounded."""
+    lower: Bound | None = None
+    upper: Bound | None = None
+
+    @property
+    def is_empty(self) -> bool:
+        if self.lower is None or self.upper is None:
+            return False
+        if self.lower.version != self.upper.version:
+            return self.lower.version > self.upper.version
+        return not (self.lower.inclusive and self.upper.inclusive)
+
+    @property
+    def is_point(self) -> bool:
+        return (self.lower is not None and self.upper is not None
+                and self.lower.version == self.upper.version
+                and self.lower.inclusive and self.upper.inclusive)
+
+    def intersection(self, other: VersionInterval) -> VersionInterval:
+        return VersionInterval(_max_lower(self.lower, other.lower), _min_upper(self.upper, other.upper))
+
+    def __contains__(self, version: Version) -> bool:
+        if self.lower is not None:
+            if version < self.lower.version or (version == self.lower.version and not self.lower.inclusive):
+                return False
+        if self.upper is not None:
+            if version > self.upper.version or (version == self.upper.version and not self.upper.inclusive):
+                return False
+        return True
+
+    def __str__(self):
+        lower = f"{'[' if self.lower.inclusive else '('}{self.lower.version}" if self.lower else "(-inf"
+        upper = f"{self.upper.version}{']' if self.upper.inclusive else ')'}" if self.upper else "+inf)"
+        return f"{lower}, {upper}"
+
+
+def _max_lower(a: Bound | None, b: Bound | None) -> Bound | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if a.lower_key() >= b.lower_key() else b
+
+
+def _min_upper(a: Bound | None, b: Bound | None) -> Bound | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if a.upper_key() <= b.upper_key() else b
+
+
+def _upper_precedes(a: Bound | None, b: Bound | None) -> bool:
+    """True when upper bound ``a`` ends before or together with upper bound ``b``."""
+    if a is None:
+        return False
+    if b is None:
+        return True
+    return a.upper_key() <= b.upper_key()
+
+
+def _next_release(version: Version, prefix_length: int) -> Version:
+    """First dev version after all versions starting with first ``prefix_length`` release segments."""
+    release = version.release[:prefix_length]
+    release = release[:-1] + (release[-1] + 1,)
+    epoch = f"{version.epoch}!" if version.epoch else ""
+    return Version(f"{epoch}{'.'.join(map(str, release))}.dev0")
+
+
+def _prefix_bounds(spec: Specifier) -> tuple[Version, Version]:
+    """Half-open range [lower, upper) covered by ``==X.*`` prefix match."""
+    prefix = Version(spec.version[:-2])
+    epoch = f"{prefix.epoch}!" if prefix.epoch else ""
+    lower = Version(f"{epoch}{'.'.join(map(str, prefix.release))}.dev0")
+    return lower, _next_release(prefix, len(prefix.release))
+
+
+@lru_cache(maxsize=1024)
+def _specifier_intervals(spec_text: str) -> tuple[VersionInterval, ...]:
+    # keyed by text: equal specifiers like "<1" and "<1.0" must keep their own source
+    spec = Specifier(spec_text)
+    operator, version = spec.operator, spec.version
+    if operator in ("==", "!=") and version.endswith(".*"):
+        lower, upper = _prefix_bounds(spec)
+        if operator == "==":
+            return VersionInterval(Bound(lower, True, spec), Bound(upper, False, spec)),
+        return (VersionInterval(None, Bound(lower, False, spec)),
+                VersionInterval(Bound(upper, True, spec), None))
+
+    v = Version(version)
+    if operator in ("==", "==="):
+        return VersionInterval(Bound(v, True, spec), Bound(v, True, spec)),
+    if operator == "!=":
+        return (VersionInterval(None, Bound(v, False, spec)),
+                VersionInterval(Bound(v, False, spec), None))
+    if operator == ">=":
+        return VersionInterval(Bound(v, True, spec), None),
+    if operator == ">":
+        return VersionInterval(Bound(v, False, spec), None),
+    if operator == "<=":
+        return VersionInterval(None, Bound(v, True, spec)),
+    if operator == "<":
+        return VersionInterval(None, Bound(v, False, spec)),
+    if operator == "~=":
+        # ~=X.Y.Z is >=X.Y.Z,==X.Y.*
+        upper = _next_release(v, len(v.release) - 1)
+        return VersionInterval(Bound(v, True, spec), Bound(upper, False, spec)),
+    raise ValueError(f"Unsupported specifier operator: {spec}")
+
+
+def _excluded_version(spec: Specifier) -> Version:
+    """Lowest version excluded by a != specifier"""
+    if spec.version.endswith(".*"):
+        return _prefix_bounds(spec)[0]
+    return Version(spec.version)
+
+
+class VersionRange:
+    """
+    Union of sorted, disjoint version intervals.
+    ``exclusions`` are the != specifiers of the range, holes between intervals are made of them.
+    """
+    __slots__ = ("intervals", "exclusions")
+
+    def __init__(self, intervals: tuple[VersionInterval, ...] = (VersionInterval(),),
+                 exclusions: frozenset[Specifier] = frozenset()):
+        self.intervals = intervals
+        self.exclusions = exclusions
+
+    @classmethod
+    def from_specifier(cls, spec: Specifier | str) -> VersionRange:
+        spec = Specifier(str(spec))
+        return cls(_specifier_intervals(str(spec)), frozenset((spec,)) if spec.operator == "!=" else frozenset())
+
+    @classmethod
+    def from_specifier_set(cls, spec_set: SpecifierSet | str) -> VersionRange:
+        if isinstance(spec_set, str):
+            spec_set = SpecifierSet(spec_set)
+        result = cls()
+        for spec in spec_set:
+            result = result.intersection(cls.from_specifier(spec))
+        return result
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.intervals
+
+    @property
+    def lower(self) -> Bound | None:
+        return self.intervals[0].lower if self.intervals else None
+
+    @property
+    def upper(self) -> Bound | None:
+        return self.intervals[-1].upper if self.intervals else None
+
+    def intersection(self, other: VersionRange) -> VersionRange:
+        """Linear merge of both interval lists."""
+        result = []
+        a, b = self.intervals, other.intervals
+        i = j = 0
+        while i < len(a) and j < len(b):
+            interval = a[i].intersection(b[j])
+            if not interval.is_empty:
+                result.append(interval)
+            if _upper_precedes(a[i].upper, b[j].upper):
+                i += 1
+            else:
+                j += 1
+        return VersionRange(tuple(result), self.exclusions | other.exclusions)
+
+    __and__ = intersection
+
+    def __contains__(self, version: Version | str) -> bool:
+        if isinstance(version, str):
+            version = Version(version)
+        return any(version in interval for interval in self.intervals)
+
+    def __bool__(self):
+        return bool(self.intervals)
+
+    def __eq__(self, other):
+        if not isinstance(other, VersionRange):
+            return NotImplemented
+        return self.intervals == other.intervals
+
+    def __hash__(self):
+        return hash(self.intervals)
+
+    def to_specifier_set(self) -> SpecifierSet:
+        """Shortest specifier set describing this range, reusing original specifiers where possible."""
+        if not self.intervals:
+            raise ValueError("Empty version range can't be expressed as a specifier set")
+        first, last = self.intervals[0], self.intervals[-1]
+        if len(self.intervals) == 1 and first.is_point:
+            source = first.lower.source or first.upper.source
+            if source is not None and source.operator in ("==", "===") and not source.version.endswith(".*"):
+                return SpecifierSet(str(source))
+            return SpecifierSet(f"=={first.lower.version}")
+        parts = []
+        if first.lower is not None:
+            parts.append(first.lower.as_lower_spec())
+        exclusions = sorted(self.exclusions, key=lambda spec: (_excluded_version(spec), str(spec)))
+        for prev, nxt in zip(self.intervals, self.intervals[1:]):
+            parts.extend(_hole_specs(prev.upper, nxt.lower, exclusions))
+        if last.upper is not None:
+            parts.append(last.upper.as_upper_spec())
+        return SpecifierSet(",".join(dict.fromkeys(parts)))
+
+    def __str__(self):
+        if not self.intervals:
+            return "<empty>"
+        return " | ".join(str(i) for i in self.intervals)
+
+    def __repr__(self):
+        return f"<VersionRange {self}>"
+
+
+def _hole_specs(upper: Bound, lower: Bound, exclusions: list[Specifier]) -> list[str]:
+    """
+    != specifiers of the gap between two intervals.
+    Adjacent exclusions merge into one gap, each of them is kept.
+    """
+    # an excluded region is outside of the range, it is inside the gap if it starts there
+    specs = [str(spec) for spec in exclusions if upper.version <= _excluded_version(spec) <= lower.version]
+    if specs:
+        return specs
+    # holes only come from != specifiers, anything else is a bug in the merge
+    for bound in (upper, lower):
+        if bound.source is not None and bound.source.operator == "!=":
+            return [str(bound.source)]
+    if upper.version == lower.version and not upper.inclusive and not lower.inclusive:
+        return [f"!={upper.version}"]
+    raise ValueError(f"Can't express gap between {upper.version} and {lower.version} as a specifier")
+
+
+def conflicting_bounds(range1: VersionRange, range2: VersionRange) -> tuple[Bound, Bound] | None:
+    """
+    Lower and upper bounds that make the intersection of two ranges empty.
+    Returns None when ranges intersect.
+    """
+    if not range1.intersection(range2).is_empty:
+        return None
+    for a in range1.intervals:
+        for b in range2.intervals:
+            lower, upper = _max_lower(a.lower, b.lower), _min_upper(a.upper, b.upper)
+            if lower is not None and upper is not None:
+                return lower, upper
+    return None
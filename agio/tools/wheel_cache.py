@@ -0,0 +1,309 @@
+"""
+Local cache of downloaded wheels for workspace installs.
+
+Wheels are downloaded in parallel before the package manager runs and stored by the sha256
+of their content, the package manager gets local paths instead of release URLs.
+Interrupted downloads are resumed with HTTP Range requests, If-Range with the ETag or
+Last-Modified of the first response makes the server send the whole file if it has changed.
+The hash is verified against the "#sha256=" fragment of the URL when it is present,
+otherwise the wheel archive is checked against the hashes of its RECORD.
+A URL is downloaded by one process at a time, the partial file is written under a lock
+shared by all processes.
+
+    cache/
+        sha256/ab/<hash>/<wheel file name>
+        urls/<url hash>.json   {"sha256": ..., "filename": ..., "size": ...}
+        partial/<url hash>.part
+        partial/<url hash>.json  {"validator": ...} of the partial file
+        locks/                 diskcache of download locks
+"""
+from __future__ import annotations
+
+import base64
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from urllib.parse import urlsplit, unquote
+
+import requests
+from diskcache import Cache, Lock
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+DOWNLOAD_TIMEOUT = 30
+DOWNLOAD_ATTEMPTS = 3
+# lock of a crashed download expires
+DOWNLOAD_LOCK_TIMEOUT = 30 * 60
+
+
+class WheelHashMismatch(ValueError):
+    pass
+
+
+class InvalidWheel(ValueError):
+    pass
+
+
+@dataclass
+class WheelDownload:
+    url: str
+    path: Path | None = None
+    size: int = 0
+    # bytes received from the network, resumed downloads receive only the rest
+    downloaded: int = 0
+    from_cache: bool = False
+    elapsed: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class PrefetchReport:
+    items: list[WheelDownload] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def downloaded_bytes(self) -> int:
+        return sum(item.downloaded for item in self.items)
+
+    @property
+    def cached_bytes(self) -> int:
+        """Bytes not downloaded again, taken from the cache or from partial downloads"""
+        return sum(item.size - item.downloaded for item in self.items if item.path)
+
+    @property
+    def time_saved(self) -> float:
+        """Estimated by the download speed of this prefetch"""
+        download_time = sum(item.elapsed for item in self.items if item.downloaded)
+        if not self.downloaded_bytes or not download_time:
+            return 0.0
+        return self.cached_bytes / (self.downloaded_bytes / download_time)
+
+    def __str__(self):
+        cached = sum(1 for item in self.items if item.from_cache)
+        failed = sum(1 for item in self.items if item.error)
+        return (f'Wheels: {len(self.items)}, cached {cached}, failed {failed}, '
+                f'downloaded {self.downloaded_bytes / 1024 ** 2:.1f} MB in {self.elapsed:.1f} s, '
+                f'saved {self.cached_bytes / 1024 ** 2:.1f} MB (~{self.time_saved:.1f} s)')
+
+
+def is_wheel_url(command: str) -> bool:
+    parts = urlsplit(command)
+    return parts.scheme in ('http', 'https') and parts.path.endswith('.whl')
+
+
+def _expected_hash(url: str) -> str | None:
+    fragment = urlsplit(url).fragment
+    if fragment.startswith('sha256='):
+        return fragment[len('sha256='):].lower()
+    return None
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.split('#')[0].encode()).hexdigest()
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open('rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _response_validator(response: requests.Response) -> str | None:
+    """Strong ETag or Last-Modified, usable in If-Range"""
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+
+def _read_validator(path: Path) -> str | None:
+    try:
+        return json.loads(path.read_text(encoding='utf-8')).get('validator')
+    except (OSError, ValueError):
+        return None
+
+
+def verify_wheel(path: Path):
+    """
+    Check CRC of all archive members and hashes listed in RECORD,
+    each member is read once
+    """
+    try:
+        with zipfile.ZipFile(path) as wheel:
+            records = [name for name in wheel.namelist()
+                       if name.count('/') == 1 and name.endswith('.dist-info/RECORD')]
+            if len(records) != 1:
+                raise InvalidWheel(f'{path.name}: RECORD not found')
+            hashes = {}
+            for row in csv.reader(io.TextIOWrapper(wheel.open(records[0]), encoding='utf-8')):
+                if len(row) >= 2 and row[1]:
+                    algorithm, _, value = row[1].partition('=')
+                    hashes[row[0]] = (algorithm, value)
+            for info in wheel.infolist():
+                expected = hashes.pop(info.filename, None)
+                digest = hashlib.new(expected[0]) if expected else None
+                # reading to the end checks the CRC
+                with wheel.open(info) as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        if digest:
+                            digest.update(chunk)
+                if digest and base64.urlsafe_b64encode(digest.digest()).rstrip(b'=').decode() != expected[1]:
+                    raise InvalidWheel(f'{path.name}: hash of {info.filename} does not match RECORD')
+            if hashes:
+                raise InvalidWheel(f'{path.name}: missing files {", ".join(sorted(hashes))}')
+    except InvalidWheel:
+        raise
+    except (zipfile.BadZipFile, ValueError, EOFError) as e:
+        raise InvalidWheel(f'{path.name}: {e}') from e
+
+
+class WheelCache:
+    def __init__(self, root: str | Path, session: requests.Session = None):
+        self.root = Path(root)
+        self._session = session or requests.Session()
+
+    @cached_property
+    def _locks(self) -> Cache:
+        return Cache((self.root / 'locks').as_posix())
+
+    def _wheel_path(self, sha256: str, filename: str) -> Path:
+        return self.root / 'sha256' / sha256[:2] / sha256 / filename
+
+    def _index_path(self, url: str) -> Path:
+        return self.root / 'urls' / f'{_url_key(url)}.json'
+
+    def get_cached(self, url: str) -> Path | None:
+        """Wheel downloaded from the url before"""
+        index_path = self._index_path(url)
+        try:
+            data = json.loads(index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        expected = _expected_hash(url)
+        if expected and expected != data.get('sha256'):
+            return None
+        path = self._wheel_path(data['sha256'], data['filename'])
+        try:
+            if path.stat().st_size == data['size']:
+                return path
+        except OSError:
+            pass
+        return None
+
+    def fetch(self, url: str) -> WheelDownload:
+        """Wheel from the cache or downloaded to the cache"""
+        result = WheelDownload(url)
+        start = time.perf_counter()
+        path = self.get_cached(url)
+        if path:
+            result.path, result.size, result.from_cache = path, path.stat().st_size, True
+            return result
+        with Lock(self._locks, f'download-{_url_key(url)}', expire=DOWNLOAD_LOCK_TIMEOUT):
+            # downloaded by another process while waiting for the lock
+            path = self.get_cached(url)
+            if path:
+                result.path, result.size, result.from_cache = path, path.stat().st_size, True
+                return result
+            for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+                try:
+                    result.path = self._download(url, result)
+                    break
+                except WheelHashMismatch:
+                    raise
+                except (requests.RequestException, OSError, InvalidWheel) as e:
+                    logger.debug(f'Download attempt {attempt} of {url} failed: {e}')
+                    if attempt == DOWNLOAD_ATTEMPTS:
+                        raise
+        result.size = result.path.stat().st_size
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _download(self, url: str, result: WheelDownload) -> Path:
+        partial = self.root / 'partial' / f'{_url_key(url)}.part'
+        partial_meta = partial.with_suffix('.json')
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        offset = partial.stat().st_size if partial.exists() else 0
+        # without a validator the partial file may be of another version, it is downloaded again
+        validator = _read_validator(partial_meta) if offset else None
+        headers = {'Range': f'bytes={offset}-', 'If-Range': validator} if validator else {}
+        with self._session.get(url.split('#')[0], headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            if response.status_code == 416:
+                # partial file is complete or broken, start over
+                partial.unlink()
+                partial_meta.unlink(missing_ok=True)
+                return self._download(url, result)
+            response.raise_for_status()
+            if validator and response.status_code == 206:
+                mode = 'ab'
+            else:
+                mode = 'wb'
+                partial_meta.write_text(json.dumps({'validator': _response_validator(response)}), encoding='utf-8')
+            with partial.open(mode) as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    result.downloaded += len(chunk)
+        partial_meta.unlink(missing_ok=True)
+        sha256 = _file_hash(partial)
+        expected = _expected_hash(url)
+        if expected and sha256 != expected:
+            partial.unlink()
+            raise WheelHashMismatch(f'Hash of {url} does not match: {sha256}')
+        if not expected:
+            try:
+                verify_wheel(partial)
+            except InvalidWheel:
+                partial.unlink()
+                raise
+        filename = unquote(urlsplit(url).path.rsplit('/', 1)[-1])
+        path = self._wheel_path(sha256, filename)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(partial, path)
+        index_path = self._index_path(url)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'sha256': sha256, 'filename': filename, 'size': path.stat().st_size}),
+                       encoding='utf-8')
+        os.replace(tmp, index_path)
+        return path
+
+    def prefetch(self, urls: list[str], max_workers: int = 4) -> PrefetchReport:
+        """Download wheels concurrently, failed downloads are reported with an error"""
+        report = PrefetchReport()
+        start = time.perf_counter()
+
+        def fetch(url):
+            try:
+                return self.fetch(url)
+            except Exception as e:
+                logger.warning(f'Wheel prefetch failed {url}: {e}')
+                return WheelDownload(url, error=str(e))
+
+        urls = list(dict.fromkeys(urls))
+        if urls:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))),
+                                    thread_name_prefix='agio-wheels') as executor:
+                report.items = list(executor.map(fetch, urls))
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def localize_commands(self, commands: list[str], max_workers: int = 4) -> tuple[list[str], PrefetchReport]:
+        """Install commands with wheel URLs replaced by cached files, failed URLs are kept"""
+        report = self.prefetch([cmd for cmd in commands if is_wheel_url(cmd)], max_workers)
+        paths = {item.url: item.path.as_posix() for item in report.items if item.path}
+        return [paths.get(cmd, cmd) for cmd in commands], report
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
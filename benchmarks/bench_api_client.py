@@ -0,0 +1,66 @@
+"""
+Client side overhead of ApiClient requests, the network is replaced with a canned response.
+
+    python benchmarks/bench_api_client.py
+"""
+import json
+import timeit
+import uuid
+from datetime import datetime
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from agio.core.api import ApiClient
+from agio.core.api.utils import NOTSET
+
+RESPONSE = json.dumps({'data': {'workspace': {'id': str(uuid.uuid4()), 'name': 'ws'}}}).encode()
+
+
+class _CannedAdapter(HTTPAdapter):
+    """Transport returning the same response, keeps request preparation of requests"""
+    def send(self, request, **kwargs):
+        response = Response()
+        response.status_code = 200
+        response._content = RESPONSE
+        response.request = request
+        response.url = request.url
+        return response
+
+
+def _make_client() -> ApiClient:
+    client = ApiClient(token='benchmark')
+    client.set_response_cache(False)
+    client.session.mount('https://', _CannedAdapter())
+    client.session.mount('http://', _CannedAdapter())
+    return client
+
+
+def _variables() -> dict:
+    return dict(
+        id=uuid.uuid4(),
+        input=dict(
+            name='shot_010',
+            description=NOTSET,
+            fields={'frameStart': 1001, 'frameEnd': 1100, 'tags': ['a', 'b', 'c'], 'created': datetime.now()},
+            assignees=[uuid.uuid4() for _ in range(5)],
+            parentId=NOTSET,
+        ),
+    )
+
+
+def main(number: int = 5000):
+    client = _make_client()
+    query = client.load_query('ws/workspace/getWorkspaceFull')
+    cases = {
+        'make_query_raw': lambda: client.make_query_raw(query, **_variables()),
+        'make_query': lambda: client.make_query('ws/workspace/getWorkspaceFull', **_variables()),
+        'variables only': _variables,
+    }
+    for name, func in cases.items():
+        per_call = timeit.timeit(func, number=number) / number
+        print(f'{name:>16} {per_call * 1e6:8.2f} us per call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Event dispatch with many registered patterns, resolved index against fnmatch over every pattern.
+
+    python benchmarks/bench_events.py
+"""
+import timeit
+from fnmatch import fnmatch
+
+import agio.core  # noqa: F401
+from agio.core.events.event import AEvent
+from agio.core.events.event_hub import EventHub
+
+EVENTS = [
+    'core.api.debug_query_start',
+    'core.services.call_action',
+    'core.app.plugin_loaded',
+    'core.chips.added',
+]
+
+
+def _fnmatch_emit(hub: EventHub, event_name: str):
+    """Dispatch as it was done before the index"""
+    event_obj = AEvent(event_name, None)
+    for pattern, callbacks in list(hub._callbacks.items()):
+        if fnmatch(event_name, pattern):
+            for callback, _ in list(callbacks.items()):
+                callback(event_obj)
+
+
+def main(patterns: int = 500, emits: int = 10000):
+    hub = EventHub.__new__(EventHub)
+    hub.__init__()
+    for i in range(patterns):
+        if i % 5:
+            hub.add_callback(f'pkg{i}.process.action{i}', lambda e: None)
+        else:
+            hub.add_callback(f'pkg{i}.*.action', lambda e: None)
+    hub.add_callback('core.app.*', lambda e: None)
+    hub.add_callback('core.chips.added', lambda e: None)
+    names = [EVENTS[i % len(EVENTS)] for i in range(emits)]
+
+    old = timeit.timeit(lambda: [_fnmatch_emit(hub, name) for name in names], number=1)
+    new = timeit.timeit(lambda: [hub.emit(name, None) for name in names], number=1)
+    dispatch = timeit.timeit(lambda: [hub._resolve(name) for name in names], number=1)
+    print(f'{emits} emits, {patterns} patterns: fnmatch {old * 1e3:.1f} ms, indexed {new * 1e3:.1f} ms '
+          f'(x{old / new:.0f}), pattern resolution only {dispatch * 1e3:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Reads of settings with "exp" dependencies, and an expression evaluated for a batch of shots.
+
+    python benchmarks/bench_expressions.py
+"""
+import timeit
+
+import agio.core  # noqa: F401
+from agio.core.settings import APackageSettings
+from agio.core.settings.dependency import DependencyConfig
+from agio.plugins.dependency_solvers.expression import ExpressionDependencySolverPlugin
+
+EXPRESSIONS = {
+    'first_frame': '$shots.start - $shots.handles',
+    'last_frame': '$shots.start + $shots.duration + $shots.handles - 1',
+    'fps_scale': '$shots.fps / 24 * 2',
+    'width': 'int($shots.resolution * 1.5) // 2 * 2',
+    'is_long': '$shots.duration >= 100',
+}
+
+
+class _Hub:
+    """Source of referenced values, as a settings hub snapshot"""
+    values = {'shots.start': 1001, 'shots.handles': 8, 'shots.duration': 120, 'shots.fps': 25,
+              'shots.resolution': 1920}
+
+    def get(self, name):
+        return self.values[name]
+
+
+class ShotSettings(APackageSettings):
+    first_frame: float = None
+    last_frame: float = None
+    fps_scale: float = None
+    width: float = None
+    is_long: float = None
+
+
+def main(number: int = 20000, shots: int = 10000):
+    plugin = ExpressionDependencySolverPlugin(None, {})
+    hub = _Hub()
+    settings = ShotSettings(
+        _package_name='shots',
+        _solve_dependency_func=lambda field, package_settings, **kwargs: plugin.execute(
+            field, package_settings, hub, **kwargs),
+    )
+    for name, expression in EXPRESSIONS.items():
+        settings.get_parameter(name).set_dependency(DependencyConfig(type='exp', value=expression))
+
+    for name in EXPRESSIONS:
+        settings.get(name)
+        read = timeit.timeit(lambda: settings.get(name), number=number) / number
+        print(f'{name:<12} {read * 1e6:6.2f} us per read')
+
+    # frame range of many shots, per shot values come from the context
+    field = settings.get_parameter('last_frame')
+    field.set_dependency(DependencyConfig(type='exp', value='$start + $duration + $shots.handles - 1'))
+    contexts = [{'start': 1001 + i % 7, 'duration': 50 + i % 100} for i in range(shots)]
+    loop = timeit.timeit(lambda: [plugin.execute(field, settings, hub, context=c) for c in contexts], number=1)
+    if hasattr(plugin, 'execute_many'):
+        batch = timeit.timeit(lambda: plugin.execute_many(field, settings, hub, contexts), number=1)
+        print(f'last_frame for {shots} shots: read per shot {loop * 1e3:.1f} ms, execute_many {batch * 1e3:.1f} ms')
+    else:
+        print(f'last_frame for {shots} shots: read per shot {loop * 1e3:.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Local settings reads: hub.get() from the validated snapshot against validation on every read,
+and cached load() against building the hub from files.
+
+    python benchmarks/bench_settings.py
+"""
+import os
+import tempfile
+import timeit
+
+os.environ.setdefault('AGIO_SETTINGS_DIR', tempfile.mkdtemp())
+
+import agio.core  # noqa: F401
+from agio.core.settings import local_settings
+
+APPS = [{'name': f'app{i}', 'version': f'{i}.0', 'install_dir': f'/opt/app{i}', 'workdir': '', 'extra_args': '',
+         'extra_envs': {'KEY': str(i)}, 'custom_data': {}, 'python_version': '3.11'} for i in range(50)]
+
+
+def main(number: int = 20000):
+    hub = local_settings.load(use_cache=False)
+    if hub.get_package_settings('agio_core') is None:
+        raise SystemExit('agio_core package is not found on sys.path')
+    hub.set('agio_core.applications', APPS)
+    for param in ('agio_core.workspaces_root', 'agio_core.applications'):
+        field = hub.get_parameter(param)
+        value = field._data['value']
+        validate = timeit.timeit(lambda: field.type_adapter.validate_python(value), number=number) / number
+        hub.get(param)
+        read = timeit.timeit(lambda: hub.get(param), number=number) / number
+        print(f'{param:<28} validate per read {validate * 1e6:8.2f} us, snapshot read {read * 1e6:6.2f} us '
+              f'({1 / read / 1e6:.1f}M reads/s)')
+
+    local_settings.save(hub)
+    build = timeit.timeit(lambda: local_settings.load(use_cache=False), number=20) / 20
+    local_settings.load()
+    cached = timeit.timeit(local_settings.load, number=number) / number
+    print(f'load(): build {build * 1e3:.2f} ms, cached {cached * 1e6:.2f} us')
+
+
+if __name__ == '__main__':
+    main()
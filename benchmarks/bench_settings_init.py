@@ -0,0 +1,51 @@
+"""
+Package settings construction: instances for 50 packages as a settings hub creates them,
+and the ui schema of each class.
+
+    python benchmarks/bench_settings_init.py
+"""
+import timeit
+
+import agio.core  # noqa: F401
+from agio.core.settings import APackageSettings
+from agio.core.settings.fields import Vector3Field, RGBColorField, PathField
+from agio.package_settings.local_settings import ApplicationSettings
+
+
+def _settings_class(index: int) -> type[APackageSettings]:
+    namespace = {
+        '__annotations__': {
+            'enabled': bool,
+            'count': int,
+            'scale': float,
+            'title': str,
+            'tags': list[str],
+            'options': dict[str, int],
+            'apps': list[ApplicationSettings],
+        },
+        'enabled': True,
+        'count': index,
+        'scale': 1.5,
+        'title': f'package {index}',
+        'tags': ['a', 'b'],
+        'options': {'a': 1},
+        'apps': (),
+        'position': Vector3Field((0.0, 1.0, 2.0)),
+        'color': RGBColorField((10, 20, 30)),
+        'root': PathField('/tmp'),
+    }
+    return type(f'Package{index}Settings', (APackageSettings,), namespace)
+
+
+def main(packages: int = 50, number: int = 200):
+    classes = [_settings_class(i) for i in range(packages)]
+    init = timeit.timeit(lambda: [cls(_package_name=f'package_{i}', count=i) for i, cls in enumerate(classes)],
+                         number=number) / number
+    first = timeit.timeit(lambda: [cls.__schema__() for cls in classes], number=1)
+    cached = timeit.timeit(lambda: [cls.__schema__() for cls in classes], number=number) / number
+    print(f'{packages} packages: init {init * 1e3:.2f} ms ({init / packages * 1e6:.1f} us each), '
+          f'schema first {first * 1e3:.1f} ms, cached {cached * 1e3:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
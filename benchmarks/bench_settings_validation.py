@@ -0,0 +1,45 @@
+"""
+Validation of large collection settings: one shared list[T] adapter call against
+an adapter created per element.
+
+    python benchmarks/bench_settings_validation.py
+"""
+import timeit
+
+from pydantic import BaseModel, TypeAdapter
+
+import agio.core  # noqa: F401
+from agio.core.settings import APackageSettings
+from agio.package_settings.local_settings import ApplicationSettings
+
+
+class LargeSettings(APackageSettings):
+    frames: list[int] = ()
+    names: list[str] = ()
+    applications: list[ApplicationSettings] = ()
+
+
+def _per_element(element_type, items: list) -> list:
+    """Validation as it was done before the shared adapters"""
+    if issubclass(element_type, BaseModel):
+        return [element_type.model_validate(item) for item in items]
+    return [TypeAdapter(element_type).validate_python(item) for item in items]
+
+
+def main(size: int = 10000, number: int = 3):
+    values = {
+        'frames': (int, [str(i) for i in range(size)]),
+        'names': (str, [f'name_{i}' for i in range(size)]),
+        'applications': (ApplicationSettings, [{'name': f'app{i}', 'version': '1.0', 'extra_envs': {'KEY': str(i)}}
+                                               for i in range(size)]),
+    }
+    settings = LargeSettings()
+    for name, (element_type, items) in values.items():
+        old = timeit.timeit(lambda: _per_element(element_type, items), number=number) / number
+        new = timeit.timeit(lambda: settings.set(name, items), number=number) / number
+        print(f'{name:<13} {size} elements: per element {old * 1e3:8.1f} ms, shared adapter {new * 1e3:6.1f} ms '
+              f'(x{old / new:.0f})')
+
+
+if __name__ == '__main__':
+    main()
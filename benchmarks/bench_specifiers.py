@@ -0,0 +1,31 @@
+"""
+Micro-benchmark for specifier merging used by dependency resolution.
+
+    python benchmarks/bench_specifiers.py
+"""
+import timeit
+
+import agio.core  # noqa: F401  packaging_tools must be imported after core
+from packaging.specifiers import SpecifierSet
+
+from agio.tools.packaging_tools import _merge_specifiers, _specifiers_conflict
+
+CASES = [
+    ('>=0.1.0', '>=0.2.0'),
+    ('>=1.0,<2.0', '!=1.5,~=1.2'),
+    ('==1.*', '>=1.4,<1.9'),
+    ('>=2.0', '<3.0,!=2.5.*'),
+]
+
+
+def main(number: int = 20000):
+    for left, right in CASES:
+        spec1, spec2 = SpecifierSet(left), SpecifierSet(right)
+        merge = timeit.timeit(lambda: _merge_specifiers(spec1, spec2), number=number) / number
+        check = timeit.timeit(lambda: _specifiers_conflict(spec1, spec2), number=number) / number
+        print(f'{left:>12} & {right:<16} merge {merge * 1e6:8.2f} us   conflict check {check * 1e6:8.2f} us'
+              f'   -> {_merge_specifiers(spec1, spec2)}')
+
+
+if __name__ == '__main__':
+    main()
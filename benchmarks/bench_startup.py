@@ -0,0 +1,92 @@
+"""
+Startup costs:
+- package discovery, full sys.path scan against the warm manifest index
+- CLI import with all plugins imported against lazy plugin proxies
+
+    python benchmarks/bench_startup.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+import agio.core  # noqa: F401
+from agio.core.workspaces.package_index import PackageIndex
+from agio.tools import env_names
+
+MANIFEST = """name: {name}
+version: 1.0.{i}
+label: Package {i}
+description: |
+  Benchmark package
+plugins:
+  - name: command_{i}
+    implementations:
+      - module: plugins/commands.py
+        class: Command{i}
+callbacks:
+  - callbacks/startup
+"""
+
+
+def _make_site(root: Path, count: int) -> Path:
+    site = root / 'site-packages'
+    for i in range(count):
+        pkg = site / f'bench_pkg_{i}'
+        pkg.mkdir(parents=True)
+        pkg.joinpath('__agio__.yml').write_text(MANIFEST.format(name=f'bench_pkg_{i}', i=i))
+    # ordinary packages are listed too
+    for i in range(200):
+        site.joinpath(f'other_{i}').mkdir()
+    return site
+
+
+CLI_IMPORT = 'from agio.core.cli.setup_commands import agio_group'
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _cli_import_time(eager: bool, runs: int) -> float:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT.as_posix())
+    env.pop(env_names.EAGER_PLUGINS, None)
+    if eager:
+        env[env_names.EAGER_PLUGINS] = '1'
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', CLI_IMPORT], env=env, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_packages(packages: int = 40, number: int = 50):
+    with tempfile.TemporaryDirectory() as tmp:
+        site = _make_site(Path(tmp), packages)
+        sys.path.append(site.as_posix())
+        index = PackageIndex(Path(tmp, 'index.pickle'))
+        os.environ[env_names.NO_PACKAGE_INDEX] = '1'
+        cold = timeit.timeit(index.load, number=number) / number
+        del os.environ[env_names.NO_PACKAGE_INDEX]
+        index.load()
+        warm = timeit.timeit(index.load, number=number) / number
+        sys.path.remove(site.as_posix())
+    print(f'{packages} packages: scan {cold * 1e3:.2f} ms, warm index {warm * 1e3:.2f} ms')
+
+
+def bench_plugins(runs: int = 7):
+    _cli_import_time(False, 1)  # warm caches
+    eager = _cli_import_time(True, runs)
+    lazy = _cli_import_time(False, runs)
+    print(f'cli import: eager plugins {eager * 1e3:.0f} ms, lazy plugins {lazy * 1e3:.0f} ms')
+
+
+def main():
+    bench_packages()
+    bench_plugins()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+import ast
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agio.core.api import ApiClient, package as api_package
+from agio.core.api.aio import AsyncApiClient, package as aio_package
+from agio.core.api.aio._generator import transform_source
+from agio.core.api.api_client.encoding import prepare_variables
+from agio.core.api.api_client.persisted_queries import PersistedQueries
+from agio.core.api.api_client.query_registry import minify_query
+from agio.core.api.utils import NOTSET
+from agio.core.api.utils.query_tools import PaginationStats, iter_query_list
+from agio.core.exceptions import RequestError
+
+_FIELD_RE = re.compile(r'(?:(\w+)\s*:\s*)?package\s*\(\s*id\s*:\s*\$(\w+)\s*\)')
+
+
+class _GraphQLStandIn(BaseHTTPRequestHandler):
+    """Answers `package(id: $var)` fields, ids starting with "missing" produce field errors"""
+    server: 'ThreadingHTTPServer'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append(dict(body))
+        persisted_query = body.get('extensions', {}).get('persistedQuery')
+        if persisted_query:
+            if not self.server.persisted_queries_supported:
+                return self._send(200, {'errors': [{'message': 'PersistedQueryNotSupported'}]})
+            query_hash = persisted_query['sha256Hash']
+            if 'query' in body:
+                if hashlib.sha256(body['query'].encode()).hexdigest() != query_hash:
+                    return self._send(200, {'errors': [{'message': 'provided sha does not match query'}]})
+                self.server.persisted_queries[query_hash] = body['query']
+            elif query_hash in self.server.persisted_queries:
+                body['query'] = self.server.persisted_queries[query_hash]
+            else:
+                return self._send(200, {'errors': [{'message': 'PersistedQueryNotFound',
+                                                    'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'}}]})
+        if self.server.unauthorized_responses or self.headers.get('Authorization') in self.server.expired_tokens:
+            self.server.unauthorized_responses = max(0, self.server.unauthorized_responses - 1)
+            return self._send(200, {'errors': [{'message': 'UNAUTHORIZED'}]})
+        if 'packages(' in body['query']:
+            return self._send(200, self._packages_page(body['variables']))
+        if self.server.barrier is not None:
+            try:
+                self.server.barrier.wait()
+            except threading.BrokenBarrierError:
+                return self._send(500, {'error': 'requests are not concurrent'})
+        data, errors = {}, []
+        for alias, variable in _FIELD_RE.findall(body['query']):
+            key = alias or 'package'
+            package_id = body.get('variables', {}).get(variable)
+            if package_id.startswith('missing'):
+                data[key] = None
+                errors.append({'message': f'Package {package_id} not found', 'path': [key]})
+            else:
+                data[key] = {'id': package_id, 'name': f'name-{package_id}'}
+        response = {'data': data}
+        if errors:
+            response['errors'] = errors
+        self._send(200, response)
+
+    def _packages_page(self, variables):
+        start = int(variables.get('afterCursor') or 0)
+        end = min(start + variables['first'], self.server.packages_count)
+        return {'data': {'packages': {
+            'edges': [{'node': {'id': f'pkg{i}', 'name': f'name-pkg{i}'}} for i in range(start, end)],
+            'pageInfo': {'hasNextPage': end < self.server.packages_count, 'endCursor': str(end)},
+        }}}
+
+    def _send(self, status, payload):
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def graphql_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _GraphQLStandIn)
+    server.requests = []
+    server.unauthorized_responses = 0
+    server.expired_tokens = set()
+    server.packages_count = 0
+    server.persisted_queries = {}
+    server.persisted_queries_supported = True
+    server.barrier = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def api_client(graphql_server):
+    client = ApiClient(token='test-token')
+    client.base_api_url = f'http://127.0.0.1:{graphql_server.server_address[1]}/graphql'
+    client.set_response_cache(False)
+    return client
+
+
+def test_batch_merges_queries(graphql_server, api_client):
+    with api_client.batch() as batch:
+        results = [batch.add('ws/package/getPackage', id=f'pkg{i}') for i in range(40)]
+    assert len(graphql_server.requests) == 1
+    assert [r.result()['data']['package']['id'] for r in results] == [f'pkg{i}' for i in range(40)]
+
+
+def test_batch_errors_per_query(graphql_server, api_client):
+    with api_client.batch() as batch:
+        ok = batch.add('ws/package/getPackage', id='pkg1')
+        missing = batch.add('ws/package/getPackage', id='missing1')
+    assert ok.result()['data']['package']['name'] == 'name-pkg1'
+    with pytest.raises(RequestError, match='missing1'):
+        missing.result()
+
+
+def test_batch_refreshes_token(graphql_server, api_client, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(api_client, 'refresh', lambda: refreshed.append(True))
+    graphql_server.unauthorized_responses = 1
+    with api_client.batch() as batch:
+        results = [batch.add('ws/package/getPackage', id=f'pkg{i}') for i in range(3)]
+    assert refreshed == [True]
+    assert len(graphql_server.requests) == 2
+    assert results[2].result()['data']['package']['id'] == 'pkg2'
+
+
+def test_concurrent_requests(graphql_server, api_client):
+    # both requests are in flight at once, the session lock is not held while sending
+    graphql_server.barrier = threading.Barrier(2, timeout=5)
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(api_package.get_package(f'pkg{i}', client=api_client)))
+               for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(p['id'] for p in results) == ['pkg0', 'pkg1']
+
+
+def _join_prefetch_threads():
+    for thread in threading.enumerate():
+        if thread.name == 'agio-page-prefetch':
+            thread.join()
+
+
+def test_async_client_concurrent_queries(graphql_server, api_client):
+    async def main():
+        async with AsyncApiClient(api_client, max_concurrency=4) as client:
+            return await asyncio.gather(*(aio_package.get_package(f'pkg{i}', client=client) for i in range(20)))
+
+    packages = asyncio.run(main())
+    assert [p['id'] for p in packages] == [f'pkg{i}' for i in range(20)]
+    assert len(graphql_server.requests) == 20
+
+
+def test_async_client_batch(graphql_server, api_client):
+    async def main():
+        async with AsyncApiClient(api_client) as client:
+            return await aio_package.get_packages([f'pkg{i}' for i in range(10)], client=client)
+
+    assert [p['name'] for p in asyncio.run(main())] == [f'name-pkg{i}' for i in range(10)]
+    assert len(graphql_server.requests) == 1
+
+
+def test_async_client_shares_refresh(graphql_server, api_client, monkeypatch):
+    refreshed = []
+
+    def refresh():
+        refreshed.append(True)
+        api_client._set_token('new-token')
+
+    monkeypatch.setattr(api_client, 'refresh', refresh)
+    graphql_server.expired_tokens.add('Bearer test-token')
+
+    async def main():
+        async with AsyncApiClient(api_client, max_concurrency=8) as client:
+            return await asyncio.gather(*(aio_package.get_package(f'pkg{i}', client=client) for i in range(8)))
+
+    assert len(asyncio.run(main())) == 8
+    # concurrent requests wait for one refresh, sync client gets the new token too
+    assert refreshed == [True]
+    assert api_client.session.headers['Authorization'] == 'Bearer new-token'
+
+
+def test_pagination_prefetch_shares_refresh(graphql_server, api_client, monkeypatch):
+    refreshed = []
+
+    def refresh():
+        refreshed.append(True)
+        api_client._set_token('new-token')
+
+    monkeypatch.setattr(api_client, 'refresh', refresh)
+    graphql_server.packages_count = 100
+    graphql_server.expired_tokens.add('Bearer test-token')
+    results = []
+
+    def consume():
+        results.append(len(list(iter_query_list('ws/package/getPackageList', 'packages', items_per_page=10,
+                                                client=api_client))))
+
+    threads = [threading.Thread(target=consume) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # requests of prefetch threads wait for one refresh
+    assert results == [100] * 4
+    assert refreshed == [True]
+
+
+def test_async_transform():
+    tree, kinds = transform_source("""
+from agio.core.api import client as default_client
+from agio.core.api.utils import api_call
+from agio.core.api.utils.query_tools import iter_query_list
+
+@api_call
+def iter_items(client=default_client):
+    yield from iter_query_list('items', 'items', client=client)
+
+@api_call
+def first_item(client=default_client):
+    try:
+        return next(iter_items(client=client))
+    except StopIteration:
+        return None
+
+@api_call
+def all_items(client=default_client):
+    return len(list(iter_items(client=client)))
+
+def _helper(value):
+    return value
+""")
+    assert kinds == {'iter_items': 'asyncgen', 'first_item': 'coroutine', 'all_items': 'coroutine', '_helper': 'sync'}
+    source = ast.unparse(tree)
+    assert 'async for _item in iter_query_list' in source
+    assert 'await anext(iter_items(client=client))' in source
+    assert 'except StopAsyncIteration' in source
+    assert 'len([_item async for _item in iter_items(client=client)])' in source
+
+
+def test_pagination_prefetch(graphql_server, api_client):
+    graphql_server.packages_count = 230
+    stats = PaginationStats()
+    items = list(iter_query_list('ws/package/getPackageList', 'packages', items_per_page=10,
+                                 client=api_client, stats=stats))
+    assert [item['id'] for item in items] == [f'pkg{i}' for i in range(230)]
+    # fast full pages grow up to the max page size
+    assert stats.page_sizes[:4] == [10, 20, 40, 80]
+    assert stats.items == 230 and stats.pages == len(graphql_server.requests)
+    assert stats.prefetched_pages == stats.pages - 1 and stats.bytes > 0
+    assert not stats.cancelled
+
+
+def test_pagination_early_stop(graphql_server, api_client):
+    graphql_server.packages_count = 1000
+    stats = PaginationStats()
+    items = iter_query_list('ws/package/getPackageList', 'packages', items_per_page=10,
+                            client=api_client, stats=stats)
+    assert [next(items) for _ in range(15)][-1]['id'] == 'pkg14'
+    items.close()
+    assert stats.cancelled
+    # request in flight may complete, no new requests after the stop
+    _join_prefetch_threads()
+    assert len(graphql_server.requests) <= 4
+
+    # consumer of the first page only makes one request
+    graphql_server.requests.clear()
+    items = iter_query_list('ws/package/getPackageList', 'packages', items_per_page=10, client=api_client)
+    assert next(items)['id'] == 'pkg0'
+    items.close()
+    # prefetch never started
+    assert not any(thread.name == 'agio-page-prefetch' for thread in threading.enumerate())
+    assert len(graphql_server.requests) == 1
+
+    graphql_server.requests.clear()
+    assert len(list(api_package.iter_packages(limit=25, client=api_client))) == 25
+    # limit caps the page size
+    assert graphql_server.requests[0]['variables']['first'] == 25
+
+
+def test_async_pagination(graphql_server, api_client):
+    graphql_server.packages_count = 120
+
+    async def main():
+        async with AsyncApiClient(api_client) as client:
+            return [item['id'] async for item in aio_package.iter_packages(client=client)]
+
+    assert asyncio.run(main()) == [f'pkg{i}' for i in range(120)]
+
+
+def test_minify_query():
+    query = """
+    # comment
+    query Find($first: Int!, $name: String = "a, b") {
+      items(first: $first, offset: -10, name: $name) {
+        ...on Item { id }
+        #{{PARENT-QUERY}}#
+      }
+    }
+    """
+    assert minify_query(query) == (
+        'query Find($first:Int!$name:String="a, b"){items(first:$first offset:-10 name:$name)'
+        '{...on Item{id}\n#{{PARENT-QUERY}}#\n}}'
+    )
+
+
+def test_prepare_variables():
+    item_id = uuid.uuid4()
+    variables = {'id': item_id, 'input': {'name': 'a', 'parentId': NOTSET, 'ids': (item_id, NOTSET)}}
+    assert prepare_variables(variables) == {'id': str(item_id), 'input': {'name': 'a', 'ids': [str(item_id)]}}
+    # source is not modified
+    assert variables['input']['parentId'] is NOTSET
+
+
+@pytest.fixture
+def apq_client(api_client, tmp_path):
+    api_client._persisted_queries = PersistedQueries(tmp_path)
+    return api_client
+
+
+def test_persisted_queries(graphql_server, apq_client):
+    assert apq_client.make_query('ws/package/getPackage', id='pkg1')['data']['package']['id'] == 'pkg1'
+    assert apq_client.make_query('ws/package/getPackage', id='pkg2')['data']['package']['id'] == 'pkg2'
+    first, second = graphql_server.requests
+    query_hash = first['extensions']['persistedQuery']['sha256Hash']
+    # text is sent once, then only the hash
+    assert 'query' in first and 'query' not in second
+    assert second['extensions']['persistedQuery']['sha256Hash'] == query_hash
+
+    # server lost the query: resend the text
+    graphql_server.persisted_queries.clear()
+    graphql_server.requests.clear()
+    assert apq_client.make_query('ws/package/getPackage', id='pkg3')['data']['package']['id'] == 'pkg3'
+    assert ['query' in r for r in graphql_server.requests] == [False, True]
+
+
+def test_persisted_queries_batch(graphql_server, apq_client):
+    for _ in range(2):
+        with apq_client.batch() as batch:
+            results = [batch.add('ws/package/getPackage', id=f'pkg{i}') for i in range(3)]
+        assert [r.result()['data']['package']['id'] for r in results] == ['pkg0', 'pkg1', 'pkg2']
+    # merged document is registered once, then sent by the hash
+    assert ['query' in r for r in graphql_server.requests] == [True, False]
+
+
+def test_persisted_queries_not_supported(graphql_server, apq_client):
+    graphql_server.persisted_queries_supported = False
+    for i in range(2):
+        assert apq_client.make_query('ws/package/getPackage', id=f'pkg{i}')['data']['package']['id'] == f'pkg{i}'
+    assert ['extensions' in r for r in graphql_server.requests] == [True, False, False]
+
+
+def test_async_persisted_queries(graphql_server, apq_client):
+    async def main():
+        async with AsyncApiClient(apq_client) as client:
+            for i in range(3):
+                await aio_package.get_package(f'pkg{i}', client=client)
+
+    asyncio.run(main())
+    assert ['query' in r for r in graphql_server.requests] == [True, False, False]
+
+
+def test_batch_keeps_numeric_literals(graphql_server, api_client):
+    query = 'query($id: String!, $first: Int = 1000) { package(id: $id) { id releases(first: 2500) { id } } }'
+    with api_client.batch() as batch:
+        results = [batch.add_raw(query, id=f'pkg{i}') for i in range(2)]
+    merged = graphql_server.requests[0]['query']
+    assert '1000' in merged and '2500' in merged
+    assert results[1].result()['data']['package']['id'] == 'pkg1'
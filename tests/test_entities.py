@@ -0,0 +1,189 @@
+import gc
+import time
+
+import pytest
+
+from agio.core.entities.base_object import BaseObject
+from agio.tools.identity_map import IdentityMap
+
+
+class _Client:
+    def __init__(self, ttl: float = 0):
+        self.identity_map = IdentityMap(ttl)
+
+
+class _Item(BaseObject):
+    object_name = 'test-item'
+    records = {}
+    loaded = []
+
+    @classmethod
+    def get_data(cls, object_id: str, client=None) -> dict:
+        cls.loaded.append(object_id)
+        return dict(cls.records[object_id])
+
+    def update(self, name: str) -> None:
+        self.records[self.id]['name'] = name
+
+    def delete(self) -> None:
+        self.records.pop(self.id)
+
+    @classmethod
+    def iter(cls, **kwargs):
+        raise NotImplementedError
+
+    @classmethod
+    def create(cls, **kwargs):
+        raise NotImplementedError
+
+    @classmethod
+    def find(cls, **kwargs):
+        raise NotImplementedError
+
+
+@pytest.fixture
+def items():
+    _Item.records = {
+        'a': {'id': 'a', 'name': 'first', 'code': 'A', 'fields': '{"frame": 1}'},
+        'b': {'id': 'b', 'name': 'second', 'code': 'B', 'fields': {}},
+    }
+    _Item.loaded = []
+    _Item._known_fields = None
+    return _Item
+
+
+def test_same_instance_per_client(items):
+    client = _Client()
+    item = items('a', client=client)
+    assert items('a', client=client) is item
+    assert items({'id': 'a', 'name': 'first'}, client=client) is item
+    assert items.loaded == ['a']
+    assert item.fields == {'frame': 1}
+    other = items('a', client=_Client())
+    assert other is not item and other == item
+    assert items.loaded == ['a', 'a']
+
+
+def test_instance_released(items):
+    client = _Client()
+    items('a', client=client)
+    gc.collect()
+    assert len(client.identity_map) == 0
+    items('a', client=client)
+    assert items.loaded == ['a', 'a']
+
+
+def test_partial_data_hydration(items):
+    client = _Client()
+    item = items({'id': 'b', 'name': 'second'}, client=client)
+    assert items.loaded == []
+    assert item.code == 'B'
+    assert item.data.get('missing') is None
+    assert items.loaded == ['b']
+    # fields absent in complete data do not trigger requests
+    partial = items({'id': 'a', 'name': 'first'}, client=client)
+    assert partial.data.get('missing') is None
+    with pytest.raises(KeyError):
+        partial.data['missing']
+    assert items.loaded == ['b']
+    assert partial.fields == {'frame': 1}
+    assert items.loaded == ['b', 'a']
+
+
+def test_partial_data_without_identity_map(items):
+    item = items({'id': 'b', 'name': 'second'}, client=object())
+    assert item.data.get('code') is None and item.code is None
+    with pytest.raises(KeyError):
+        item.data['code']
+    assert items.loaded == []
+
+
+def test_stub_reloaded_by_default(items):
+    from agio.core.api import client
+
+    assert client.identity_map is None
+    item = items({'type': 'test-item', 'id': 'a'})
+    assert items.loaded == ['a']
+    assert item.name == 'first' and item.data['code'] == 'A'
+
+
+def test_update_and_delete_invalidate(items):
+    client = _Client()
+    item = items('a', client=client)
+    item.update('renamed')
+    assert item.name == 'renamed'
+    assert items.loaded == ['a', 'a']
+    item.delete()
+    assert ('test-item', 'a') not in client.identity_map
+    items.records['a'] = {'id': 'a', 'name': 'restored'}
+    assert items('a', client=client) is not item
+
+
+def test_ttl_reloads_same_instance(items):
+    client = _Client(ttl=0.05)
+    item = items('a', client=client)
+    items.records['a']['name'] = 'changed'
+    assert items('a', client=client).name == 'first'
+    time.sleep(0.1)
+    assert items('a', client=client) is item
+    assert item.name == 'changed'
+    assert items.loaded == ['a', 'a']
+
+
+def test_hierarchy_index(monkeypatch):
+    from agio.core import api
+    from agio.core.config import config
+    from agio.core.entities import hierarchy
+    from agio.core.entities.entity import AEntity
+    from agio.core.entities.hierarchy import EntityHierarchyIndex
+    from agio.core.exceptions import EntityNotExists
+
+    nodes = [
+        {'id': 'sh010', 'name': 'sh010', 'class': {'id': 'c3', 'name': 'Shot'}, 'fields': {'frames': 10},
+         'parentId': 'sq01'},
+        {'id': 'ep01', 'name': 'ep01', 'class': {'id': 'c1', 'name': 'Episode'}, 'fields': {}, 'parentId': None},
+        {'id': 'sq01', 'name': 'sq01', 'class': {'id': 'c2', 'name': 'Sequence'}, 'fields': '{"cut": 2}',
+         'parentId': 'ep01'},
+    ]
+    calls = []
+
+    def iter_entities(project_id, short=False, **kwargs):
+        calls.append(project_id)
+        return [dict(n) for n in nodes]
+
+    monkeypatch.setattr(api.track, 'iter_entities', iter_entities)
+    index = EntityHierarchyIndex('project').load()
+    assert index.path('sh010') == 'ep01/sq01/sh010'
+    assert index.path('sh010', include_self=False, sep='|') == 'ep01|sq01'
+    assert [n['id'] for n in index.ancestors('sh010')] == ['ep01', 'sq01']
+    assert [n['id'] for n in index.descendants('ep01')] == ['sq01', 'sh010']
+    assert index.depth('sh010') == 2 and index.depth('ep01') == 0
+    assert len(calls) == 1
+
+    # fields and class are kept, entities are created without requests
+    monkeypatch.setattr(api.track, 'get_entity', lambda *args, **kwargs: pytest.fail('entity loaded'))
+    parents = [AEntity.from_data(node) for node in index.ancestors('sh010')]
+    assert [(p.class_id, p.fields) for p in parents] == [('c1', {}), ('c2', {'cut': 2})]
+    assert index.get('sh010')['fields'] == {'frames': 10}
+
+    # unknown ids load the list again at most once per interval
+    with pytest.raises(EntityNotExists):
+        index.get('sh000')
+    assert len(calls) == 1
+    monkeypatch.setattr(config.API, 'HIERARCHY_MISS_INTERVAL', 0)
+
+    # unknown entity loads the list again
+    nodes.append({'id': 'sh020', 'name': 'sh020', 'class': {'name': 'Shot'}, 'parentId': 'sq01'})
+    nodes[0].update(name='sh011')
+    assert index.path('sh020') == 'ep01/sq01/sh020'
+    assert len(calls) == 2
+    assert index.path('sh010') == 'ep01/sq01/sh011'
+    assert len(index) == 4
+
+    # parents are resolved from the shared index
+    hierarchy.clear_hierarchy_cache()
+    entity = {'id': 'sh010', 'parentId': 'sq01', 'projectId': 'project'}
+    assert [n['id'] for n in api.track.get_entity_parent(entity)] == ['sq01']
+    assert [n['id'] for n in api.track.get_entity_parent(dict(entity, id='sh020'))] == ['sq01']
+    assert len(calls) == 3
+    hierarchy.clear_hierarchy_cache()
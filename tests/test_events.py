@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import agio.core  # noqa: F401
+from agio.core.events.event_hub import EventHub
+from agio.core.exceptions import StopEventPropagate
+
+
+@pytest.fixture
+def hub():
+    # not the shared singleton
+    hub = EventHub.__new__(EventHub)
+    hub.__init__()
+    return hub
+
+
+def test_dispatch_order_and_invalidation(hub):
+    calls = []
+
+    def recorder(tag):
+        def callback(event):
+            calls.append((tag, event.name))
+        callback.__name__ = tag
+        return callback
+
+    hub.add_callback('core.app.*', recorder('wildcard'))
+    hub.add_callback('core.app.start', recorder('exact'))
+    hub.add_callback(['core.?pp.start', 'core.[ab]pp.*'], recorder('chars'))
+    hub.add_callback('other.app.start', recorder('other'))
+
+    hub.emit('core.app.start', None)
+    assert calls == [('wildcard', 'core.app.start'), ('exact', 'core.app.start'),
+                     ('chars', 'core.app.start'), ('chars', 'core.app.start')]
+    calls.clear()
+    hub.emit('core.app.exit', None)
+    assert calls == [('wildcard', 'core.app.exit'), ('chars', 'core.app.exit')]
+
+    # resolved names are updated after changes
+    calls.clear()
+    late = recorder('late')
+    hub.add_callback('core.*.exit', late)
+    hub.emit('core.app.exit', None)
+    assert ('late', 'core.app.exit') in calls
+    calls.clear()
+    hub.remove_callback(late)
+    hub.emit('core.app.exit', None)
+    assert ('late', 'core.app.exit') not in calls
+    calls.clear()
+    hub.emit('core.api.query', None)
+    assert calls == []
+
+
+def test_once_and_stop_propagation(hub):
+    calls = []
+
+    def once(event):
+        calls.append('once')
+
+    def stop(event):
+        calls.append('stop')
+        raise StopEventPropagate
+
+    def after_stop(event):
+        calls.append('after_stop')
+
+    def other_pattern(event):
+        calls.append('other_pattern')
+
+    hub.add_callback('core.test.*', once, once=True)
+    hub.add_callback('core.test.*', stop)
+    hub.add_callback('core.test.*', after_stop)
+    hub.add_callback('core.test.event', other_pattern)
+    hub.emit('core.test.event', None)
+    hub.emit('core.test.event', None)
+    assert calls == ['once', 'stop', 'other_pattern', 'stop', 'other_pattern']
+    assert not hub.callback_registered(once)
+
+
+def test_thread_delivery_order_and_drain(hub):
+    results = []
+    main_thread = threading.get_ident()
+
+    def slow(event):
+        time.sleep(0.01)
+        results.append((event.payload['i'], threading.get_ident() != main_thread))
+
+    hub.add_callback('core.test.thread', slow, mode='thread')
+    start = time.perf_counter()
+    for i in range(5):
+        hub.emit('core.test.thread', {'i': i})
+    assert time.perf_counter() - start < 0.04
+    assert hub.drain(5)
+    assert results == [(i, True) for i in range(5)]
+    metrics = hub.metrics()
+    assert metrics['queue_depth'] == 0
+    assert metrics['callbacks']['slow']['calls'] == 5
+    assert metrics['callbacks']['slow']['avg_time'] >= 0.01
+
+
+def test_async_delivery(hub):
+    calls = []
+
+    async def on_event(event):
+        await asyncio.sleep(0.01)
+        calls.append(event.payload['step'])
+
+    async def main():
+        hub.add_callback('core.test.async', on_event, mode='async')
+        hub.emit('core.test.async', {'step': 'scheduled'})
+        assert calls == []
+        await asyncio.sleep(0.05)
+        start = asyncio.get_running_loop().time()
+        await asyncio.gather(hub.emit_async('core.test.async', {'step': 'awaited'}),
+                             hub.emit_async('core.test.async', {'step': 'awaited'}))
+        assert asyncio.get_running_loop().time() - start < 0.05
+
+    asyncio.run(main())
+    assert calls == ['scheduled', 'awaited', 'awaited']
+    # no running loop, delivered by the worker pool
+    hub.emit('core.test.async', {'step': 'no loop'})
+    assert hub.drain(5)
+    assert calls[-1] == 'no loop'
+
+
+def test_emit_while_adding_callbacks(hub):
+    hub.add_callback('core.*.start', lambda event: None)
+    done = threading.Event()
+
+    def add():
+        for index in range(3000):
+            hub.add_callback(f'core.added.{index}', lambda event: None)
+        done.set()
+
+    thread = threading.Thread(target=add)
+    thread.start()
+    try:
+        index = 0
+        while not done.is_set():
+            hub.emit(f'core.emitted{index}.start', None)
+            index += 1
+    finally:
+        done.set()
+        thread.join()
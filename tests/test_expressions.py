@@ -0,0 +1,83 @@
+import pytest
+
+from agio.core.settings.dependency import DependencyConfig
+from agio.tools.expression_solver import ExpressionSolver, compile_expression
+
+
+@pytest.mark.parametrize('expression, result', [
+    ('', 0.0),
+    ('1 + 2 * 3', 7.0),
+    ('(1 + 2) * 3', 9.0),
+    ('-2 ** 2', 4.0),
+    ('2 ** 3 ** 2', 512.0),
+    ('7 // 2 + 7 % 4', 6.0),
+    ('$a * $pkg.value', 6),
+    ('$a <= 2', 1.0),
+    ('$a != 2', 0.0),
+    ('sqrt(16) + pow(2, 3)', 12.0),
+    ('int(3.7)', 3),
+])
+def test_solve(expression, result):
+    values = {'a': 2, 'pkg.value': 3}
+    assert ExpressionSolver(values.__getitem__).solve(expression) == result
+
+
+@pytest.mark.parametrize('expression', ['1 +', '1 2', '$a & 1', '(1'])
+def test_syntax_errors(expression):
+    with pytest.raises(SyntaxError):
+        compile_expression(expression)
+
+
+def test_compiled_once_and_batches():
+    expression = compile_expression('$start + $duration + $shots.handles - 1')
+    assert compile_expression('$start + $duration + $shots.handles - 1') is expression
+    assert expression.variables == ('start', 'duration', 'shots.handles')
+    assert expression(1001, 50, 8) == 1058
+    contexts = [{'start': 1001, 'duration': i} for i in range(1, 4)]
+    assert expression.evaluate_many(contexts, {'shots.handles': 0}.__getitem__) == [1001, 1002, 1003]
+    with pytest.raises(NameError):
+        expression.evaluate_many(contexts)
+
+
+@pytest.mark.parametrize('expression', ['$a * $b - $a', '$a // 2 + $b', 'int($a / 2)', '$a / 2'])
+def test_vector_results_match_scalar(expression):
+    pytest.importorskip('numpy')
+    compiled = compile_expression(expression)
+    contexts = [{'a': a, 'b': b} for a, b in zip(range(5), range(10, 15))]
+    expected = [compiled.evaluate(context.__getitem__) for context in contexts]
+    result = compiled.evaluate_many(contexts)
+    assert result == expected
+    assert [type(value) for value in result] == [type(value) for value in expected]
+
+
+def test_scalar_functions_not_vectorized():
+    assert not compile_expression('int($a / 2)')._vectorizable
+    assert not compile_expression('pow($a, 2, 5)')._vectorizable
+    assert compile_expression('pow($a, 2) + sqrt($a)')._vectorizable
+
+
+def test_exp_dependency_plugin(monkeypatch):
+    from agio.core.settings import APackageSettings
+    from agio.plugins.dependency_solvers.expression import ExpressionDependencySolverPlugin
+
+    class Hub:
+        def get(self, name):
+            return {'shots.start': 1001}[name]
+
+    plugin = ExpressionDependencySolverPlugin(None, {})
+    hub = Hub()
+
+    class ShotSettings(APackageSettings):
+        last_frame: int = None
+
+    settings = ShotSettings(_solve_dependency_func=lambda field, package_settings, **kwargs: plugin.execute(
+        field, package_settings, hub, **kwargs))
+    field = settings.get_parameter('last_frame')
+    field.set_dependency(DependencyConfig(type='exp', value='$shots.start + $duration * int($SHOT_SCALE)'))
+    monkeypatch.setenv('SHOT_SCALE', '2')
+    assert field.get(context={'duration': 10}) == 1021
+    field.set_dependency(DependencyConfig(type='exp', value='$shots.start + $duration - 1'))
+    assert field.get(context={'duration': 10}) == 1010
+    with pytest.raises(NameError):
+        field.get()
+    assert plugin.execute_many(field, settings, hub, [{'duration': 5}, {'duration': 10}]) == [1005, 1010]
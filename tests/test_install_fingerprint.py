@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+from agio.tools import install_fingerprint
+
+
+def _site_packages(venv):
+    if os.name == 'nt':
+        return venv / 'Lib' / 'site-packages'
+    return venv / 'lib' / f'python{sys.version_info.major}.{sys.version_info.minor}' / 'site-packages'
+
+
+def _install(venv, name, version):
+    site_packages = _site_packages(venv)
+    for old in site_packages.glob(f'{name}-*.dist-info'):
+        for file in old.iterdir():
+            file.unlink()
+        old.rmdir()
+    dist_info = site_packages / f'{name}-{version}.dist-info'
+    dist_info.mkdir(parents=True)
+    dist_info.joinpath('RECORD').write_text(f'{name}/__init__.py,,\n')
+
+
+@pytest.fixture
+def venv(tmp_path):
+    tmp_path.joinpath('pyvenv.cfg').write_text('home = /usr/bin\nversion_info = 3.11.7\n')
+    _install(tmp_path, 'agio_core', '1.0.0')
+    _install(tmp_path, 'agio_tools', '2.0.0')
+    return tmp_path
+
+
+PACKAGES = {
+    'agio_core': {'version': '1.0.0', 'command': 'agio-core==1.0.0'},
+    'agio_tools': {'version': '2.0.0', 'command': 'agio-tools==2.0.0'},
+}
+
+
+def test_install_plan(venv):
+    # installed before install states, reinstalled in place
+    plan = install_fingerprint.plan_install(venv, PACKAGES, '>=3.11')
+    assert not plan.recreate_venv
+    assert sorted(plan.to_upgrade) == ['agio-core', 'agio-tools']
+
+    install_fingerprint.save_install_state(venv, PACKAGES, plan.fingerprint)
+    assert install_fingerprint.plan_install(venv, PACKAGES, '>=3.11').is_empty
+
+    packages = {'agio_core': {'version': '1.1.0', 'command': 'agio-core==1.1.0'},
+                'agio_pipe': {'version': '0.1.0', 'command': 'agio-pipe==0.1.0'}}
+    plan = install_fingerprint.plan_install(venv, packages, '>=3.11')
+    assert (plan.to_add, plan.to_upgrade, plan.to_remove) == (['agio-pipe'], ['agio-core'], ['agio-tools'])
+
+
+def test_changed_outside_of_install(venv):
+    fingerprint = install_fingerprint.plan_install(venv, PACKAGES).fingerprint
+    install_fingerprint.save_install_state(venv, PACKAGES, fingerprint)
+    _install(venv, 'agio_tools', '2.1.0')
+    plan = install_fingerprint.plan_install(venv, PACKAGES)
+    assert plan.to_upgrade == ['agio-tools']
+
+
+def test_recreate_venv(venv):
+    assert install_fingerprint.plan_install(venv, PACKAGES, '>=3.12').recreate_venv
+    assert install_fingerprint.plan_install(venv / 'missing', PACKAGES).recreate_venv
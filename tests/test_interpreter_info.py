@@ -0,0 +1,33 @@
+import sys
+import sysconfig
+
+import pytest
+
+from agio.tools import interpreter_info
+from agio.tools.local_storage import LocalStorage
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(interpreter_info, '_storage', LocalStorage(tmp_path / 'interpreters'))
+    monkeypatch.setattr(interpreter_info, '_memory', {})
+
+
+def test_interpreter_info(storage, monkeypatch):
+    info = interpreter_info.get_interpreter_info(sys.executable)
+    assert info.version_info == list(sys.version_info[:3])
+    assert info.paths['purelib'] == sysconfig.get_paths()['purelib']
+    assert info.python_tag == f'cp{sys.version_info[0]}{sys.version_info[1]}'
+
+    # next processes read the probe result from the disk
+    interpreter_info._memory.clear()
+
+    def probe(executable):
+        raise AssertionError('interpreter probed again')
+    monkeypatch.setattr(interpreter_info, 'probe', probe)
+    assert interpreter_info.get_interpreter_info(sys.executable) == info
+
+
+def test_missing_interpreter(storage, tmp_path):
+    with pytest.raises(interpreter_info.InterpreterProbeError):
+        interpreter_info.get_interpreter_info(tmp_path / 'python')
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+
+import pytest
+
+import agio.core  # noqa: F401
+from agio.core.workspaces.package_index import PackageIndex
+
+
+def _add_package(site, name, version='1.0.0'):
+    pkg = site / name
+    pkg.mkdir(exist_ok=True)
+    pkg.joinpath('__agio__.yml').write_text(f'name: {name}\nversion: {version}\n')
+    return pkg
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    site = tmp_path / 'site'
+    site.mkdir()
+    monkeypatch.setattr(sys, 'path', [site.as_posix()])
+    return site
+
+
+def _versions(index):
+    return {metadata['name']: metadata['version'] for _, metadata in index.load()}
+
+
+def test_warm_index_skips_parsing(site, tmp_path, monkeypatch):
+    _add_package(site, 'pkg_a')
+    _add_package(site, 'pkg_b')
+    site.joinpath('not_a_package').mkdir()
+    index = PackageIndex(tmp_path / 'index.pickle')
+    assert _versions(index) == {'pkg_a': '1.0.0', 'pkg_b': '1.0.0'}
+    assert index.index_file.exists()
+
+    def fail(*args):
+        raise AssertionError('manifest parsed')
+
+    monkeypatch.setattr(PackageIndex, '_package_entry', staticmethod(fail))
+    assert _versions(index) == {'pkg_a': '1.0.0', 'pkg_b': '1.0.0'}
+
+
+def test_changes_are_detected(site, tmp_path):
+    pkg = _add_package(site, 'pkg_a')
+    index = PackageIndex(tmp_path / 'index.pickle')
+    assert _versions(index) == {'pkg_a': '1.0.0'}
+    time.sleep(0.01)
+    _add_package(site, 'pkg_a', '2.0.0')
+    assert _versions(index) == {'pkg_a': '2.0.0'}
+    _add_package(site, 'pkg_c')
+    os.utime(site, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    assert _versions(index) == {'pkg_a': '2.0.0', 'pkg_c': '1.0.0'}
+    pkg.joinpath('__agio__.yml').unlink()
+    assert _versions(index) == {'pkg_c': '1.0.0'}
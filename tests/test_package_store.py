@@ -0,0 +1,37 @@
+import os
+
+from agio.tools import package_store
+
+
+def _entry(store, name):
+    entry = store / 'archive-v0' / name
+    entry.joinpath('pkg').mkdir(parents=True)
+    entry.joinpath('pkg', '__init__.py').write_text(name)
+    return entry
+
+
+def test_collect_garbage(tmp_path, monkeypatch):
+    monkeypatch.setenv('AGIO_PACKAGE_LINK_MODE', 'hardlink')
+    store = tmp_path / 'store'
+    used = _entry(store, 'used')
+    unused = _entry(store, 'unused')
+    venv = tmp_path / 'venv'
+    venv.mkdir()
+    os.link(used / 'pkg' / '__init__.py', venv / '__init__.py')
+
+    entries = {entry.path.name: entry for entry in package_store.iter_entries(store)}
+    assert (entries['used'].references, entries['unused'].references) == (1, 0)
+    # just unpacked entries are kept for running installs
+    assert package_store.collect_garbage(store) == []
+
+    removed = package_store.collect_garbage(store, min_age=0)
+    assert [entry.path for entry in removed] == [unused]
+    assert used.exists() and not unused.exists()
+
+
+def test_uv_envs(tmp_path, monkeypatch):
+    monkeypatch.delenv('UV_CACHE_DIR', raising=False)
+    monkeypatch.setenv('AGIO_PACKAGE_STORE_DIR', str(tmp_path))
+    monkeypatch.setenv('AGIO_PACKAGE_LINK_MODE', 'clone')
+    assert package_store.uv_envs() == {'UV_LINK_MODE': 'clone', 'UV_CACHE_DIR': tmp_path.as_posix()}
+    assert package_store.collect_garbage(tmp_path, min_age=0) == []
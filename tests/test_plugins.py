@@ -0,0 +1,76 @@
+import sys
+
+import agio.core  # noqa: F401
+from agio.core.plugins import lazy_plugin
+from agio.core.plugins.lazy_plugin import LazyPlugin, ModuleScanCache, _resolve_classes, iter_package_plugins
+from agio.core.workspaces.package import APackageManager
+
+MANIFEST = """name: test_lazy_pkg
+version: 1.0.0
+plugins:
+  - label: Services
+    implementations:
+      - module: plugins/services.py
+  - label: Dynamic
+    implementations:
+      - module: plugins/dynamic.py
+"""
+SERVICES = """
+from agio.core.plugins.base_service import ServicePlugin
+
+IMPORTED = True
+
+
+class TestLazyService(ServicePlugin):
+    name = 'test_lazy_service'
+    label = 'Lazy'
+
+    def ping(self):
+        return 'pong'
+
+
+class _HiddenService(ServicePlugin):
+    name = 'hidden'
+"""
+DYNAMIC = """
+from agio.core.plugins.base_service import ServicePlugin
+
+try:
+    class TestDynamicService(ServicePlugin):
+        name = 'test_dynamic_service'
+except Exception:
+    pass
+"""
+
+
+def test_plugins_are_imported_on_first_use(tmp_path):
+    root = tmp_path / 'test_lazy_pkg'
+    root.joinpath('plugins').mkdir(parents=True)
+    root.joinpath('__agio__.yml').write_text(MANIFEST)
+    root.joinpath('plugins', 'services.py').write_text(SERVICES)
+    root.joinpath('plugins', 'dynamic.py').write_text(DYNAMIC)
+    sys.modules.pop('plugins.services', None)
+
+    plugins = list(iter_package_plugins(APackageManager(root), ModuleScanCache(tmp_path / 'scan.pickle')))
+    lazy, dynamic = plugins
+    assert isinstance(lazy, LazyPlugin) and not isinstance(dynamic, LazyPlugin)
+    assert (lazy.plugin_type, lazy.name, lazy.label) == ('service', 'test_lazy_service', 'Lazy')
+    assert not lazy.is_loaded
+    assert 'IMPORTED' not in vars(sys.modules.get('plugins.services', object))
+    assert lazy.ping() == 'pong'
+    assert lazy.is_loaded and type(lazy.load()).__name__ == 'TestLazyService'
+    assert dynamic.name == 'test_dynamic_service'
+
+
+def test_bases_resolved_by_qualified_name(monkeypatch):
+    monkeypatch.setattr(lazy_plugin, '_scanned_plugin_classes', {'plugins.bases.Base': 'service'})
+    thing = {'Thing': {'bases': ['Base'], 'attrs': {'name': 'thing'}}}
+    assert _resolve_classes(thing, {'Base': 'plugins.bases.Base'}) == {'Thing': 'service'}
+    # class of the same name in another module is unknown, the module is imported
+    assert _resolve_classes(thing, {'Base': 'plugins.other.Base'}) is None
+    assert _resolve_classes(thing, {}) is None
+    # module attribute bases, scanned and imported
+    assert _resolve_classes({'Thing': {'bases': ['bases.Base'], 'attrs': {}}},
+                            {'bases': 'plugins.bases'}) == {'Thing': 'service'}
+    assert _resolve_classes({'Cmd': {'bases': ['commands.ACommandPlugin'], 'attrs': {}}},
+                            {'commands': 'agio.core.plugins.base_command'}) == {'Cmd': 'command'}
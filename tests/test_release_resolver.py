@@ -0,0 +1,93 @@
+import pytest
+
+import agio.core  # noqa: F401  tools modules below expect core to be initialized
+from agio.core.api.package import iter_package_releases_by_package_names
+from agio.tools.release_resolver import ReleaseIndex, ReleaseResolver, ResolutionImpossible
+from agio.tools.version_ranges import VersionRange
+
+
+def _index(releases: dict[str, dict[str, list[str]]]) -> ReleaseIndex:
+    index = ReleaseIndex()
+    for name, versions in releases.items():
+        for version, required in versions.items():
+            index.add_release({'name': version, 'package': {'name': name},
+                               'metadata': {'required_packages': required}})
+    return index
+
+
+def _versions(result):
+    return {name: str(candidate.version) for name, candidate in result.items()}
+
+
+def test_backtracking():
+    index = _index({
+        'app': {'2.0': ['lib>=2', 'tool'], '1.0': ['lib<2', 'tool']},
+        'lib': {'2.1': ['tool<1'], '1.5': []},
+        'tool': {'1.2': [], '0.9': []},
+    })
+    result = ReleaseResolver(index).resolve({'app': VersionRange(), 'tool': VersionRange.from_specifier_set('>=1')})
+    # app 2.0 needs lib 2.1 which conflicts with tool>=1, so resolver must step back to app 1.0
+    assert _versions(result) == {'app': '1.0', 'lib': '1.5', 'tool': '1.2'}
+
+
+def test_pinned_release_conflict():
+    index = _index({'app': {'1.0': ['lib>=2']}, 'lib': {'2.0': [], '1.0': []}})
+    resolver = ReleaseResolver(index)
+    pinned = [index.releases('lib')[1]]
+    with pytest.raises(ResolutionImpossible):
+        resolver.resolve({'app': VersionRange()}, pinned)
+
+
+class _FakeBatch:
+    def __init__(self, client):
+        self.client = client
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def add(self, query, **variables):
+        response = self.client.make_query(query, **variables)
+        return type('Result', (), {'result': lambda _: response})()
+
+
+class _FakeClient:
+    """Releases filtered by exact package name as the server does"""
+    last_response_size = 0
+
+    def __init__(self, releases: dict[str, list[str]]):
+        self.releases = releases
+        self.queries = []
+
+    def batch(self):
+        return _FakeBatch(self)
+
+    def make_query(self, query, first, afterCursor=None, **variables):
+        self.queries.append((query, variables.get('packageName')))
+        if query == 'ws/package/getPackageList':
+            nodes, key = [{'name': name} for name in self.releases], 'packages'
+        else:
+            name = variables['packageName']
+            nodes = [{'name': version, 'package': {'name': name}} for version in self.releases.get(name, [])]
+            key = 'packageReleases'
+        start = int(afterCursor or 0)
+        page = nodes[start:start + first]
+        has_next = start + first < len(nodes)
+        return {'data': {key: {
+            'edges': [{'node': node} for node in page],
+            'pageInfo': {'hasNextPage': has_next, 'endCursor': str(start + first) if has_next else None},
+        }}}
+
+
+def test_releases_by_package_names():
+    client = _FakeClient({'agio-core': ['1.0', '1.1', '1.2'], 'My_Pkg': ['0.1'], 'other': ['2.0']})
+    releases = list(iter_package_releases_by_package_names(['agio-core', 'my-pkg'], items_per_page=2, client=client))
+    assert sorted((r['package']['name'], r['name']) for r in releases) == [
+        ('My_Pkg', '0.1'), ('agio-core', '1.0'), ('agio-core', '1.1'), ('agio-core', '1.2')]
+    # the package list is read only for the name that is not stored as is
+    assert ('ws/package/getPackageList', None) in client.queries
+    client.queries.clear()
+    list(iter_package_releases_by_package_names(['agio-core'], client=client))
+    assert client.queries == [('ws/release/getPackageReleasesByPackageName', 'agio-core')]
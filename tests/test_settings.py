@@ -22,3 +22,238 @@ def test_int_field():
     with pytest.raises(ValueTypeError):
         _ = TestSettings(value=[1,2,3])
 
+
+
+def test_instances_own_values():
+    class TestSettings(APackageSettings):
+        value: int = 1
+        items: list[int] = [1]
+
+    first, second = TestSettings(value=10), TestSettings(value=20)
+    assert (first.get('value'), second.get('value')) == (10, 20)
+    first.get('items').append(2)
+    assert first.get('items') == [1]
+
+
+class _SnapshotSettings(APackageSettings):
+    value: int = 1
+    name: str = 'default'
+
+
+@pytest.fixture
+def test_packages(monkeypatch):
+    from agio.core.workspaces import package_hub
+
+    class _Package:
+        def get_local_settings_class(self):
+            return _SnapshotSettings
+
+    class _PackageHub:
+        def get_packages(self):
+            return {'test_pkg': _Package()}
+
+    monkeypatch.setattr(package_hub.APackageHub, 'instance', classmethod(lambda cls, *args: _PackageHub()))
+
+
+def test_hub_snapshot(test_packages):
+    from agio.core.settings import settings_hub
+
+    hub = settings_hub.LocalSettingsHub({'test_pkg.value': 5})
+    other = settings_hub.LocalSettingsHub({})
+    assert hub.snapshot() == {'test_pkg.value': 5, 'test_pkg.name': 'default'}
+    assert other.get('test_pkg.value') == 1
+    hub.set('test_pkg.value', '7')
+    assert hub.get('test_pkg.value') == 7
+    hub.get_parameter('test_pkg.name').set('changed')
+    assert hub.get('test_pkg.name') == 'changed'
+    assert other.get('test_pkg.name') == 'default'
+    with pytest.raises(TypeError):
+        hub.snapshot()['test_pkg.value'] = 1
+
+
+def test_load_cached_until_saved(test_packages, tmp_path, monkeypatch):
+    from agio.core.settings import local_settings
+
+    monkeypatch.setattr(local_settings, '_settings_dir', tmp_path)
+    events = []
+    monkeypatch.setattr(local_settings, 'emit', lambda name, data: events.append(name))
+    local_settings.clear_cache()
+    hub = local_settings.load('project')
+    cached = local_settings._loaded['project'][1]
+    other = local_settings.load('project')
+    assert local_settings._loaded['project'][1] is cached
+    assert events.count('core.settings.project_settings_loaded') == 2
+    # unsaved changes are not shared
+    hub.set('test_pkg.value', 2)
+    assert hub.get('test_pkg.value') == 2
+    assert other.get('test_pkg.value') == 1
+    assert local_settings.load('project').get('test_pkg.value') == 1
+    local_settings.save({'test_pkg.value': 3}, 'project')
+    reloaded = local_settings.load('project')
+    assert local_settings._loaded['project'][1] is not cached
+    assert reloaded.get('test_pkg.value') == 3
+
+
+def test_class_schema_cached():
+    from agio.core.settings import BaseField
+
+    calls = []
+
+    class Version(tuple):
+        pass
+
+    class VersionField(BaseField):
+        field_type = Version
+        static_schema = False
+
+        def get_schema(self) -> dict:
+            calls.append(self.name)
+            return super().get_schema()
+
+    class TestSettings(APackageSettings):
+        count: int = 2
+        version: Version = None
+
+        def __init__(self, **kwargs):
+            raise AssertionError('schema must not create instances')
+
+    assert isinstance(TestSettings._fields['version'], VersionField)
+    schema = TestSettings.__schema__()
+    assert list(schema) == ['count', 'version']
+    assert schema['count']['label'] == 'Count' and schema['count']['default'] == 2
+    schema['count']['default'] = 5
+    assert TestSettings.__schema__()['count']['default'] == 2
+    # dynamic options are collected on each call
+    assert calls == ['version', 'version']
+
+
+def test_collections_validated_with_shared_adapters():
+    from pydantic import BaseModel
+    from agio.core.settings.fields.type_adapters import get_type_adapter
+
+    class Item(BaseModel):
+        name: str
+
+    class TestSettings(APackageSettings):
+        numbers: list[int] = ()
+        tags: set[str] = ()
+        items: list[Item] = ()
+        options: dict[str, int] = None
+
+    first, second = TestSettings(), TestSettings()
+    assert first.numbers.type_adapter is second.numbers.type_adapter is get_type_adapter(list[int])
+    first.set('numbers', ('1', 2))
+    assert first.get('numbers') == [1, 2]
+    first.set('tags', ['a', 'a', 'b'])
+    assert first.get('tags') == {'a', 'b'}
+    first.set('items', [{'name': 'one'}, Item(name='two')])
+    assert [item.name for item in first.get('items')] == ['one', 'two']
+    first.set('options', {'a': '1'})
+    assert first.get('options') == {'a': 1}
+    with pytest.raises(ValueError):
+        first.set('numbers', [1, 'x'])
+    with pytest.raises(ValueError):
+        first.set('items', [{'title': 'one'}])
+
+
+class _DependentSettings(APackageSettings):
+    base: int = 1
+    double: int = None
+    total: int = None
+    shot_end: int = None
+
+
+@pytest.fixture
+def dependent_packages(monkeypatch):
+    from agio.core.workspaces import package_hub
+    from agio.core.settings.settings_hub import ASettingsHub
+    from agio.plugins.dependency_solvers.expression import ExpressionDependencySolverPlugin
+
+    class _Package:
+        def get_local_settings_class(self):
+            return _DependentSettings
+
+    class _PackageHub:
+        def get_packages(self):
+            return {'deps': _Package()}
+
+    class _CountingSolver(ExpressionDependencySolverPlugin):
+        calls = []
+
+        def execute(self, field, package_settings, settings_hub, **kwargs):
+            self.calls.append(field.name)
+            return super().execute(field, package_settings, settings_hub, **kwargs)
+
+    solver = _CountingSolver(None, {})
+    monkeypatch.setattr(package_hub.APackageHub, 'instance', classmethod(lambda cls, *args: _PackageHub()))
+    monkeypatch.setattr(ASettingsHub, '_get_dep_plugin', lambda self, name: solver)
+    return solver
+
+
+def _exp(value: str) -> dict:
+    return {'dependency': {'type': 'exp', 'value': value}}
+
+
+def test_dependency_graph(dependent_packages):
+    from agio.core.settings import settings_hub
+
+    calls = dependent_packages.calls
+    hub = settings_hub.LocalSettingsHub({
+        'deps.double': _exp('$deps.base * 2'),
+        'deps.total': _exp('$deps.double + $deps.base'),
+        'deps.shot_end': _exp('$deps.total + $duration'),
+    })
+    assert hub.get('deps.total') == 3
+    # upstream evaluated first, once
+    assert calls == ['double', 'total']
+    assert hub.get('deps.total') == 3 and hub.get('deps.double') == 2
+    assert calls == ['double', 'total']
+    # context values are not cached
+    assert hub.get_parameter('deps.shot_end').get(context={'duration': 10}) == 13
+    hub.set('deps.base', 5)
+    assert hub.get('deps.total') == 15
+    assert calls == ['double', 'total', 'shot_end', 'double', 'total']
+    report = hub.explain('deps.total')
+    assert report.splitlines()[0].startswith('deps.total = exp: $deps.double + $deps.base [')
+    assert '  deps.double = exp: $deps.base * 2' in report
+    assert '    deps.base = 5' in report
+    # changes made by fields directly
+    hub.get_parameter('deps.base').set(1)
+    assert hub.get('deps.total') == 3
+
+
+def test_dependency_graph_incremental(dependent_packages, monkeypatch):
+    from agio.core.settings import settings_hub
+    from agio.core.settings.dependency_graph import DependencyGraph
+
+    data = {
+        'deps.double': _exp('$deps.base * 2'),
+        'deps.total': _exp('$deps.double + $deps.base'),
+    }
+    hub, other = settings_hub.LocalSettingsHub(data), settings_hub.LocalSettingsHub(data)
+    copy = hub.copy()
+    assert hub.get('deps.total') == 3
+    builds = []
+    build = DependencyGraph.build
+    monkeypatch.setattr(DependencyGraph, 'build', lambda self: (builds.append(self), build(self)))
+    # changes of other hubs don't force a rebuild
+    other.set('deps.base', 10)
+    copy.set('deps.base', 20)
+    hub.set('deps.base', 5)
+    assert hub.get('deps.total') == 15
+    assert (other.get('deps.total'), copy.get('deps.total')) == (30, 60)
+    assert builds == []
+
+
+def test_dependency_cycle(dependent_packages):
+    from agio.core.exceptions import DependencyCycleError
+    from agio.core.settings import settings_hub
+
+    hub = settings_hub.LocalSettingsHub({
+        'deps.base': _exp('$deps.total'),
+        'deps.double': _exp('$deps.base * 2'),
+        'deps.total': _exp('$deps.double + 1'),
+    })
+    with pytest.raises(DependencyCycleError, match='deps.base -> deps.total -> deps.double -> deps.base'):
+        hub.get('deps.double')
+    assert 'Dependency cycle' in hub.explain('deps.total')
@@ -0,0 +1,36 @@
+import sys
+
+from agio.tools import startup_profiler
+
+
+def test_import_spans_and_reports(tmp_path, monkeypatch):
+    tmp_path.joinpath('prof_outer.py').write_text('import prof_inner\n')
+    tmp_path.joinpath('prof_inner.py').write_text('import time\ntime.sleep(0.02)\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    startup_profiler.reset()
+    startup_profiler.start()
+    try:
+        with startup_profiler.phase('test.imports'):
+            import prof_outer  # noqa: F401
+        with startup_profiler.span('callback_module', 'callback', package='test_pkg'):
+            pass
+    finally:
+        startup_profiler.stop()
+        sys.modules.pop('prof_outer', None)
+        sys.modules.pop('prof_inner', None)
+    assert prof_outer.__loader__.__class__.__name__ == 'SourceFileLoader'
+    assert startup_profiler.phase_timings()['test.imports'] >= 0.02
+
+    trace = startup_profiler.get_trace()
+    rows = {row['name']: row for row in startup_profiler.top_spans(trace, 10)}
+    assert rows['prof_inner']['self'] >= 0.02
+    # nested import time is not counted twice
+    assert rows['prof_outer']['self'] < rows['prof_inner']['self']
+    assert rows['prof_outer']['total'] >= rows['prof_inner']['total']
+    assert rows['test.imports']['self'] < 0.02
+    assert rows['callback_module']['package'] == 'test_pkg'
+    assert startup_profiler.package_totals(trace)['prof_inner'] >= 0.02
+
+    profile = startup_profiler.to_speedscope(trace)['profiles'][0]
+    opened = [e['type'] for e in profile['events']]
+    assert opened.count('O') == opened.count('C') == 4
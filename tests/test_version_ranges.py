@@ -0,0 +1,68 @@
+import random
+
+import pytest
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+
+from agio.tools.version_ranges import VersionRange, conflicting_bounds
+
+
+def _range(spec: str) -> VersionRange:
+    return VersionRange.from_specifier_set(SpecifierSet(spec))
+
+
+@pytest.mark.parametrize('spec', [
+    '>=1.0', '>1.0', '<=1.0', '<1.0', '==1.2.3', '!=1.2', '~=1.4.5', '~=2.2', '==1.*', '!=1.*',
+    '>=1.0,<2.0,!=1.5', '~=1.2,!=1.3.*', ''
+])
+def test_range_matches_specifier_set(spec):
+    spec_set = SpecifierSet(spec)
+    version_range = _range(spec)
+    for major in range(4):
+        for minor in range(7):
+            for patch in range(7):
+                version = Version(f'{major}.{minor}.{patch}')
+                assert (version in version_range) == spec_set.contains(version, prereleases=True), version
+
+
+def test_intersection_and_simplify():
+    merged = _range('>=0.1.0,<3') & _range('>=0.2.0,!=0.5')
+    assert merged.to_specifier_set() == SpecifierSet('>=0.2.0,!=0.5,<3')
+    assert _range('~=1.2').intersection(_range('<1.5')).to_specifier_set() == SpecifierSet('~=1.2,<1.5')
+    assert _range('>=1.0,<=1.0').to_specifier_set() == SpecifierSet('==1.0')
+    assert (_range('>=1.0') & _range('!=1.0')).to_specifier_set() == SpecifierSet('>1.0')
+
+
+def test_conflicting_bounds():
+    assert (_range('>=2') & _range('<1')).is_empty
+    lower, upper = conflicting_bounds(_range('>=2'), _range('<1'))
+    assert str(lower) == '>=2' and str(upper) == '<1'
+    lower, upper = conflicting_bounds(_range('==1.0'), _range('!=1.0'))
+    assert str(lower) == '==1.0' and str(upper) == '!=1.0'
+    assert conflicting_bounds(_range('>=1'), _range('<2')) is None
+
+
+def _random_spec(rnd: random.Random) -> str:
+    operator = rnd.choice(['>=', '>', '<=', '<', '==', '!=', '~=', '==*', '!=*'])
+    release = [rnd.randint(0, 3) for _ in range(rnd.randint(2, 3))]
+    version = '.'.join(map(str, release))
+    if operator.endswith('*'):
+        return f'{operator[:2]}{".".join(map(str, release[:-1]))}.*'
+    return f'{operator}{version}'
+
+
+def test_to_specifier_set_property():
+    rnd = random.Random(0)
+    versions = [Version(f'{major}.{minor}.{patch}') for major in range(5) for minor in range(5) for patch in range(5)]
+    for _ in range(2000):
+        specs = [_random_spec(rnd) for _ in range(rnd.randint(1, 5))]
+        expected = SpecifierSet(','.join(specs))
+        half = rnd.randint(0, len(specs))
+        version_range = _range(','.join(specs[:half])) & _range(','.join(specs[half:]))
+        if version_range.is_empty:
+            assert not any(expected.contains(v, prereleases=True) for v in versions), specs
+            continue
+        result = version_range.to_specifier_set()
+        for version in versions:
+            assert result.contains(version, prereleases=True) == expected.contains(version, prereleases=True), \
+                (specs, str(result), version)
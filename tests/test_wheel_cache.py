@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import io
+import threading
+import zipfile
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from agio.tools.wheel_cache import InvalidWheel, WheelCache, WheelHashMismatch
+
+
+def _make_wheel(content: bytes) -> bytes:
+    files = {'pkg/__init__.py': content, 'pkg-1.0.dist-info/METADATA': b'Name: pkg\nVersion: 1.0\n'}
+    record = ''.join(
+        f'{name},sha256={base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=").decode()},{len(data)}\n'
+        for name, data in files.items()) + 'pkg-1.0.dist-info/RECORD,,\n'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as wheel:
+        for name, data in files.items():
+            wheel.writestr(name, data)
+        wheel.writestr('pkg-1.0.dist-info/RECORD', record)
+    return buffer.getvalue()
+
+
+WHEEL = _make_wheel(b'wheel content ' * 1000)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+    content = WHEEL
+    etag = '"v1"'
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get('Range')))
+        content = WHEEL if self.path.endswith('.whl') else self.content
+        start = 0
+        if self.headers.get('Range') and self.headers.get('If-Range') == self.etag:
+            start = int(self.headers['Range'].split('=')[1].rstrip('-'))
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(content) - 1}/{len(content)}')
+        else:
+            self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(content) - start))
+        self.end_headers()
+        self.wfile.write(content[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.requests = []
+    _Handler.content = WHEEL
+    _Handler.etag = '"v1"'
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_localize_commands(server, tmp_path):
+    cache = WheelCache(tmp_path)
+    urls = [f'{server}/pkg_{i}-1.0-py3-none-any.whl' for i in range(3)]
+    commands, report = cache.localize_commands(urls + ['git+https://host/repo.git'])
+    assert commands[-1] == 'git+https://host/repo.git'
+    assert all(open(path, 'rb').read() == WHEEL for path in commands[:3])
+    assert report.downloaded_bytes == 3 * len(WHEEL)
+
+    commands_again, report = cache.localize_commands(urls)
+    assert commands_again == commands[:3]
+    assert report.cached_bytes == 3 * len(WHEEL) and report.downloaded_bytes == 0
+    assert len(_Handler.requests) == 3
+
+
+def test_resume_and_verify(server, tmp_path):
+    cache = WheelCache(tmp_path)
+    sha256 = hashlib.sha256(WHEEL).hexdigest()
+    url = f'{server}/pkg-1.0-py3-none-any.whl#sha256={sha256}'
+    partial = cache.root / 'partial'
+    partial.mkdir(parents=True)
+    key = hashlib.sha256(url.split("#")[0].encode()).hexdigest()
+    partial.joinpath(f'{key}.part').write_bytes(WHEEL[:100])
+    partial.joinpath(f'{key}.json').write_text('{"validator": "\\"v1\\""}')
+
+    download = cache.fetch(url)
+    assert _Handler.requests == [('/pkg-1.0-py3-none-any.whl', 'bytes=100-')]
+    assert download.downloaded == len(WHEEL) - 100
+    assert download.path.read_bytes() == WHEEL
+    assert list(partial.iterdir()) == []
+
+    with pytest.raises(WheelHashMismatch):
+        cache.fetch(f'{server}/other-1.0-py3-none-any.whl#sha256={"0" * 64}')
+
+
+def test_concurrent_download(server, tmp_path):
+    url = f'{server}/pkg-1.0-py3-none-any.whl'
+    # caches of separate processes share the directory
+    caches = [WheelCache(tmp_path) for _ in range(4)]
+    results = []
+    threads = [threading.Thread(target=lambda c=cache: results.append(c.fetch(url))) for cache in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(_Handler.requests) == 1
+    assert sum(1 for result in results if result.from_cache) == 3
+    assert all(result.path.read_bytes() == WHEEL for result in results)
+
+
+def test_resume_changed_file(server, tmp_path):
+    cache = WheelCache(tmp_path)
+    url = f'{server}/pkg-1.0-py3-none-any.whl'
+    partial = cache.root / 'partial'
+    partial.mkdir(parents=True)
+    key = hashlib.sha256(url.encode()).hexdigest()
+    partial.joinpath(f'{key}.part').write_bytes(b'old content')
+    partial.joinpath(f'{key}.json').write_text('{"validator": "\\"v0\\""}')
+
+    # the file has changed since the partial download, the server sends all of it
+    download = cache.fetch(url)
+    assert _Handler.requests == [('/pkg-1.0-py3-none-any.whl', 'bytes=11-')]
+    assert download.downloaded == len(WHEEL)
+    assert download.path.read_bytes() == WHEEL
+
+    # partial file without a validator is not resumed
+    other = f'{server}/other-1.0-py3-none-any.whl'
+    partial.joinpath(f'{hashlib.sha256(other.encode()).hexdigest()}.part').write_bytes(WHEEL[:100])
+    assert cache.fetch(other).path.read_bytes() == WHEEL
+    assert _Handler.requests[-1] == ('/other-1.0-py3-none-any.whl', None)
+
+
+def test_invalid_wheel(server, tmp_path):
+    cache = WheelCache(tmp_path)
+    _Handler.content = b'not a wheel'
+    with pytest.raises(InvalidWheel):
+        cache.fetch(f'{server}/broken/pkg-1.0-py3-none-any')
+
+    # archive does not match its RECORD
+    tampered = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(WHEEL)) as source, zipfile.ZipFile(tampered, 'w') as target:
+        for name in source.namelist():
+            data = source.read(name)
+            target.writestr(name, b'changed' if name == 'pkg/__init__.py' else data)
+    _Handler.content = tampered.getvalue()
+    with pytest.raises(InvalidWheel, match='pkg/__init__.py'):
+        cache.fetch(f'{server}/tampered/pkg-1.0-py3-none-any')
+    assert not any((cache.root / 'partial').iterdir())
+    assert not (cache.root / 'sha256').exists()
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+import agio.core  # noqa: F401
+from agio.core.events import subscribe_manager
+from agio.core.workspaces import AWorkspaceManager, workspace_gc
+from agio.tools import folder_size
+from agio.tools.local_storage import LocalStorage
+
+DAY = 24 * 3600
+
+
+def _workspace(root, days_ago, size=1000):
+    revision_id = str(uuid.uuid4())
+    install_root = root / 'ws' / revision_id
+    install_root.mkdir(parents=True)
+    last_used = time.time() - days_ago * DAY
+    meta_file = install_root.joinpath(AWorkspaceManager._meta_file_name)
+    meta_file.write_text(json.dumps({'id': revision_id}))
+    os.utime(meta_file, (last_used, last_used))
+    install_root.joinpath('timestamp').write_text(str(last_used))
+    install_root.joinpath('.venv').mkdir()
+    install_root.joinpath('.venv', 'lib.bin').write_bytes(b'0' * size)
+    return install_root, revision_id
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(folder_size, '_storage', LocalStorage(tmp_path / 'sizes'))
+    monkeypatch.setattr(workspace_gc.package_store, 'collect_garbage', lambda **kwargs: [])
+    return tmp_path / 'workspaces'
+
+
+def _collect(root, **kwargs):
+    return workspace_gc.collect_garbage(root=root, include_caches=False, **kwargs)
+
+
+def test_remove_not_used(root):
+    old, _ = _workspace(root, days_ago=30)
+    recent, _ = _workspace(root, days_ago=1)
+    running, _ = _workspace(root, days_ago=30)
+    running.joinpath('.pids').mkdir()
+    running.joinpath('.pids', str(os.getppid())).touch()
+    installing, installing_id = _workspace(root, days_ago=30)
+    lock = AWorkspaceManager.get_install_lock(installing_id)
+    lock.acquire()
+    try:
+        report = _collect(root, max_age_days=14, size_budget=0, dry_run=True)
+        assert [item.path for item in report.removed] == [old]
+        assert 1000 < report.freed_bytes < 1200 and old.exists()
+
+        removed = []
+        with subscribe_manager('core.workspace.removed', lambda event: removed.append(event)):
+            report = _collect(root, max_age_days=14, size_budget=0)
+        assert not old.exists() and len(removed) == 1
+        assert recent.exists() and running.exists() and installing.exists()
+    finally:
+        lock.release()
+
+
+def test_size_budget(root):
+    oldest, _ = _workspace(root, days_ago=3)
+    older, _ = _workspace(root, days_ago=2)
+    recent, _ = _workspace(root, days_ago=1)
+    report = _collect(root, max_age_days=0, size_budget=1500)
+    assert {item.path for item in report.removed} == {oldest, older}
+    assert recent.exists()
+
+
+def test_used_by_venv_python(root):
+    launched, _ = _workspace(root, days_ago=30)
+    bin_dir = launched.joinpath('.venv', 'bin')
+    bin_dir.mkdir()
+    # venv python is a link to the base interpreter
+    bin_dir.joinpath('python').symlink_to(sys.executable)
+    proc = subprocess.Popen([str(bin_dir / 'python'), '-c', 'import time; time.sleep(30)'])
+    try:
+        for _ in range(50):
+            if workspace_gc.psutil.Process(proc.pid).cmdline():
+                break
+            time.sleep(0.05)
+        report = _collect(root, max_age_days=14, size_budget=0)
+        assert report.removed == [] and launched.exists()
+        assert report.items[0].reason == f'used by process {proc.pid}'
+    finally:
+        proc.kill()
+        proc.wait()